@@ -0,0 +1,16 @@
+// Pure-UI callbacks that run in the browser, registered from src/tabs/clientside_callbacks.py
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    ui: {
+        toggle_collapse: function(n_clicks, is_open) {
+            if (n_clicks) {
+                return !is_open;
+            }
+            return is_open;
+        },
+        show_selected_tab: function(selected_tab) {
+            return dash_clientside.callback_context.outputs_list.map(function(output) {
+                return {display: output.id === selected_tab + '-content' ? 'block' : 'none'};
+            });
+        }
+    }
+});
@@ -0,0 +1,272 @@
+"""
+Latency, response size and allocation benchmarks for the Dash callbacks in main_app.py.
+
+Run from the repository root:
+
+    python -m benchmarks.callback_benchmarks                     # print results
+    python -m benchmarks.callback_benchmarks --save              # write benchmarks/baseline.json
+    python -m benchmarks.callback_benchmarks --compare           # fail if p95 regressed against the baseline
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import plotly
+from plotly.utils import PlotlyJSONEncoder
+
+import dash
+from dash._callback_context import context_value
+from dash._utils import AttributeDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main_app
+from src.data.registry import data_registry
+from src.tabs import measure_view
+from src.tabs.figure_cache import figure_cache
+from src.tabs.patient_prefetch import patient_prefetcher
+from src.tabs.precomputed_views import load_manifest
+
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+@contextmanager
+def triggered_by(prop_id):
+    """Callback context for a direct call, as if `prop_id` (e.g. 'state-dropdown.value') fired; None for the initial call."""
+    triggered_inputs = [{'prop_id': prop_id, 'value': None}] if prop_id else []
+    token = context_value.set(AttributeDict(triggered_inputs=triggered_inputs))
+    try:
+        yield
+    finally:
+        context_value.reset(token)
+
+
+def random_state_selections(states, rng, count, max_states=5):
+    return [sorted(rng.sample(states, rng.randint(2, max_states))) for _ in range(count)]
+
+
+def build_cases(rng, num_random=10, num_counties=20, num_patients=10):
+    """
+    Input sets per callback: (label, args, triggering prop id) tuples.
+
+    Covers all states, every single state, random multi-state selections, every measure,
+    a sample of counties and random patients.
+    """
+    df_ranking = main_app.get_df_ranking()
+    states = sorted(df_ranking['StateDesc'].unique())
+    measures = measure_view.get_available_measures()
+    multi_states = random_state_selections(states, rng, num_random)
+
+    state_selections = [('all states', None)] + [(state, [state]) for state in states] + \
+                       [(', '.join(selection), selection) for selection in multi_states]
+
+    county_rows = df_ranking[['StateDesc', 'LocationName']].drop_duplicates().values.tolist()
+    counties = rng.sample(county_rows, num_counties)
+
+    cases = {}
+    cases['update_map_and_chart'] = [('initial: all states', (None,), None)] + \
+        [(label, (selection,), 'state-dropdown.value') for label, selection in state_selections]
+    cases['update_table'] = [(label, (selection,), 'state-dropdown.value') for label, selection in state_selections]
+    cases['update_county_dropdown'] = [(state, (state,), 'county-view-state-dropdown.value') for state in states]
+    cases['update_charts'] = [(f"{county}, {state}", (1, None, state, county), 'interval-component.n_intervals')
+                              for state, county in counties]
+    cases['update_econ_charts'] = [(f"{county}, {state} ({currency})", ({'state': state, 'county': county}, currency),
+                                    'currency-type.value')
+                                   for state, county in counties for currency in ('adj', 'current')]
+    cases['update_measure_map'] = [(f"initial: {measures[0]}", (measures[0], None), None)] + \
+        [(f"{measure}: all states", (measure, None), 'measure-dropdown.value') for measure in measures] + \
+        [(f"{measures[0]}: {label}", (measures[0], selection), 'measure-view-state-dropdown.value')
+         for label, selection in state_selections[1:]]
+    cases['update_measure_table'] = [(f"{measure}: all states", (measure, None), 'measure-dropdown.value') for measure in measures] + \
+        [(f"{measures[0]}: {label}", (measures[0], selection), 'measure-view-state-dropdown.value')
+         for label, selection in state_selections[1:]]
+    cases['update_measure_subtitle'] = [(measure, (measure,), 'measure-dropdown.value') for measure in measures]
+    # no next patient picked for the session, so every click renders its view
+    cases['display_random_patient_data'] = [('default patient', (None, None), None)] + \
+        [(f"random patient {i}", (i, None), 'generate-random-patient-button.n_clicks') for i in range(1, num_patients + 1)]
+    patient_ids = rng.sample(sorted(main_app.get_all_patient_ids()), num_patients)
+    for card, (collapse_id, _, _) in main_app.chart_cards.items():
+        cases[f'display_{card}_card'] = [(f"patient {patient_id}", (True, patient_id, None), f'{collapse_id}.is_open')
+                                         for patient_id in patient_ids]
+    cases['render_tab'] = [(tab, (tab, [main_app.default_tab]), 'tabs.value') for tab in main_app.tab_layouts if tab != main_app.default_tab]
+    return cases
+
+
+def response_size(output):
+    """Bytes of the JSON Dash would send for a callback return value."""
+    if output is dash.no_update:
+        return 0
+    return len(json.dumps(output, cls=PlotlyJSONEncoder))
+
+
+def run_callback(callback, args, prop_id, cache):
+    if cache == 'cold':
+        figure_cache.clear()
+    with triggered_by(prop_id):
+        return callback(*args)
+
+
+def benchmark_callback(name, cases, repeat, cache, seed):
+    """
+    Runs every case once with tracemalloc (warm-up, response size and peak allocation),
+    then `repeat` timed rounds.
+    """
+    callback = getattr(main_app, name)
+    sizes, peaks, timings = [], [], []
+
+    random.seed(seed)  # display_random_patient_data draws patients from `random`
+    for label, args, prop_id in cases:
+        tracemalloc.start()
+        output = run_callback(callback, args, prop_id, cache)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        sizes.append(response_size(output))
+
+    for _ in range(repeat):
+        random.seed(seed)
+        for label, args, prop_id in cases:
+            start = time.perf_counter()
+            run_callback(callback, args, prop_id, cache)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'cases': len(cases),
+        'calls': len(timings),
+        'p50_ms': round(float(np.percentile(timings, 50)), 3),
+        'p95_ms': round(float(np.percentile(timings, 95)), 3),
+        'p99_ms': round(float(np.percentile(timings, 99)), 3),
+        'max_ms': round(max(timings), 3),
+        'response_bytes_p50': int(np.percentile(sizes, 50)),
+        'response_bytes_max': max(sizes),
+        'alloc_peak_kb_p50': round(float(np.percentile(peaks, 50)) / 1024, 1),
+        'alloc_peak_kb_max': round(max(peaks) / 1024, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    header = f"{'callback':<30}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'bytes p50':>12}{'bytes max':>12}{'alloc KB':>10}"
+    print(header)
+    print('-' * len(header))
+    for name, r in results.items():
+        print(f"{name:<30}{r['calls']:>7}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['response_bytes_p50']:>12,}{r['response_bytes_max']:>12,}{r['alloc_peak_kb_p50']:>10,.0f}")
+
+
+def compare_to_baseline(results, baseline, threshold, min_ms):
+    """
+    Regressions against a saved baseline: p95 latency or median response size more than `threshold`
+    (fraction) above the baseline. Latency differences under `min_ms` are treated as noise.
+    """
+    regressions = []
+    for name, r in results.items():
+        base = baseline['callbacks'].get(name)
+        if base is None:
+            continue
+        if r['p95_ms'] > base['p95_ms'] * (1 + threshold) and r['p95_ms'] - base['p95_ms'] > min_ms:
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} ms -> {r['p95_ms']:.2f} ms")
+        if r['response_bytes_p50'] > base['response_bytes_p50'] * (1 + threshold):
+            regressions.append(f"{name}: response size p50 {base['response_bytes_p50']:,} -> {r['response_bytes_p50']:,} bytes")
+    return regressions
+
+
+def check_metrics():
+    """
+    Errors from the data registry report and the /metrics endpoint, which measure every artifact the
+    callbacks loaded (indexes and stores included); empty if both work.
+    """
+    errors = []
+    try:
+        data_registry.report()
+    except Exception as e:
+        errors.append(f"data_registry.report() raised {e!r}")
+    response = main_app.app.server.test_client().get("/metrics")
+    if response.status_code != 200:
+        errors.append(f"GET /metrics returned {response.status_code}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Dash callbacks in main_app.py")
+    parser.add_argument('--callbacks', nargs='+', help="Only benchmark these callbacks")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed rounds over each callback's input set")
+    parser.add_argument('--cache', choices=['cold', 'warm'], default='cold',
+                        help="cold: clear the figure cache before every call, warm: keep it")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=default_baseline)
+    parser.add_argument('--save', action='store_true', help="Write the results to the baseline file")
+    parser.add_argument('--compare', action='store_true', help="Exit non-zero if any callback regressed against the baseline")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed fractional increase before a regression is reported")
+    parser.add_argument('--min_ms', type=float, default=2.0, help="Ignore p95 increases smaller than this")
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    # no background patient prefetching while callbacks are timed
+    patient_prefetcher.max_workers = 0
+    cases = build_cases(random.Random(args.seed))
+    names = args.callbacks or list(cases)
+
+    results = {}
+    for name in names:
+        print(f"benchmarking {name} ({len(cases[name])} inputs)")
+        results[name] = benchmark_callback(name, cases[name], args.repeat, args.cache, args.seed)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'dash': dash.__version__,
+            'plotly': plotly.__version__,
+            'cache': args.cache,
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'precomputed_views': len(load_manifest()),
+        },
+        'callbacks': results,
+    }
+    print()
+    print_results(results)
+
+    metrics_errors = check_metrics()
+    for error in metrics_errors:
+        print(f"error: {error}")
+
+    for file_path in filter(None, [args.output, args.baseline if args.save else None]):
+        with open(file_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"results saved to: {file_path}")
+
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('cache') != args.cache:
+            print(f"warning: baseline was recorded with --cache {baseline['meta'].get('cache')}")
+        regressions = compare_to_baseline(results, baseline, args.threshold, args.min_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline} (commit {baseline['meta'].get('commit')}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nno regressions against {args.baseline}")
+
+    if metrics_errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
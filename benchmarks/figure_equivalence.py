@@ -0,0 +1,195 @@
+"""
+Checks that the figures built from prevalidated templates (src/tabs/figure_builder.py) are the figures the
+go.Figure builders made before them (kept in benchmarks/reference_figures.py): both are serialized the way
+Dash sends them and must match, with floats compared at the significant digits callback responses are sent
+with (RESPONSE_FLOAT_DIGITS) and float arrays at the dtype figures send them in (FIGURE_FLOAT_DTYPE). Also
+times each builder against its reference.
+
+Run from the repository root:
+
+    python -m benchmarks.figure_equivalence                      # exits non-zero on any difference
+    python -m benchmarks.figure_equivalence --num_counties 200 --num_patients 100
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from dash import dcc
+from dash._utils import to_json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import reference_figures
+from src.tabs import ai_patient_view, county_view, measure_view, overall_view
+from src.tabs.figure_builder import float_array_dtype
+from src.tabs.geojson_assets import get_counties_geojson
+from src.tabs.response_encoding import float_digits
+
+
+def build_cases(rng, num_counties=20, num_measures=5, num_patients=20):
+    """
+    (figure builder, label, build, reference) tuples: zero-argument functions returning a figure or list of
+    figures from the current builder and from its reference.
+    """
+    df_ranking = overall_view.get_df_ranking()
+    states = list(overall_view.get_available_states())
+    selections = [None, ['No such state']] + [[state] for state in rng.sample(states, 5)] + [rng.sample(states, 3)]
+    gam_output = overall_view.get_gam_output()
+
+    cases = []
+    for selection in selections:
+        cases.append(('summary map', selection,
+                      lambda s=selection: overall_view.create_updated_map(df_ranking, s),
+                      lambda s=selection: reference_figures.create_updated_map(df_ranking, s)))
+        cases.append(('summary scatter', selection,
+                      lambda s=selection: overall_view.create_updated_scatter_chart(df_ranking, s),
+                      lambda s=selection: reference_figures.create_updated_scatter_chart(df_ranking, s, *gam_output)))
+    for measure in rng.sample(measure_view.get_available_measures(), num_measures):
+        for selection in selections:
+            cases.append(('measure map', (measure, selection),
+                          lambda m=measure, s=selection: measure_view.create_updated_map_measures(s, m),
+                          lambda m=measure, s=selection: reference_figures.create_updated_map_measures(s, m)))
+
+    county_index = county_view.get_county_index()
+    county_rows = df_ranking[['StateDesc', 'LocationName']].drop_duplicates().values.tolist()
+    for state, county in rng.sample(county_rows, num_counties):
+        fips_county, fips_county_bea = county_index.lookup(state, county)
+        cases.append(('county map', county,
+                      lambda s=state, c=county: county_view.create_county_map(s, c, get_counties_geojson()),
+                      lambda s=state, c=county: reference_figures.create_county_map(s, c, get_counties_geojson())))
+        cases.append(('county health chart', county,
+                      lambda f=fips_county: county_view.create_county_health_charts(f),
+                      lambda f=fips_county: reference_figures.create_county_health_charts(f)))
+        cases.append(('county econ charts', county,
+                      lambda f=fips_county_bea: list(county_view.create_county_econ_charts(f)),
+                      lambda f=fips_county_bea: list(reference_figures.create_county_econ_charts(f))))
+
+    patient_ids = list(ai_patient_view.get_all_patient_ids())
+    for patient_id in rng.sample(patient_ids, min(num_patients, len(patient_ids))) + ['no such patient']:
+        labs, vital_signs, qols_scores = ai_patient_view.get_labs_for_single_patient(patient_id)
+        cases.append(('lab charts', patient_id,
+                      lambda d=labs: ai_patient_view.create_charts_patient(d),
+                      lambda d=labs: reference_figures.create_charts_patient(d)))
+        cases.append(('vital signs charts', patient_id,
+                      lambda d=vital_signs: ai_patient_view.create_vital_signs_charts(d),
+                      lambda d=vital_signs: reference_figures.create_vital_signs_charts(d)))
+        cases.append(('qols chart', patient_id,
+                      lambda d=qols_scores: ai_patient_view.create_qols_chart(d),
+                      lambda d=qols_scores: reference_figures.create_qols_chart(d)))
+    return cases
+
+
+def typed_array_values(spec):
+    """Values of a plotly typed array (base64 `bdata`), floats as `float_array_dtype` as the builders send them."""
+    array = np.frombuffer(base64.b64decode(spec['bdata']), dtype=spec['dtype'])
+    if array.dtype.kind == 'f':
+        array = array.astype(float_array_dtype)
+    return array.tolist()
+
+
+def rounded(value, digits=float_digits):
+    """
+    JSON value with its floats rounded to `digits` significant digits (0 leaves them as they are) and typed
+    arrays decoded, so float64 arrays of the references compare with the builders' narrowed ones.
+    """
+    if isinstance(value, dict) and 'bdata' in value and 'dtype' in value:
+        return {'typed_array': typed_array_values(value), 'shape': value.get('shape')}
+    if isinstance(value, dict):
+        return {key: rounded(item, digits) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rounded(item, digits) for item in value]
+    if isinstance(value, float) and digits:
+        return float(f"{value:.{digits}g}")
+    return value
+
+
+def serialized(figure):
+    """
+    The figure as Dash sends it in a dcc.Graph. Floats are rounded as in callback responses: the template
+    builders' plotly templates are already trimmed to those digits, the references' are not. Typed arrays are
+    compared by value, with the references' floats narrowed to FIGURE_FLOAT_DTYPE.
+    """
+    return rounded(json.loads(to_json(dcc.Graph(figure=figure))))
+
+
+def first_difference(a, b, path=''):
+    """Path of the first value that differs between two JSON values, or None."""
+    if type(a) is not type(b):
+        return f"{path}: {type(a).__name__} != {type(b).__name__}"
+    if isinstance(a, dict):
+        for key in sorted(set(a) | set(b)):
+            if key not in a or key not in b:
+                return f"{path}.{key}: missing on one side"
+            difference = first_difference(a[key], b[key], f"{path}.{key}")
+            if difference:
+                return difference
+    elif isinstance(a, list):
+        if len(a) != len(b):
+            return f"{path}: {len(a)} != {len(b)} items"
+        for i, (item_a, item_b) in enumerate(zip(a, b)):
+            difference = first_difference(item_a, item_b, f"{path}[{i}]")
+            if difference:
+                return difference
+    elif a != b:
+        return f"{path}: {str(a)[:60]!r} != {str(b)[:60]!r}"
+    return None
+
+
+def as_list(figures):
+    return figures if isinstance(figures, list) else [figures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check template-built figures against the go.Figure builders they replaced")
+    parser.add_argument('--num_counties', type=int, default=20)
+    parser.add_argument('--num_measures', type=int, default=5)
+    parser.add_argument('--num_patients', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cases = build_cases(random.Random(args.seed), args.num_counties, args.num_measures, args.num_patients)
+    # templates are built on first use; keep that out of the timings
+    for _, _, build, _ in cases:
+        build()
+
+    timings = {}
+    mismatches = []
+    for name, label, build, reference in cases:
+        start = time.perf_counter()
+        figures = as_list(build())
+        built = time.perf_counter()
+        reference_figures_ = as_list(reference())
+        referenced = time.perf_counter()
+        build_ms, reference_ms = timings.get(name, (0.0, 0.0))
+        timings[name] = (build_ms + (built - start) * 1000, reference_ms + (referenced - built) * 1000)
+
+        if len(figures) != len(reference_figures_):
+            mismatches.append(f"{name} {label}: {len(figures)} figures != {len(reference_figures_)}")
+            continue
+        for i, (figure, reference_figure) in enumerate(zip(figures, reference_figures_)):
+            difference = first_difference(serialized(figure), serialized(reference_figure))
+            if difference:
+                mismatches.append(f"{name} {label} [{i}] {difference}")
+
+    counts = {}
+    for name, _, _, _ in cases:
+        counts[name] = counts.get(name, 0) + 1
+    print(f"{'figure builder':<22} {'cases':>6} {'build ms':>9} {'go.Figure ms':>13}")
+    for name, (build_ms, reference_ms) in timings.items():
+        print(f"{name:<22} {counts[name]:>6} {build_ms / counts[name]:>9.2f} {reference_ms / counts[name]:>13.2f}")
+
+    if mismatches:
+        print(f"\n{len(mismatches)} figure(s) differ from the go.Figure builders:")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        sys.exit(1)
+    print(f"\nall {len(cases)} cases match the go.Figure builders")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+HTTP load generator for the Dash update endpoint (`/_dash-update-component`).
+
+Sends a weighted mix of Summary, County, Health Measures and AI tab callback requests at a
+given concurrency and reports throughput, latency percentiles and error rates. Run from the
+repository root, either against a server that is already running:
+
+    gunicorn main_app:server -w 2 --threads 4 -b 127.0.0.1:8050
+    python -m benchmarks.load_test --url http://127.0.0.1:8050 --concurrency 8 --duration 30
+
+or let it start gunicorn for every worker/thread combination and compare them:
+
+    python -m benchmarks.load_test --workers 1 2 4 --threads 1 4 --concurrency 8 --duration 30
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.registry import data_registry
+
+# Share of requests per callback; roughly how the tabs are used
+request_mix = {
+    'summary_map': 0.20,
+    'summary_table': 0.15,
+    'county_dropdown': 0.05,
+    'county_charts': 0.15,
+    'county_econ': 0.05,
+    'measure_map': 0.15,
+    'measure_table': 0.15,
+    'ai_patient': 0.07,
+    'ai_patient_card': 0.03,
+}
+
+
+def _prop(component_id, prop, value=None):
+    return {'id': component_id, 'property': prop, 'value': value}
+
+
+def dash_payload(outputs, inputs, changed_prop_ids, state=()):
+    """Request body for /_dash-update-component, as dash-renderer sends it."""
+    outputs = [{'id': component_id, 'property': prop} for component_id, prop in outputs]
+    if len(outputs) == 1:
+        output = f"{outputs[0]['id']}.{outputs[0]['property']}"
+        outputs = outputs[0]
+    else:
+        output = '..' + '...'.join(f"{o['id']}.{o['property']}" for o in outputs) + '..'
+    return {
+        'output': output,
+        'outputs': outputs,
+        'inputs': [_prop(*i) for i in inputs],
+        'changedPropIds': list(changed_prop_ids),
+        'state': [_prop(*s) for s in state],
+    }
+
+
+class RequestFactory:
+    """Random, realistic callback requests drawn from the processed data."""
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        df_summary = data_registry.get('df_summary')
+        self.states = sorted(df_summary['StateDesc'].unique())
+        self.counties = df_summary[['StateDesc', 'LocationName']].drop_duplicates().values.tolist()
+        self.measures = sorted(data_registry.get('df_measures')['Measure_short'].unique())
+        self.patient_ids = sorted(data_registry.get('ai_patient_ids'))
+        self.chart_collapse_ids = ['collapse-vital-signs', 'collapse-charts', 'collapse-qols']
+        self.lock = threading.Lock()
+
+    def state_selection(self):
+        """All states a third of the time, otherwise one to three states."""
+        if self.rng.random() < 1 / 3:
+            return None
+        return self.rng.sample(self.states, self.rng.randint(1, 3))
+
+    def summary_map(self):
+        return dash_payload([('choropleth-map', 'figure'), ('scatter-chart', 'figure')],
+                            [('state-dropdown', 'value', self.state_selection())], ['state-dropdown.value'])
+
+    def summary_table(self):
+        return dash_payload([('state-data-table', 'data'), ('state-data-table', 'style_data_conditional')],
+                            [('state-dropdown', 'value', self.state_selection())], ['state-dropdown.value'])
+
+    def county_dropdown(self):
+        return dash_payload([('county-view-county-dropdown', 'options')],
+                            [('county-view-state-dropdown', 'value', self.rng.choice(self.states))],
+                            ['county-view-state-dropdown.value'])
+
+    def county_charts(self):
+        state, county = self.rng.choice(self.counties)
+        outputs = [('selected-title', 'children'), ('kpi-display', 'children'), ('county-map', 'figure'),
+                   ('county-health-chart', 'figure'), ('econ-pop', 'figure'), ('county-selection', 'data')]
+        inputs = [('interval-component', 'n_intervals', 1), ('show-data-button', 'n_clicks', 1)]
+        state_values = [('county-view-state-dropdown', 'value', state), ('county-view-county-dropdown', 'value', county)]
+        return dash_payload(outputs, inputs, ['show-data-button.n_clicks'], state_values)
+
+    def county_econ(self):
+        state, county = self.rng.choice(self.counties)
+        return dash_payload([('econ-chart-1', 'figure'), ('econ-chart-2', 'figure')],
+                            [('county-selection', 'data', {'state': state, 'county': county}),
+                             ('currency-type', 'value', self.rng.choice(['adj', 'current']))],
+                            ['currency-type.value'])
+
+    def _measure_inputs(self):
+        return [('measure-dropdown', 'value', self.rng.choice(self.measures)),
+                ('measure-view-state-dropdown', 'value', self.state_selection())]
+
+    def measure_map(self):
+        return dash_payload([('measure-view-choropleth-map', 'figure')], self._measure_inputs(), ['measure-dropdown.value'])
+
+    def measure_table(self):
+        return dash_payload([('measure-view-state-data-table', 'data'), ('measure-view-state-data-table', 'style_data_conditional')],
+                            self._measure_inputs(), ['measure-dropdown.value'])
+
+    def ai_patient(self):
+        # requests are independent, so the session's next patient is drawn here rather than taken from a response
+        return dash_payload([('ai-patient-view-content', 'children'), ('ai-patient-id', 'data'), ('ai-next-patient-id', 'data')],
+                            [('generate-random-patient-button', 'n_clicks', self.rng.randint(1, 1000))],
+                            ['generate-random-patient-button.n_clicks'],
+                            [('ai-next-patient-id', 'data', self.rng.choice(self.patient_ids))])
+
+    def ai_patient_card(self):
+        """Opening one of a patient's chart cards for the first time."""
+        collapse_id = self.rng.choice(self.chart_collapse_ids)
+        return dash_payload([(f'{collapse_id}-body', 'children')],
+                            [(collapse_id, 'is_open', True)], [f'{collapse_id}.is_open'],
+                            [('ai-patient-id', 'data', self.rng.choice(self.patient_ids)), (f'{collapse_id}-body', 'children', None)])
+
+    def next_request(self):
+        with self.lock:
+            kind = self.rng.choices(list(request_mix), weights=list(request_mix.values()))[0]
+            return kind, getattr(self, kind)()
+
+
+def send(url, payload, timeout):
+    """POST one callback request; returns (status, response bytes as sent, seconds, error)."""
+    # accepts gzip as browsers do; the body is not decompressed, so the bytes are the bytes on the wire
+    request = urllib.request.Request(f"{url}/_dash-update-component", data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json', 'Accept-Encoding': 'gzip'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            return response.status, len(body), time.perf_counter() - start, None
+    except urllib.error.HTTPError as e:
+        return e.code, 0, time.perf_counter() - start, f"HTTP {e.code}"
+    except (urllib.error.URLError, OSError) as e:
+        return None, 0, time.perf_counter() - start, type(e).__name__
+
+
+def summarize(samples, elapsed):
+    latencies_ms = np.array([s['seconds'] for s in samples]) * 1000
+    errors = sum(1 for s in samples if s['error'])
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else None,
+        'throughput_rps': round(len(samples) / elapsed, 2),
+        'p50_ms': round(float(np.percentile(latencies_ms, 50)), 1),
+        'p95_ms': round(float(np.percentile(latencies_ms, 95)), 1),
+        'p99_ms': round(float(np.percentile(latencies_ms, 99)), 1),
+        'mean_kb': round(float(np.mean([s['bytes'] for s in samples])) / 1024, 1),
+    }
+
+
+def run_load(url, concurrency, duration, warmup_requests=20, timeout=60, seed=0):
+    """
+    Keep `concurrency` requests in flight for `duration` seconds.
+
+    Returns:
+        dict: Overall throughput, latency percentiles and error rate, plus the same per request kind.
+    """
+    factory = RequestFactory(seed)
+    for _ in range(warmup_requests):
+        send(url, factory.next_request()[1], timeout)
+
+    samples = []
+    samples_lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            kind, payload = factory.next_request()
+            status, nbytes, seconds, error = send(url, payload, timeout)
+            with samples_lock:
+                samples.append({'kind': kind, 'status': status, 'bytes': nbytes, 'seconds': seconds, 'error': error})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(client)
+    elapsed = time.perf_counter() - start
+
+    if not samples:
+        raise RuntimeError(f"no requests completed within {duration}s")
+    result = summarize(samples, elapsed)
+    result['by_kind'] = {kind: summarize([s for s in samples if s['kind'] == kind], elapsed)
+                         for kind in request_mix if any(s['kind'] == kind for s in samples)}
+    error_kinds = sorted({s['error'] for s in samples if s['error']})
+    if error_kinds:
+        result['error_kinds'] = error_kinds
+    return result
+
+
+def wait_until_ready(url, process, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"{url}/_dash-layout", timeout=5):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    raise RuntimeError(f"server at {url} not ready after {timeout}s")
+
+
+def start_gunicorn(workers, threads, port):
+    command = [sys.executable, '-m', 'gunicorn', 'main_app:server', '--workers', str(workers), '--threads', str(threads),
+               '--bind', f'127.0.0.1:{port}', '--timeout', '120', '--log-level', 'warning']
+    return subprocess.Popen(command, start_new_session=True)
+
+
+def stop_gunicorn(process):
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def print_result(label, result):
+    print(f"{label:<24}{result['requests']:>9}{result['throughput_rps']:>10.1f}{result['p50_ms']:>10.1f}"
+          f"{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['error_rate'] * 100:>9.1f}%")
+
+
+def print_header(first_column):
+    header = f"{first_column:<24}{'requests':>9}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>10}"
+    print(header)
+    print('-' * len(header))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /_dash-update-component with a realistic request mix")
+    parser.add_argument('--url', help="Base URL of a running server; if omitted, gunicorn is started for each --workers/--threads combination")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1], help="gunicorn worker counts to sweep")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1], help="gunicorn thread counts to sweep")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--concurrency', type=int, default=8, help="Requests kept in flight")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of load per configuration")
+    parser.add_argument('--warmup_requests', type=int, default=20)
+    parser.add_argument('--timeout', type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write all results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    if args.url:
+        result = run_load(args.url.rstrip('/'), args.concurrency, args.duration, args.warmup_requests, args.timeout, args.seed)
+        results.append({'url': args.url, 'concurrency': args.concurrency, **result})
+    else:
+        url = f"http://127.0.0.1:{args.port}"
+        for workers in args.workers:
+            for threads in args.threads:
+                print(f"starting gunicorn with {workers} worker(s) x {threads} thread(s)")
+                process = start_gunicorn(workers, threads, args.port)
+                try:
+                    wait_until_ready(url, process)
+                    result = run_load(url, args.concurrency, args.duration, args.warmup_requests, args.timeout, args.seed)
+                finally:
+                    stop_gunicorn(process)
+                results.append({'workers': workers, 'threads': threads, 'concurrency': args.concurrency, **result})
+
+    print()
+    print_header('configuration')
+    for result in results:
+        label = result['url'] if 'url' in result else f"{result['workers']} workers x {result['threads']} threads"
+        print_result(label, result)
+    if len(results) == 1:
+        print()
+        print_header('request kind')
+        for kind, kind_result in results[0]['by_kind'].items():
+            print_result(kind, kind_result)
+    for result in results:
+        if result.get('error_kinds'):
+            print(f"errors seen: {', '.join(result['error_kinds'])}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,784 @@
+"""
+The figure builders as they were before src/tabs/figure_builder.py: every figure made with go.Figure,
+go.Choropleth and make_subplots, so each call runs plotly's validation. Kept unchanged (only their data
+access points at the current modules) as the reference benchmarks/figure_equivalence.py checks the
+template-built figures against.
+"""
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from src.tabs.county_view import fips_usa, get_bea_cube, get_county_index
+from src.tabs.geojson_assets import get_counties_geojson
+from src.tabs.measure_view import filter_map_measure_states, map_customdata, measure_hovertemplate
+from src.tabs.overall_view import (filter_map_states, map_customdata_columns, scatter_customdata_columns,
+                                   scatter_trace_type, summary_scale)
+
+
+####################
+###### Summary #####
+####################
+
+def create_updated_scatter_chart(df,selected_state,x_pred, y_pred, y_intervals, pseudo_r2_value):
+
+    scale = summary_scale()
+
+    # Filter by State (if any are selected)
+    if selected_state:
+        filtered_df = df[df['StateDesc'].isin(selected_state)]
+    else:
+        filtered_df = df
+
+    # Hover labels are formatted in the browser from customdata (GEOID first, as before)
+    hovertemplate = (
+        '%{customdata[1]}, %{customdata[2]}<br>'
+        'UnHealth Score: %{y:.2f}<br>'
+        'Rank: %{customdata[3]:,.0f} of ' + str(scale['num_counties']) + '<br>'
+        'Per capita personal income: %{x:,.0f}<br>'
+        'Population: %{customdata[4]:,.0f}<br>'
+        '%{customdata[5]}'
+        '<extra></extra>'
+    )
+
+    
+    fig_scatter = go.Figure()
+    # Check if there is data after filtering
+    if len(filtered_df) == 0:
+        # If no data, display a message
+        fig_scatter.update_layout(
+            xaxis={'visible': False},  
+            yaxis={'visible': False}, 
+            annotations=[
+                {
+                    'text': 'No data available for this state or county',
+                    'xref': 'paper',
+                    'yref': 'paper',
+                    'showarrow': False,
+                    'font': {'size': 20}
+                }
+            ],
+            paper_bgcolor="black",  
+            plot_bgcolor="black",  
+            font=dict(color="white"),  
+        )
+    else:
+        scatter_plot = scatter_trace_type(len(filtered_df))(
+            x=filtered_df['Per capita personal income'],
+            y=filtered_df['Weighted_Score_Normalized'],
+            mode='markers',
+            marker=dict(
+                color=filtered_df['Weighted_Score_Normalized'],
+                colorscale='RdYlGn_r',  # Red-Yellow-Green color scale
+                cmin=scale['percentile_low'],  
+                cmax=scale['percentile_high'],  
+                line=dict(
+                    width=.2,
+                    color='black'
+                )
+            ),
+            hovertemplate=hovertemplate,
+            customdata=filtered_df[scatter_customdata_columns],
+            name='County'
+        )
+
+
+        # Add the GAM trend line
+        trend_line = go.Scatter(x=x_pred['Per capita personal income'], y=y_pred, mode='lines', 
+                                name='GAM Model (all counties)', 
+                                line=dict(color='darkgrey', width=5),
+                                hovertemplate='Per capita personal income: %{x:,.0f}<br>UnHealth Score (predicted): %{y:.2f}<br>GAM Model Pseudo R²: ' + str(round(pseudo_r2_value, 2))
+)
+
+        # Add prediction intervals
+        lower_interval = go.Scatter(
+            x=x_pred['Per capita personal income'],
+            y=y_intervals[:, 0],
+            mode='lines',
+            line=dict(color='lightgrey', width=1, dash='dot'),  
+            name='Lower Interval',
+            showlegend=False
+        )
+
+        upper_interval = go.Scatter(
+            x=x_pred['Per capita personal income'],
+            y=y_intervals[:, 1],
+            fill='tonexty',
+            mode='lines',
+            line=dict(color='lightgrey', width=1, dash='dot'),  
+            name='80% Prediction Interval',
+            fillcolor='rgba(150, 150, 150, 0.3)',  
+            showlegend=True
+        )
+
+        fig_scatter.add_trace(scatter_plot)
+        fig_scatter.add_trace(lower_interval)
+        fig_scatter.add_trace(upper_interval)
+        fig_scatter.add_trace(trend_line)
+
+        fig_scatter.update_layout(
+            height=600,
+            title='Income per Capita and UnHealth Score',
+            title_x=0.5,  
+            title_font=dict(size=24), 
+            margin=dict(l=0, r=0, t=40, b=0),
+            xaxis=dict(title='Income per Capita',range=[scale['min_x'],200000], showgrid=False, linecolor='darkgrey', linewidth=1),  # Hide grid lines and set axis line color
+            yaxis=dict(range=[0, 101], showgrid=False, linecolor='darkgrey', linewidth=1),  # Hide grid lines and set axis line color
+            yaxis_title='UnHealth Score',
+            coloraxis_showscale=False,
+            
+            legend=dict(
+                x=0.74,
+                y=.90,
+                traceorder="normal",
+                font=dict(
+                    family="sans-serif",
+                    size=12,
+                    color="white"
+                ),
+                bordercolor="gray",
+                borderwidth=1
+            ),
+            paper_bgcolor="black",  # Background color
+            plot_bgcolor="black",  # Plot area background color
+            font=dict(color="white"),  # Text color
+        )
+    fig_scatter.update_xaxes(zeroline=True, zerolinewidth=0.5, zerolinecolor="gray")
+    fig_scatter.update_yaxes(zeroline=True, zerolinewidth=0.5, zerolinecolor="gray")
+
+    fig_scatter.update_layout(
+        autosize=False,  
+    )
+    return fig_scatter
+
+
+
+def create_updated_map(df, selected_state):
+    
+    scale = summary_scale()
+    filtered_df_by_state = filter_map_states(df, selected_state)
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Choropleth(
+        geojson=get_counties_geojson(),
+        featureidkey="properties.GEOID",
+        locations=filtered_df_by_state['GEOID'],
+        z=filtered_df_by_state.Weighted_Score_Normalized,
+        colorscale="RdYlGn_r",
+        customdata=filtered_df_by_state[map_customdata_columns],
+        hovertemplate = (
+            '%{customdata[1]}, %{customdata[2]}<br>'
+            'UnHealth Score: %{customdata[4]:.2f}<br>'
+            'Rank: %{customdata[3]} of ' + str(scale['num_counties']) + '<br>'
+            'Per capita personal income: %{customdata[5]:,.0f}<br>'
+            'Population: %{customdata[6]:,.0f}<br>'
+            '%{customdata[7]}'
+        ),
+        marker_line_width=0,
+        colorbar=dict(
+            thickness=15,
+            len=0.5,
+            tickformat="0",
+            x=0.05,  
+            xpad=0,  
+            tickfont=dict(color='white'), 
+        ),
+        zmin=scale['percentile_low'],
+        zmax=scale['percentile_high'],
+        showscale=True,
+        name=""
+        )
+    )
+
+    fig.update_layout(
+        height=600,
+        geo=dict(
+            scope="usa",
+            lakecolor='black',
+            landcolor='black',
+            bgcolor='black',
+            subunitcolor='darkgrey',
+            showlakes=True,
+            showsubunits=True,
+            showland=True,
+            showcountries=False,
+            showcoastlines=True,
+            countrycolor='darkgrey',
+        ),
+        paper_bgcolor='black',
+        plot_bgcolor='black',
+        title_text='UnHealth Score',
+        title_x=0.5,  
+        margin=dict(l=0, r=0, t=40, b=0),
+        title_font=dict(size=24, color='white'),
+        
+    )
+
+    fig.add_annotation(
+        text="Color scale represents<br>5th to 95th percentile",
+        align='left',
+        showarrow=False,
+        xref='paper', yref='paper',
+        x=0.95, y=0.15,
+        bgcolor="black",  
+        bordercolor="gray",  
+        borderpad=4,
+        font=dict(color='white')  
+    )
+
+    fig.update_layout(
+        autosize=False,  
+    )
+    return fig
+
+
+
+####################
+## Health Measures #
+####################
+
+def create_updated_map_measures(selected_state, selected_measure):
+
+    columns, percentile_low, percentile_high = filter_map_measure_states(selected_state, selected_measure)
+
+    fig = go.Figure()
+
+
+
+    # Create the choropleth map
+    fig = go.Figure(go.Choropleth(
+        geojson=get_counties_geojson(),
+        featureidkey="properties.GEOID",
+        locations=columns['GEOID'],
+        z=columns['Data_Value'],
+        colorscale="RdYlGn_r",
+        hovertemplate=measure_hovertemplate(selected_measure),
+        customdata=map_customdata(columns),
+        #colorbar=dict(thickness=15, len=0.5, tickformat=".1%"),
+        marker_line_width=0,
+        colorbar=dict(
+            thickness=15,
+            len=0.5,
+            tickformat=".1%",
+            x=0.05,  # Adjust this value to move the colorbar closer
+            xpad=0,  # Adjust padding if needed
+            tickfont=dict(color='white'),  # Set tick font color
+        ),
+        zmin=percentile_low,
+        zmax=percentile_high,
+        showscale=True,
+        name=""
+        )
+    )
+
+    fig.update_layout(
+        geo=dict(
+            scope="usa",
+            lakecolor='black',
+            landcolor='black',
+            bgcolor='black',
+            subunitcolor='darkgrey',
+            showlakes=True,
+            showsubunits=True,
+            showland=True,
+            showcountries=False,
+            showcoastlines=True,
+            countrycolor='darkgrey',
+        ),
+        paper_bgcolor='black',
+        plot_bgcolor='black',
+        title_text=f'Percent: {selected_measure}',
+        title_x=0.5,  # Center the title
+        margin=dict(l=0, r=0, t=40, b=0),
+        title_font=dict(size=24, color='white'),
+        
+    )
+
+    fig.add_annotation(
+        text="Color scale represents<br>5th to 95th percentile",
+        align='left',
+        showarrow=False,
+        xref='paper', yref='paper',
+        x=0.95, y=0.15,
+        bgcolor="black",  # Set background color
+        bordercolor="gray",  # Set border color
+        borderpad=4,
+        font=dict(color='white')  # Set text color
+    )
+
+    fig.update_layout(
+        autosize=True,  # Enable autosize
+        height=600,
+    )
+    return fig
+
+
+
+
+####################
+###### County ######
+####################
+
+def create_county_econ_charts(fips_county_bea):
+
+    colors = ['#636efa', '#ef553b']  # Default colors for plotly_dark theme
+    bea_cube = get_bea_cube()
+    # the USA, then the county (when BEA has it)
+    geos = [fips for fips in dict.fromkeys([fips_usa, fips_county_bea]) if fips in bea_cube]
+
+    def statistic_traces(statistic):
+        traces = []
+        for i, geo in enumerate(geos):
+            years, values = bea_cube.series(geo, statistic)
+            traces.append(go.Scatter(x=years, y=values, mode='lines', name=bea_cube.geo_names[geo], line=dict(color=colors[i])))
+        return traces
+
+    # CPI Adjusted per Capita Income
+    traces = statistic_traces('CPI Adjusted Per Capita Income')
+
+    # Create the layout
+    layout = go.Layout(title='Income per Capita:<br>CPI Adjusted (~1983 dollars, counties with regional CPI)',
+                    xaxis=dict(title=''),
+                    yaxis=dict(title='Income per Capita (adjusted)'),
+                    template='plotly_dark',
+                    legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
+                    )
+
+    # Create the figure
+    fig_adj_income = go.Figure(data=traces, layout=layout)
+
+    
+    # Per Capita Income
+    #######
+    traces = statistic_traces('Per capita personal income')
+
+    # Create the layout
+    layout = go.Layout(title='Income per Capita:<br>Current Dollars',
+                    xaxis=dict(title=''),
+                    yaxis=dict(title='Income per Capita (current)'),
+                    template='plotly_dark',
+                    legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
+                    )
+
+    # Create the figure
+    fig_income = go.Figure(data=traces, layout=layout)
+
+    # Adj GDP per Capita
+    ##########################
+
+    traces = statistic_traces('Real GDP Per Capita')
+
+    # Create the layout
+    layout = go.Layout(title='GDP per Capita:<br>Adjusted (2017 dollars)',
+                    xaxis=dict(title=''),
+                    yaxis=dict(title='GDP per Capita (adjusted)'),
+                    template='plotly_dark',
+                    legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
+                    )
+
+    # Create the figure
+    fig_real_gdp = go.Figure(data=traces, layout=layout)
+
+    # Current Dollar GDP per Capita
+    #################
+
+    traces = statistic_traces('Current-dollar GDP Per Capita')
+
+    # Create the layout
+    layout = go.Layout(title='GDP per Capita:<br>Current Dollars',
+                    xaxis=dict(title=''),
+                    yaxis=dict(title='GDP per Capita (current)'),
+                    template='plotly_dark',
+                    legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
+                    )
+
+    # Create the figure
+    fig_gdp = go.Figure(data=traces, layout=layout)
+    
+
+    # Population, only the county
+    geo_name = bea_cube.geo_names[geos[-1]]
+    if geos[-1] != fips_usa:
+        years, values = bea_cube.series(geos[-1], 'Population')
+    else:
+        years, values = [], []
+
+    trace = go.Scatter(x=years,
+                    y=values,
+                    mode='lines',
+                    name=geo_name,line=dict(color=colors[1]))
+
+    # Create the layout
+    layout = go.Layout(title=f'{geo_name} Population',
+                    xaxis=dict(title=''),
+                    yaxis=dict(title='Population'),
+                    template='plotly_dark',
+                    legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
+                    )
+
+    # Create the figure
+    fig_pop = go.Figure(data=trace, layout=layout)
+
+
+    return fig_adj_income, fig_income, fig_real_gdp, fig_gdp, fig_pop
+
+
+
+def create_county_health_charts(fips_county='01011'):
+    
+    county_index = get_county_index()
+    df_ranking_county = county_index.summary_row(fips_county)
+    df_county_measures = county_index.county_measures(fips_county)
+
+    custom_color_scale = {
+        'Disability': '#673AB7',  
+        'Health Outcomes': '#FFA726',  
+        'Health Risk Behaviors': '#FFEB3B',  
+        'Health Status': '#D32F2F',  
+        'Prevention': '#4CAF50'  
+    }
+    categories = df_county_measures['Category'].unique()
+    color_scale = {category: custom_color_scale.get(category, '#000000') for category in categories}  # Default to black if not found
+
+    sorted_df = df_county_measures.sort_values(by='absolute_contribution', ascending=False)
+
+    # Group by 'Category' and sum the 'percent_contribution'
+    grouped_df = df_county_measures.groupby('Category', observed=True)['absolute_contribution'].sum().reset_index()
+
+    # Sort the grouped DataFrame by 'percent_contribution' in ascending order
+    sorted_grouped_df = grouped_df.sort_values(by='absolute_contribution', ascending=False)
+    # sorted_categories = sorted_grouped_df['Category'].tolist()
+
+    fixed_order = [
+        'Health Outcomes',
+        'Disability', 
+        'Prevention',
+        'Health Status',
+        'Health Risk Behaviors',
+    ]
+    # Ensure all categories from the data are included in the fixed order
+    sorted_categories = [cat for cat in fixed_order if cat in categories]
+
+    sorted_df['Category'] = pd.Categorical(sorted_df['Category'], categories=sorted_categories, ordered=True)
+    sorted_df = sorted_df.sort_values(by=['Category', 'Data_Value'], ascending=[True, True])
+    total = df_ranking_county['Weighted_Score_Normalized'].iloc[0].round(2)
+
+    ###################################
+
+    fig = make_subplots(rows=1, cols=2, column_widths=[0.75, 0.25], 
+                        subplot_titles=('CDC PLACES<br>Health Survey Results',
+                                        f"Contribution by Category<br>UnHealth Score Total: {total}"),
+                                        )
+    fig.update_yaxes(domain=[0.02, 0.98], row=1, col=1)  # Adjust domains as needed
+    fig.update_yaxes(domain=[0.02, 0.98], row=1, col=2)
+    # Map 'Category' to colors for the first chart
+    colors_mapped = sorted_df['Category'].map(color_scale).tolist()
+
+    # Add the first chart to the first column
+    fig.add_trace(go.Bar(x=sorted_df['Data_Value'], y=sorted_df['Measure_short'],
+                        orientation='h', marker_color=colors_mapped,
+                        hovertemplate='%{y}: %{x:.2f}%<br>Contribution to UnHealth Score: %{customdata[1]:.2f}',
+                        customdata=sorted_df[['Data_Value','absolute_contribution']],
+                        name=''),
+                row=1, col=1)
+
+    for category in sorted_categories:
+        df_filtered = sorted_grouped_df[sorted_grouped_df['Category'] == category]
+        fig.add_trace(go.Bar(y=df_filtered['absolute_contribution'], x=[1]*len(df_filtered),
+                            name=category, marker_color=color_scale[category],
+                            text=category, orientation='v',
+                            hovertemplate='Total category contribution: %{y:.2f}'),  
+                    row=1, col=2)
+
+
+    fig.update_layout(
+        title={
+            'text': f"{sorted_df.iloc[0].LocationName}, {sorted_df.iloc[0].StateDesc}",
+            #'y':0.9,
+            'x':0.5,
+            'xanchor': 'center',
+            'yanchor': 'top',
+            'font': {
+                'size': 28,   # Set the font size here
+                'family': "Arial, sans-serif",   # Optional: set the font family
+                'color': "white"   # Optional: set the font color
+            }
+        },
+        
+        template='plotly_dark', showlegend=False, 
+                    
+                    barmode='stack',
+                    margin=dict(t=150),)
+
+    fig.update_xaxes(title_text="Percent", row=1, col=1)
+    fig.update_yaxes(title_text="", row=1, col=1)
+    fig.update_xaxes(showticklabels=False, row=1, col=2)
+    fig.update_yaxes(title_text="UnHealth Score", range=[0, total],
+                     row=1, col=2)
+
+    fig.update_traces(textposition='inside', textangle=0, insidetextanchor='middle', 
+                    textfont=dict(size=18), selector=dict(orientation='v'))
+
+    return fig
+
+
+
+##############
+# County map
+def create_county_map(selected_state, selected_county, counties):
+    # same 5th/95th percentile colour scale and county count as the Summary map
+    scale = summary_scale()
+    
+    # Filter the dataframe based on selected_state and selected_county
+    
+    county_index = get_county_index()
+    filtered_df = county_index.summary_row(county_index.lookup(selected_state, selected_county)[0])
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Choropleth(
+        geojson=counties,
+        featureidkey="properties.GEOID",
+        locations=filtered_df['GEOID'],
+        z=filtered_df.Weighted_Score_Normalized,
+        colorscale="RdYlGn_r",
+        customdata=filtered_df[['GEOID', 'LocationName', 'StateDesc', 'Rank', 'Weighted_Score_Normalized']],
+        hovertemplate='%{customdata[1]} County, %{customdata[2]}<br>Score: %{customdata[4]:.2f}<br>Rank: %{customdata[3]} of ' + str(scale['num_counties']) + '<extra></extra>',
+        marker_line_width=0,
+        colorbar=dict(
+            thickness=15,
+            len=0.5,
+            tickformat="0",
+            x=0.05,
+            xpad=0,
+            tickfont=dict(color='white'),
+        ),
+        zmin=scale['percentile_low'],
+        zmax=scale['percentile_high'],
+        showscale=True,
+        name=""
+    ))
+
+
+    fig.update_geos(
+        visible=True, 
+        resolution=50,
+        scope="usa",
+        showsubunits=True,
+        subunitcolor="Gray",
+        showcountries=True,
+        showcoastlines=True,
+        fitbounds="locations",
+    )
+
+    fig.update_layout(
+        geo=dict(
+            scope="usa",
+            lakecolor='black',
+            landcolor='black',
+            bgcolor='black',
+            subunitcolor='darkgrey',
+            showlakes=True,
+            showland=True,
+            showcountries=True,
+            showcoastlines=True,
+            countrycolor='darkgrey',
+        ),
+        paper_bgcolor='black',
+        plot_bgcolor='black',
+        #title_text='UnHealth Score for ' + selected_county + ', ' + selected_state,
+        title_x=0.5,
+        margin=dict(l=0, r=0, t=40, b=0),
+        title_font=dict(size=20, color='white'),
+    )
+
+    # Add annotation if needed
+    fig.add_annotation(
+        text="Color scale represents<br>5th to 95th percentile",
+        align='left',
+        showarrow=False,
+        xref='paper', yref='paper',
+        x=0.95, y=0.15,
+        bgcolor="black",
+        bordercolor="gray",
+        borderpad=4,
+        font=dict(color='white')
+    )
+
+    fig.update_layout(autosize=False)
+
+    return fig
+
+
+
+####################
+#### AI patient ####
+####################
+
+def create_charts_patient(df_labs_patient):
+
+    if df_labs_patient.empty:
+
+        fig = go.Figure()
+        fig.add_annotation(text="No Lab Results Available",
+                           xref="paper", yref="paper",
+                           x=0.5, y=0.5, showarrow=False,
+                           font=dict(size=32, color="gray"))
+        fig.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+        return [fig]
+    
+    else:
+        color_palette = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', 
+                        '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+        unique_descriptions = df_labs_patient['DESCRIPTION'].unique()
+        color_index = 0
+        figures = []
+
+        for description in unique_descriptions:
+            df_filtered = df_labs_patient[df_labs_patient['DESCRIPTION'] == description]
+            unique_units = df_filtered['UNITS'].unique()
+            
+            if len(unique_units) == 1:
+                units = unique_units[0]
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=df_filtered['DATE'],
+                    y=df_filtered['VALUE'],
+                    mode='lines+markers',
+                    name=f'{description} ({units})',
+                    line=dict(color=color_palette[color_index])
+                ))
+                fig.update_layout(template="plotly_dark", title_text=description, showlegend=True,
+                                legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top'))
+                fig.update_yaxes(title_text=f'{units}')
+                figures.append(fig)
+                color_index = (color_index + 1) % len(color_palette)
+
+        return figures
+
+
+def create_vital_signs_charts(df_vital_signs_patient):
+
+    if df_vital_signs_patient.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No Vitals Available",
+                           xref="paper", yref="paper",
+                           x=0.5, y=0.5, showarrow=False,
+                           font=dict(size=32, color="gray"))
+        fig.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+        return [fig]
+
+    else:
+        fig_bmi = go.Figure()
+        fig_bmi.add_trace(go.Scatter(
+            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Body mass index (BMI) [Ratio]']['DATE'],
+            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Body mass index (BMI) [Ratio]']['VALUE'],
+            mode='lines+markers',
+            name='BMI (kg/m2)',
+            line=dict(color='#FFA726')  
+        ))
+        fig_bmi.update_layout(template="plotly_dark", title_text="BMI", showlegend=True,
+                                legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
+        )
+        fig_bmi.update_yaxes(title_text="BMI (kg/m2)")
+
+        
+
+        fig_bp = go.Figure()
+        fig_bp.add_trace(go.Scatter(
+            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Diastolic Blood Pressure']['DATE'],
+            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Diastolic Blood Pressure']['VALUE'],
+            mode='lines+markers',
+            name='Diastolic BP (mmHg)',
+            line=dict(color='#673AB7')  # First BP trace color
+        ))
+        fig_bp.add_trace(go.Scatter(
+            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Systolic Blood Pressure']['DATE'],
+            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Systolic Blood Pressure']['VALUE'],
+            mode='lines+markers',
+            name='Systolic BP (mmHg)',
+            line=dict(color='#03A9F4')  # Second BP trace color
+        ))
+        fig_bp.update_layout(template="plotly_dark", title_text="Blood Pressure", showlegend=True,
+                                legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
+        )
+        fig_bp.update_yaxes(title_text="BP (mmHg)")
+        # Find the min and max values across both Diastolic and Systolic BP readings
+        min_bp = min(df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Diastolic Blood Pressure']['VALUE'].min(), 
+                    df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Systolic Blood Pressure']['VALUE'].min())
+        max_bp = max(df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Diastolic Blood Pressure']['VALUE'].max(), 
+                    df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Systolic Blood Pressure']['VALUE'].max())
+
+        #fig_bp.update_yaxes(range=[min_bp - 10, max_bp + 10])  # Adjust buffer as needed
+
+        
+
+        fig_hr_rr = go.Figure()
+        fig_hr_rr.add_trace(go.Scatter(
+            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Heart rate']['DATE'],
+            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Heart rate']['VALUE'],
+            mode='lines+markers',
+            name='Heart Rate (/min)',
+            line=dict(color='#D32F2F')  # Heart rate color
+        ))
+        fig_hr_rr.add_trace(go.Scatter(
+            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Respiratory rate']['DATE'],
+            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Respiratory rate']['VALUE'],
+            mode='lines+markers',
+            name='Respiratory Rate (/min)',
+            line=dict(color='#4CAF50')  # Respiratory rate color
+        ))
+
+        fig_hr_rr.update_layout(template="plotly_dark", title_text="Heart and Respiratory Rate", showlegend=True,
+                                legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top'))
+
+        fig_hr_rr.update_yaxes(title_text="Rate (/min)")
+        
+
+        fig_pain = go.Figure()
+        fig_pain.add_trace(go.Scatter(
+            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION']=='Pain severity - 0-10 verbal numeric rating [Score] - Reported']['DATE'],
+            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION']=='Pain severity - 0-10 verbal numeric rating [Score] - Reported']['VALUE'],
+            mode='lines+markers',
+            name='Pain Severity (0-10)',
+            line=dict(color='#FFEB3B')  # Adjust as necessary
+        ))
+        fig_pain.update_layout(
+            legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
+        )
+        fig_pain.update_layout(template="plotly_dark", title_text="Pain Severity (reported)", showlegend=True)
+        fig_pain.update_yaxes(title_text="Pain Severity (0-10, reported)")
+        
+        return [fig_bmi, fig_bp, fig_hr_rr, fig_pain]
+
+# QOLS
+def create_qols_chart(df_qols_scores_patient):
+
+    if df_qols_scores_patient.empty:
+        fig = go.Figure()
+        fig.add_annotation(text="No Quality of Life Data Available",
+                           xref="paper", yref="paper",
+                           x=0.5, y=0.5, showarrow=False,
+                           font=dict(size=32, color="gray"))
+        fig.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+        return fig
+
+    else:
+        fig = go.Figure()
+
+        fig.add_trace(go.Scatter(
+            x=df_qols_scores_patient['DATE'],
+            y=df_qols_scores_patient['VALUE'],
+            mode='lines+markers',
+            name='QOLS Score'
+        ))
+
+        fig.update_layout(
+            title='QOLS Scores',
+            xaxis_title='Date',
+            yaxis_title='QOLS Score',
+            template="plotly_dark"
+        )
+        fig.update_yaxes(range=[0, 1])  
+
+        return fig
@@ -0,0 +1,132 @@
+"""
+Encode time and bytes on the wire of every callback's responses, before and after the response path in
+src/tabs/response_encoding.py: Dash's own encoding sent uncompressed, against `to_response_json` (orjson,
+trimmed floats) compressed with gzip and brotli at flask-compress's default levels.
+
+Run from the repository root:
+
+    python -m benchmarks.response_encoding
+    python -m benchmarks.response_encoding --callbacks update_charts update_measure_map --output encoding.json
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+import dash
+import numpy as np
+from dash._utils import clean_property_name, to_json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main_app
+from benchmarks.callback_benchmarks import build_cases, run_callback
+from src.tabs.patient_prefetch import patient_prefetcher
+from src.tabs.response_encoding import float_digits, to_response_json
+
+# flask-compress defaults (COMPRESS_LEVEL, COMPRESS_BR_LEVEL)
+gzip_level = 6
+brotli_quality = 4
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def output_props(callback):
+    """(component id, property) of each output of `callback`, and whether it has several, from the callback map."""
+    for key, entry in main_app.app.callback_map.items():
+        if getattr(entry.get('callback'), '__wrapped__', None) is callback:
+            multi = key.startswith('..')
+            specs = key[2:-2].split('...') if multi else [key]
+            return [tuple(spec.rsplit('.', 1)) for spec in specs], multi
+    raise KeyError(f"{callback.__name__} is not registered")
+
+
+def as_response(callback, output):
+    """The response dict Dash encodes for `output`: {'multi': True, 'response': {id: {property: value}}}."""
+    props, multi = output_props(callback)
+    outputs = {}
+    for (component_id, prop), value in zip(props, output if multi else [output]):
+        if value is not dash.no_update:
+            outputs.setdefault(component_id, {})[clean_property_name(prop)] = value
+    return {'multi': True, 'response': outputs}
+
+
+def measure_callback(name, cases, repeat):
+    """Median encode/compress times and bytes over the callback's responses."""
+    callback = getattr(main_app, name)
+    rows = []
+    for label, args, prop_id in cases:
+        response = as_response(callback, run_callback(callback, args, prop_id, 'warm'))
+        before = min(timed(to_json, response)[1] for _ in range(repeat))
+        after = min(timed(to_response_json, response)[1] for _ in range(repeat))
+        before_body = to_json(response).encode('utf-8')
+        after_body = to_response_json(response).encode('utf-8')
+        gzipped, gzip_ms = timed(gzip.compress, after_body, gzip_level)
+        row = {
+            'before_ms': before,
+            'after_ms': after,
+            'before_bytes': len(before_body),
+            'after_bytes': len(after_body),
+            'gzip_bytes': len(gzipped),
+            'gzip_ms': gzip_ms,
+        }
+        if brotli is not None:
+            compressed, brotli_ms = timed(brotli.compress, after_body, brotli.MODE_TEXT, brotli_quality)
+            row.update(brotli_bytes=len(compressed), brotli_ms=brotli_ms)
+        rows.append(row)
+    return {field: round(float(np.median([row[field] for row in rows])), 3) for field in rows[0]}
+
+
+def print_results(results):
+    header = (f"{'callback':<28} {'encode ms':>10} {'-> ms':>7} {'bytes':>9} {'-> bytes':>9} {'gzip':>8} {'gzip ms':>8}"
+              f" {'brotli':>8} {'br ms':>6}")
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        brotli_columns = (f" {r['brotli_bytes']:>8,.0f} {r['brotli_ms']:>6.2f}" if 'brotli_bytes' in r
+                          else f" {'n/a':>8} {'n/a':>6}")
+        print(f"{name:<28} {r['before_ms']:>10.2f} {r['after_ms']:>7.2f} {r['before_bytes']:>9,.0f} {r['after_bytes']:>9,.0f}"
+              f" {r['gzip_bytes']:>8,.0f} {r['gzip_ms']:>8.2f}" + brotli_columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark callback response encoding and compression")
+    parser.add_argument('--callbacks', nargs='+', help="Only measure these callbacks")
+    parser.add_argument('--repeat', type=int, default=3, help="Encodings per response; the fastest is kept")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    # no background patient prefetching while responses are timed
+    patient_prefetcher.max_workers = 0
+    cases = build_cases(random.Random(args.seed))
+    random.seed(args.seed)
+    results = {}
+    for name in args.callbacks or list(cases):
+        print(f"measuring {name} ({len(cases[name])} responses)")
+        results[name] = measure_callback(name, cases[name], args.repeat)
+
+    print(f"\nmedians per response; before: Dash's encoding, uncompressed; after: {float_digits} significant digits,"
+          f" gzip level {gzip_level}, brotli quality {brotli_quality}" + ("" if brotli else " (brotli not installed)"))
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'float_digits': float_digits, 'callbacks': results}, f, indent=2)
+        print(f"results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
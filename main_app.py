@@ -1,36 +1,60 @@
 import dash
 import random
 
-from dash import html, dcc
+from dash import html, dcc, ctx
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
 
 from src.tabs.overall_view_tab import overall_view_tab_layout
 from src.tabs.county_view_tab import county_view_tab_layout,default_state, default_county
 from src.tabs.measure_view_tab import measure_view_tab_layout
 from src.tabs.info_view_tab import info_view_tab_layout
-from src.tabs.ai_patient_view_tab import ai_patient_view_tab_layout, create_updated_ai_patient_view
+from src.tabs.ai_patient_view_tab import ai_patient_view_tab_layout
 
-from src.tabs.overall_view import (create_updated_map, create_updated_scatter_chart, find_top_bottom_values, value_to_color,
-                                   df_ranking, x_pred, y_pred, y_intervals, percentile_low, percentile_high, pseudo_r2_value)
+from src.tabs.overall_view import (create_updated_map, create_updated_map_patch, create_updated_scatter_chart, create_updated_table,
+                                   get_df_ranking)
 
 from src.tabs.county_view import (
                                 create_county_econ_charts, create_county_health_charts, create_county_map, 
                                 create_kpi_layout,
-                                df_all_counties, df_ranking_cv, df_bea, counties, 
+                                get_df_ranking_cv, get_county_index,
                                 )
-from src.tabs.measure_view import (create_updated_map_measures,find_top_bottom_values, 
-                                   value_to_color, df_measures
-                                )
-from src.tabs.ai_patient_view import all_patient_ids
+from src.tabs.measure_view import (create_updated_map_measures, create_updated_map_measures_patch, create_updated_table_measures,
+                                   )
+from src.tabs.ai_patient_view import (chart_cards, create_patient_card_graphs, create_updated_ai_patient_view,
+                                     get_all_patient_ids, is_patient_id)
 from src.tabs.info_view import *
 
 from src.tabs.helper_data import unhealth_score_explanation
+from src.tabs.geojson_assets import get_counties_geojson, register_geojson_route
+from src.tabs.callback_metrics import register_callback_metrics
+from src.tabs.callback_profiling import register_callback_profiling
+from src.tabs.response_encoding import register_response_encoding
+from src.tabs.figure_cache import memoize_callback, normalize_states
+from src.tabs.clientside_callbacks import register_collapse_toggles, register_tab_visibility
+from src.tabs.precomputed_views import get_precomputed_patient_view, get_precomputed_view, map_patch_from_figure
+from src.tabs.patient_prefetch import patient_prefetcher
 
 
 # Initialize the main Dash app
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY, dbc.icons.BOOTSTRAP])
+# Tab bodies are rendered on demand, so their callbacks reference components not in the initial layout
+app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY, dbc.icons.BOOTSTRAP], suppress_callback_exceptions=True)
 server = app.server # Expose the Flask server for Gunicorn
+register_geojson_route(server) # county boundaries served once, long-cached
+register_callback_metrics(app) # per-callback timings at /metrics
+register_callback_profiling(app) # opt-in cProfile of selected callbacks (PROFILE_CALLBACKS / PROFILE_TOKEN)
+register_response_encoding(app) # orjson callback responses with trimmed floats, brotli/gzip compression
+
+# Tab value -> layout function, rendered the first time the tab is selected
+tab_layouts = {
+    'tab-1': overall_view_tab_layout,
+    'tab-2': county_view_tab_layout,
+    'tab-3': measure_view_tab_layout,
+    'tab-4': ai_patient_view_tab_layout,
+    'tab-5': info_view_tab_layout,
+}
+default_tab = 'tab-1'
 
 # Main app layout
 app.layout = dbc.Container([
@@ -46,19 +70,43 @@ app.layout = dbc.Container([
         #'backgroundColor': '#333',
         }),
 
-    dcc.Tabs(id="tabs", value='tab-1', className='tab-container', children=[
-        dcc.Tab(label='Summary', value='tab-1', className='custom-tab', selected_className='custom-tab-active', children=overall_view_tab_layout()),
-        dcc.Tab(label='County', value='tab-2', className='custom-tab', selected_className='custom-tab-active', children=county_view_tab_layout()),
-        dcc.Tab(label='Health Measures', value='tab-3', className='custom-tab', selected_className='custom-tab-active',children=measure_view_tab_layout()),
-        dcc.Tab(label='A.I. Patient Analysis', value='tab-4', className='custom-tab', selected_className='custom-tab-active',children=ai_patient_view_tab_layout()),
-        dcc.Tab(label='Info', value='tab-5', className='custom-tab', selected_className='custom-tab-active',children=info_view_tab_layout()),
+    dcc.Tabs(id="tabs", value=default_tab, className='tab-container', children=[
+        dcc.Tab(label='Summary', value='tab-1', className='custom-tab', selected_className='custom-tab-active'),
+        dcc.Tab(label='County', value='tab-2', className='custom-tab', selected_className='custom-tab-active'),
+        dcc.Tab(label='Health Measures', value='tab-3', className='custom-tab', selected_className='custom-tab-active'),
+        dcc.Tab(label='A.I. Patient Analysis', value='tab-4', className='custom-tab', selected_className='custom-tab-active'),
+        dcc.Tab(label='Info', value='tab-5', className='custom-tab', selected_className='custom-tab-active'),
     ], style={'position': 'sticky', 'top': '0', 'zIndex': '1000'}),
-        
-    
-    html.Div(id='tabs-content')
+
+    # Tabs already sent to this browser; their bodies stay mounted (and keep their state) and are only hidden
+    dcc.Store(id='rendered-tabs', data=[default_tab]),
+    html.Div(id='tabs-content', children=[
+        html.Div(id=f'{tab}-content', children=tab_layouts[tab]() if tab == default_tab else None)
+        for tab in tab_layouts
+    ])
     ], fluid=True)
 
 
+@memoize_callback('tab-layout', key=lambda tab: (tab,))
+def render_tab_layout(tab):
+    return tab_layouts[tab]()
+
+@app.callback(
+    [Output(f'{tab}-content', 'children') for tab in tab_layouts] + [Output('rendered-tabs', 'data')],
+    [Input('tabs', 'value')],
+    [State('rendered-tabs', 'data')],
+)
+def render_tab(selected_tab, rendered_tabs):
+    if selected_tab in rendered_tabs:
+        raise PreventUpdate
+
+    tab_contents = [render_tab_layout(tab) if tab == selected_tab else dash.no_update for tab in tab_layouts]
+    return tab_contents + [rendered_tabs + [selected_tab]]
+
+# Showing and hiding rendered tab bodies runs clientside
+register_tab_visibility(app, list(tab_layouts))
+
+
 ##################
 ###OVERALL###
 ##################
@@ -70,49 +118,49 @@ app.layout = dbc.Container([
 )
 def update_map_and_chart(selected_state):
 
-    # Create and return the updated figures for map and scatter chart
-    updated_map_fig = create_updated_map(df_ranking, selected_state)
-    updated_scatter_chart_fig = create_updated_scatter_chart(df_ranking, selected_state,x_pred, y_pred, y_intervals,pseudo_r2_value)
+    # First render ships the full map; state changes only patch the per-county arrays of the figure in the browser
+    if ctx.triggered_id is None:
+        updated_map_fig = render_summary_map(selected_state)
+    else:
+        updated_map_fig = render_summary_map_patch(selected_state)
+    updated_scatter_chart_fig = render_summary_scatter(selected_state)
 
     return updated_map_fig, updated_scatter_chart_fig
 
+# Single-state and all-states selections are served from precomputed views (run_pipelines.py --precompute_figures)
+@memoize_callback('summary-map', key=normalize_states)
+def render_summary_map(selected_state):
+    precomputed = get_precomputed_view('summary', selected_state)
+    if precomputed is not None:
+        return precomputed['map']
+    return create_updated_map(get_df_ranking(), selected_state)
+
+@memoize_callback('summary-map-patch', key=normalize_states)
+def render_summary_map_patch(selected_state):
+    precomputed = get_precomputed_view('summary', selected_state)
+    if precomputed is not None:
+        return map_patch_from_figure(precomputed['map'], ['locations', 'z', 'customdata'])
+    return create_updated_map_patch(get_df_ranking(), selected_state)
+
+@memoize_callback('summary-scatter', key=normalize_states)
+def render_summary_scatter(selected_state):
+    precomputed = get_precomputed_view('summary', selected_state)
+    if precomputed is not None:
+        return precomputed['scatter']
+    return create_updated_scatter_chart(get_df_ranking(), selected_state)
+
 @app.callback(
     Output('state-data-table', 'data'),
     Output('state-data-table', 'style_data_conditional'),
     [Input('state-dropdown', 'value')]
 )
+@memoize_callback('summary-table', key=normalize_states)
 def update_table(selected_state):
-    max_values = 10  # Number of top and bottom values
 
-    if selected_state:
-        # Filter DataFrame based on selected state
-        filtered_df = df_ranking[df_ranking['StateDesc'].isin(selected_state)]
-    else:
-        # If no state is selected, use the full dataset
-        filtered_df = df_ranking
-    # Get top and bottom values based on filtered DataFrame
-
-    top_bottom_df = find_top_bottom_values(filtered_df, 'Weighted_Score_Normalized', max_values)
-    # Calculate colors for each row in the top_bottom_df based on overall min and max values
-    top_bottom_df['Color'] = top_bottom_df['Weighted_Score_Normalized'].apply(lambda x: value_to_color(x, percentile_low, percentile_high))
-    top_bottom_df['Weighted_Score_Normalized'] = round(top_bottom_df.Weighted_Score_Normalized,2)
-
-    top_bottom_df['Per capita personal income'] = round(top_bottom_df['Per capita personal income'],0)
-    top_bottom_df.fillna("NA",inplace=True)
-
-    # Convert DataFrame to dictionary for DataTable
-    data = top_bottom_df.to_dict('records')
-
-    # Define style conditions using the Color column
-    style = [{'if': {'row_index': i}, 'backgroundColor': color} for i, color in enumerate(top_bottom_df['Color'])]
-
-    # Additional style settings for borders and lines
-    style.extend([
-        {'if': {'column_id': 'LocationName'}, 'textAlign': 'left'},
-        {'if': {'column_id': 'StateDesc'}, 'textAlign': 'left'}
-
-    ])
-    return data, style
+    precomputed = get_precomputed_view('summary', selected_state)
+    if precomputed is not None:
+        return precomputed['table']['data'], precomputed['table']['style']
+    return create_updated_table(selected_state)
 
 
 #################
@@ -126,8 +174,7 @@ def update_table(selected_state):
 )
 def update_county_dropdown(selected_state):
     if selected_state is not None:
-        counties = sorted(df_ranking_cv[df_ranking_cv['StateDesc'] == selected_state]['LocationName'].unique())
-        return [{'label': county, 'value': county} for county in counties]
+        return get_county_index().county_options.get(selected_state, [])
     return []
 
 
@@ -137,42 +184,65 @@ def update_county_dropdown(selected_state):
         Output('kpi-display', 'children'),
         Output('county-map', 'figure'),
         Output('county-health-chart', 'figure'),
-        Output('econ-chart-1', 'figure'), 
-        Output('econ-chart-2', 'figure'),
-        Output('econ-pop', 'figure')  
+        Output('econ-pop', 'figure'),
+        Output('county-selection', 'data')
     ],
     [
         Input('interval-component', 'n_intervals'),
-        Input('show-data-button', 'n_clicks'),
-        Input('currency-type', 'value')
+        Input('show-data-button', 'n_clicks')
     ],
     [State('county-view-state-dropdown', 'value'), State('county-view-county-dropdown', 'value')]
 )
-def update_charts(n_intervals, n_clicks, currency_type, selected_state, selected_county):
+def update_charts(n_intervals, n_clicks, selected_state, selected_county):
     if n_intervals == 0 and n_clicks is None:
         return dash.no_update
 
     # Ensure selected_state and selected_county have values
     selected_state = selected_state or default_state
     selected_county = selected_county or default_county
-    fips_county, fips_county_bea = df_ranking_cv.loc[(df_ranking_cv.StateDesc == selected_state) & \
-                                                     (df_ranking_cv.LocationName == selected_county), ['GEOID', 'matched_GEOID']].iloc[0]
 
-    # fips_usa = 00000
-    df_bea_county = df_bea[(df_bea.GeoFips=="00000") | (df_bea.GeoFips==fips_county_bea)]
-    county_map_figure = create_county_map(selected_state, selected_county, df_ranking_cv, counties)
+    # the econ charts follow the selection through the store, together with the currency toggle
+    return render_county_view(selected_state, selected_county) + ({'state': selected_state, 'county': selected_county},)
 
-    kpi_layout = create_kpi_layout(df_ranking_cv, fips_county, df_bea_county, fips_county_bea, unhealth_score_explanation) 
-    county_health_figure = create_county_health_charts(df_ranking_cv, df_all_counties, fips_county)
-    
-    fig_adj_income, fig_income, fig_real_gdp, fig_gdp, fig_pop= create_county_econ_charts(df_bea_county)
+
+@memoize_callback('county-view', key=lambda selected_state, selected_county: (selected_state, selected_county))
+def render_county_view(selected_state, selected_county):
+    df_ranking_cv = get_df_ranking_cv()
+    county_index = get_county_index()
+    fips_county, fips_county_bea = county_index.lookup(selected_state, selected_county)
+
+    county_map_figure = create_county_map(selected_state, selected_county, get_counties_geojson())
+
+    kpi_layout = create_kpi_layout(df_ranking_cv, fips_county, fips_county_bea, unhealth_score_explanation) 
+    county_health_figure = create_county_health_charts(fips_county)
+    fig_pop = render_county_econ_charts(fips_county_bea)['pop']
     
     dynamic_title = f"{selected_county}, {selected_state}"  
 
+    return dynamic_title, kpi_layout, county_map_figure, county_health_figure, fig_pop
+
+
+@app.callback(
+    [Output('econ-chart-1', 'figure'), Output('econ-chart-2', 'figure')],
+    [Input('county-selection', 'data'), Input('currency-type', 'value')]
+)
+def update_econ_charts(county_selection, currency_type):
+    if not county_selection:
+        raise PreventUpdate
+
+    # both currency variants are built once per county; switching currency only picks the other pair
+    _, fips_county_bea = get_county_index().lookup(county_selection['state'], county_selection['county'])
+    econ_charts = render_county_econ_charts(fips_county_bea)
     if currency_type == 'adj':
-        return dynamic_title, kpi_layout, county_map_figure, county_health_figure, fig_adj_income, fig_real_gdp, fig_pop
+        return econ_charts['adj_income'], econ_charts['real_gdp']
     else:
-        return dynamic_title, kpi_layout, county_map_figure, county_health_figure, fig_income, fig_gdp, fig_pop
+        return econ_charts['income'], econ_charts['gdp']
+
+
+@memoize_callback('county-econ', key=lambda fips_county_bea: (fips_county_bea,))
+def render_county_econ_charts(fips_county_bea):
+    fig_adj_income, fig_income, fig_real_gdp, fig_gdp, fig_pop = create_county_econ_charts(fips_county_bea)
+    return {'adj_income': fig_adj_income, 'income': fig_income, 'real_gdp': fig_real_gdp, 'gdp': fig_gdp, 'pop': fig_pop}
 
 
 ##################
@@ -185,12 +255,26 @@ def update_charts(n_intervals, n_clicks, currency_type, selected_state, selected
     [Input('measure-dropdown', 'value'),
      Input('measure-view-state-dropdown', 'value')]
 )
-def update_map_and_chart(selected_measure, selected_state):
-
-    # Create and return the updated figures for map and scatter chart
-    updated_map_fig = create_updated_map_measures(df_measures, selected_state, selected_measure)
-
-    return updated_map_fig
+def update_measure_map(selected_measure, selected_state):
+
+    # First render ships the full map; later measure/state changes are sent as a Patch
+    if ctx.triggered_id is None:
+        return render_measure_map(selected_measure, selected_state)
+    return render_measure_map_patch(selected_measure, selected_state)
+
+@memoize_callback('measure-map', key=lambda selected_measure, selected_state: (selected_measure, normalize_states(selected_state)))
+def render_measure_map(selected_measure, selected_state):
+    precomputed = get_precomputed_view('measure', selected_state, selected_measure)
+    if precomputed is not None:
+        return precomputed['map']
+    return create_updated_map_measures(selected_state, selected_measure)
+
+@memoize_callback('measure-map-patch', key=lambda selected_measure, selected_state: (selected_measure, normalize_states(selected_state)))
+def render_measure_map_patch(selected_measure, selected_state):
+    precomputed = get_precomputed_view('measure', selected_state, selected_measure)
+    if precomputed is not None:
+        return map_patch_from_figure(precomputed['map'], ['locations', 'z', 'customdata', 'zmin', 'zmax', 'hovertemplate'], title=True)
+    return create_updated_map_measures_patch(selected_state, selected_measure)
 
 @app.callback(
     Output('measure-view-state-data-table', 'data'),
@@ -198,39 +282,13 @@ def update_map_and_chart(selected_measure, selected_state):
     [Input('measure-dropdown', 'value'),
      Input('measure-view-state-dropdown', 'value')]
 )
-def update_table(selected_measure, selected_state):
-
-    max_values = 10  # Number of top and bottom values
-    df_measures_filtered = df_measures[(df_measures['Measure_short'] == selected_measure)]
-    # Calculate the 10th and 90th percentiles of the data
-    percentile_low = df_measures_filtered['Data_Value'].quantile(0.05)
-    percentile_high = df_measures_filtered['Data_Value'].quantile(0.95)
-    
-    if selected_state:
-        # Filter DataFrame based on selected state
-        filtered_df = df_measures_filtered[df_measures_filtered['StateDesc'].isin(selected_state)]
-    else:
-        # If no state is selected, use the full dataset
-        filtered_df = df_measures_filtered
-    # Get top and bottom values based on filtered DataFrame
-
-    top_bottom_df = find_top_bottom_values(filtered_df, 'Data_Value', max_values)
-    # Calculate colors for each row in the top_bottom_df based on overall min and max values
-    top_bottom_df['Color'] = top_bottom_df['Data_Value'].apply(lambda x: value_to_color(x, percentile_low, percentile_high))
-
-    # Convert DataFrame to dictionary for DataTable
-    data = top_bottom_df.to_dict('records')
-
-    # Define style conditions using the Color column
-    style = [{'if': {'row_index': i}, 'backgroundColor': color} for i, color in enumerate(top_bottom_df['Color'])]
+@memoize_callback('measure-table', key=lambda selected_measure, selected_state: (selected_measure, normalize_states(selected_state)))
+def update_measure_table(selected_measure, selected_state):
 
-    # Additional style settings for borders and lines
-    style.extend([
-        {'if': {'column_id': 'LocationName'}, 'textAlign': 'left'},
-        {'if': {'column_id': 'StateDesc'}, 'textAlign': 'left'}
-
-    ])
-    return data, style
+    precomputed = get_precomputed_view('measure', selected_state, selected_measure)
+    if precomputed is not None:
+        return precomputed['table']['data'], precomputed['table']['style']
+    return create_updated_table_measures(selected_state, selected_measure)
 
 @app.callback(
     Output('measure-subtitle', 'children'),
@@ -245,109 +303,92 @@ def update_measure_subtitle(selected_measure):
 ######AI PATIENT ANALYSIS TAB#####
 ##############################
 
+# Patient views are fixed per data release: served from the precomputed store (run_pipelines.py --precompute_patient_views)
+# and cached per patient; patients added after the store was built are rendered live
+@memoize_callback('ai-patient-view', key=lambda patient_id: (patient_id,))
+def render_patient_view(patient_id):
+    return create_updated_ai_patient_view(patient_id, get_precomputed_patient_view(patient_id, 'summary'))
+
+# Chart cards, cached once per patient and card
+@memoize_callback('ai-patient-card', key=lambda patient_id, card: (patient_id, card))
+def render_patient_card(patient_id, card):
+    return create_patient_card_graphs(patient_id, card, get_precomputed_patient_view(patient_id, card))
+
+def prepare_patient(patient_id):
+    """Renders a patient's view and chart cards into the figure cache; run in the background by the prefetcher."""
+    for card in chart_cards:
+        render_patient_card(patient_id, card)
+    return render_patient_view(patient_id)
+
+def next_patient(next_patient_id):
+    """Patient picked for this session on its previous call, or a random one; the view is prefetched if it was."""
+    if not is_patient_id(next_patient_id):
+        random_patient_id = random.choice(get_all_patient_ids())
+        return random_patient_id, render_patient_view(random_patient_id)
+    view = patient_prefetcher.take(next_patient_id)
+    return next_patient_id, view if view is not None else render_patient_view(next_patient_id)
+
+def pick_next_patient():
+    """Picks the session's next random patient and starts preparing their view."""
+    next_patient_id = random.choice(get_all_patient_ids())
+    patient_prefetcher.prefetch(next_patient_id, prepare_patient)
+    return next_patient_id
+
 # Callback to generate and display random patient data
 @app.callback(
-    Output('ai-patient-view-content', 'children'),
+    [Output('ai-patient-view-content', 'children'),
+     Output('ai-patient-id', 'data'),
+     Output('ai-next-patient-id', 'data')],
     [Input('generate-random-patient-button', 'n_clicks')],
-    prevent_initial_call=False  # Prevent callback from running on app initialization
+    [State('ai-next-patient-id', 'data')],
+    prevent_initial_call=False  # initial call fills in the default patient when the tab is first rendered
 )
 
-def display_random_patient_data(n_clicks):
+def display_random_patient_data(n_clicks, next_patient_id):
     
     if n_clicks is None:
         random_patient_id = "e154f937-18c5-ebaa-1fd0-0b714169d18b"
-        patient_id_title, summary_card, vital_signs_card, labs_card, qols_card = create_updated_ai_patient_view(random_patient_id)  
+        patient_id_title, summary_card, vital_signs_card, labs_card, qols_card = render_patient_view(random_patient_id)  
 
-        return summary_card, vital_signs_card, labs_card, qols_card
+        return (summary_card, vital_signs_card, labs_card, qols_card), random_patient_id, pick_next_patient()
     
-    random_patient_id = random.choice(all_patient_ids)  
-    patient_id_title, summary_card, vital_signs_card, labs_card, qols_card = create_updated_ai_patient_view(random_patient_id)  
+    # the patient picked on the previous call, usually already prepared in the background
+    random_patient_id, (patient_id_title, summary_card, vital_signs_card, labs_card, qols_card) = next_patient(next_patient_id)
 
-    return patient_id_title, summary_card, vital_signs_card, labs_card, qols_card
+    return (patient_id_title, summary_card, vital_signs_card, labs_card, qols_card), random_patient_id, pick_next_patient()
 
 
-@app.callback(
-    Output("collapse-summary", "is_open"),
-    [Input("collapse-summary-header", "n_clicks")],
-    [State("collapse-summary", "is_open")],
-)
-def toggle_summary_collapse(n, is_open):
-    if n:
-        return not is_open
-    return is_open
+# Chart cards start empty and are built the first time their collapse is opened (render_patient_card)
+def register_patient_card(card):
+    collapse_id = chart_cards[card][0]
 
-@app.callback(
-    Output("collapse-charts", "is_open"),
-    [Input("collapse-charts-header", "n_clicks")],
-    [State("collapse-charts", "is_open")]
-)
-def toggle_charts_collapse(n, is_open):
-    if n:
-        return not is_open
-    return is_open
+    def display_patient_card(is_open, patient_id, children):
+        # closing the card, or reopening one that is already filled, sends nothing
+        if not is_open or patient_id is None or children:
+            raise PreventUpdate
+        return render_patient_card(patient_id, card)
 
-@app.callback(
-    Output("collapse-vital-signs", "is_open"),
-    [Input("collapse-vital-signs-header", "n_clicks")],
-    [State("collapse-vital-signs", "is_open")]
-)
-def toggle_vital_signs_collapse(n, is_open):
-    if n:
-        return not is_open
-    return is_open
+    # named per card (e.g. display_labs_card) before Dash wraps it, so /metrics and PROFILE_CALLBACKS tell the cards apart
+    display_patient_card.__name__ = display_patient_card.__qualname__ = f'display_{card}_card'
+    return app.callback(
+        Output(f'{collapse_id}-body', 'children'),
+        [Input(collapse_id, 'is_open')],
+        [State('ai-patient-id', 'data'),
+         State(f'{collapse_id}-body', 'children')]
+    )(display_patient_card)
 
-@app.callback(
-    Output("collapse-qols", "is_open"),
-    [Input("collapse-qols-header", "n_clicks")],
-    [State("collapse-qols", "is_open")]
-)
-def toggle_qols_collapse(n, is_open):
-    if n:
-        return not is_open
-    return is_open
+display_vital_signs_card = register_patient_card('vital_signs')
+display_labs_card = register_patient_card('labs')
+display_qols_card = register_patient_card('qols')
 
 
 #######################
 ######INFO TAB#########
 #######################
 
-# Callbacks for toggling the collapse
-
-toggle_callbacks = [
-    {"trigger": "collapse-button-dashboard-info", "target": "collapse-dashboard-info"},
-    {"trigger": "collapse-button-tab-info", "target": "collapse-tab-info"},
-    {"trigger": "collapse-button-summary-view", "target": "collapse-summary-view"},
-    {"trigger": "collapse-button-county-view", "target": "collapse-county-view"},
-    {"trigger": "collapse-button-measure-view", "target": "collapse-measure-view"},
-    {"trigger": "collapse-button-ai-patient-view", "target": "collapse-ai-view"},
-    {"trigger": "collapse-button-data-sources", "target": "collapse-data-sources"},
-    {"trigger": "collapse-button-cdc-places", "target": "collapse-cdc-places"},
-    {"trigger": "collapse-button-bea", "target": "collapse-bea"},
-    {"trigger": "collapse-button-census", "target": "collapse-census"},
-    {"trigger": "collapse-button-bls", "target": "collapse-bls"},
-    {"trigger": "collapse-button-synthea", "target": "collapse-synthea"},
-    {"trigger": "collapse-button-data-loading", "target": "collapse-data-loading"},
-    {"trigger": "collapse-button-cdc-places-loading", "target": "collapse-cdc-places-loading"},
-    {"trigger": "collapse-button-bea-gdp-income", "target": "collapse-bea-gdp-income"},
-    {"trigger": "collapse-button-bls-cpi", "target": "collapse-bls-cpi"},
-    {"trigger": "collapse-button-bea-bls-further-processing", "target": "collapse-bea-bls-further-processing"},
-    {"trigger": "collapse-button-synthea-generation", "target": "collapse-synthea-generation"},
-    {"trigger": "collapse-button-ai-summary-processing", "target": "collapse-ai-summary-processing"},
-    {"trigger": "collapse-button-patient-charts-processing", "target": "collapse-patient-charts-processing"},
-
-]
-
-for callback in toggle_callbacks:
-    @app.callback(
-        Output(callback["target"], "is_open"),
-        [Input(callback["trigger"], "n_clicks")],
-        [State(callback["target"], "is_open")],
-    )
-    def toggle_collapse(n, is_open):
-        if n:
-            return not is_open
-        return is_open
-    
+# Collapse toggles (AI and Info tabs) run clientside
+register_collapse_toggles(app)
+
 
 # Run the app
 if __name__ == '__main__':
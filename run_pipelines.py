@@ -9,9 +9,12 @@ from src.data.load_data import (get_cdc_places_data, initial_processing_cdc_plac
 from src.data.merge_data import merge_gdp_ranking_data
 from src.data.process_CDC_data import process_cdc_data
 from src.data.process_bea_data import process_bea_data
+from src.data.bea_cube import save_bea_cube
 from src.data.create_final_datasets import create_final_summary_df, create_final_measures_df
+from src.data.precompute_figures import precompute_figures, precompute_patient_views
+from src.data.compact_dtypes import compact_processed_artifacts
 from src.models.gam_model import fit_gam
-from src.data.patient_data import create_AI_patient_summary, save_patient_labs, consolidate_ai_summaries, filter_lab_data
+from src.data.patient_data import create_AI_patient_summary, save_patient_labs, consolidate_ai_summaries, save_ai_summary_store, filter_lab_data
 
 load_dotenv()
 # Load environment variables from .env file
@@ -88,6 +91,12 @@ if __name__ == "__main__":
         action="store_true"
     )
 
+    parser.add_argument(
+        "--build_bea_cube",
+        help="write the processed BEA data as a (geo x statistic x year) array for the County tab",
+        action="store_true"
+    )
+
     parser.add_argument(
         "--create_final_summary_dataset",
         help="create final summary df from BEA and df_ranking data",
@@ -106,6 +115,24 @@ if __name__ == "__main__":
         action="store_true"
     )
 
+    parser.add_argument(
+        "--compact_dtypes",
+        help="store repeated strings as categoricals and downcast numerics in the processed pickles, with a memory report",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "--precompute_figures",
+        help="render summary and measure figures and tables for every single-state and all-states selection to JSON",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "--precompute_patient_views",
+        help="render the AI tab summary and chart figures of every patient to a keyed store",
+        action="store_true"
+    )
+
     parser.add_argument(
         "--create_patient_summary",
         help="create summary of patient history",
@@ -119,7 +146,7 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "--consolidate_summaries",
-        help="consolidate ai summaries into one json",
+        help="consolidate ai summaries into one json and the indexed summary store the app reads",
         action="store_true"
     )
 
@@ -207,6 +234,12 @@ if __name__ == "__main__":
                 gdp_file = "data/interim/df_BEA_gdp_2017_2023.pickle"
                 )
             
+        if args.build_bea_cube:
+            save_bea_cube(
+                bea_file="data/processed/bea_economic_data.pickle",
+                output_dir="data/processed/bea_cube"
+                )
+
         if args.create_final_summary_dataset:
             create_final_summary_df(
                 df_ranking_path="data/processed/CDC_PLACES_county_rankings.pickle", 
@@ -225,6 +258,16 @@ if __name__ == "__main__":
                 df_path = "data/processed/df_summary_final.pickle"
             )
 
+        if args.compact_dtypes:
+            compact_processed_artifacts(
+                report_path="data/processed/memory_report.json"
+            )
+
+        if args.precompute_figures:
+            precompute_figures(
+                output_dir="data/processed/precomputed_views"
+            )
+
         if args.create_patient_summary:
             create_AI_patient_summary(open_ai_key,
                                       num_patients=200)
@@ -234,6 +277,10 @@ if __name__ == "__main__":
                     summaries_dir = "data/processed/AI_summaries",
                     consolidated_file_path = "data/processed/AI_summaries_consolidated/consolidated_ai_summaries.json"
                 )
+            save_ai_summary_store(
+                    summaries_dir = "data/processed/AI_summaries",
+                    store_dir = "data/processed/AI_summaries_store"
+                )
             
         if args.save_patient_labs:
             save_patient_labs(
@@ -245,4 +292,9 @@ if __name__ == "__main__":
             filter_lab_data(
                 labs_data_dir = "data/processed/patient_labs",
                 json_summaries_dir = "data/processed/AI_summaries"
+            )
+
+        if args.precompute_patient_views:
+            precompute_patient_views(
+                store_dir="data/processed/patient_views_store"
             )
\ No newline at end of file
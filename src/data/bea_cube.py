@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+bea_cube_dir = "data/processed/bea_cube"
+values_file = "values.npy"
+index_file = "index.json"
+
+
+class BeaCube:
+    """
+    BEA economic data as a dense (geo x statistic x year) float32 array, NaN where BEA has no value.
+
+    Attributes:
+        values (np.ndarray): float32 array of shape (len(geo_fips), len(statistics), len(years)); a read-only
+                             memory map when loaded from disk, so gunicorn workers share the pages.
+        geo_fips (list): GeoFips of each row of `values`.
+        geo_names (dict): GeoFips -> BEA GeoName.
+        statistics (list): Statistic names, e.g. 'Per capita personal income'.
+        years (np.ndarray): Years (TimePeriod) of the last axis, ascending.
+    """
+
+    def __init__(self, values, geo_fips, geo_names, statistics, years):
+        self.values = values
+        self.geo_fips = list(geo_fips)
+        self.geo_names = dict(geo_names)
+        self.statistics = list(statistics)
+        self.years = np.asarray(years)
+        self.geo_positions = {fips: i for i, fips in enumerate(self.geo_fips)}
+        self.statistic_positions = {statistic: i for i, statistic in enumerate(self.statistics)}
+        self.year_positions = {int(year): i for i, year in enumerate(self.years)}
+
+    @classmethod
+    def from_frame(cls, df_bea: pd.DataFrame) -> "BeaCube":
+        """Builds the cube from the long frame written by `process_bea_data` (GeoFips, GeoName, TimePeriod, Statistic, DataValue)."""
+        geo_codes, geo_fips = pd.factorize(df_bea['GeoFips'], sort=True)
+        statistic_codes, statistics = pd.factorize(df_bea['Statistic'])
+        year_codes, years = pd.factorize(df_bea['TimePeriod'], sort=True)
+        values = np.full((len(geo_fips), len(statistics), len(years)), np.nan, dtype=np.float32)
+        values[geo_codes, statistic_codes, year_codes] = df_bea['DataValue'].to_numpy(dtype=np.float32)
+
+        first_rows = pd.Series(np.arange(len(df_bea))).groupby(geo_codes).first().to_numpy()
+        geo_names = df_bea['GeoName'].to_numpy()[first_rows]
+        return cls(values, [str(fips) for fips in geo_fips], zip(geo_fips.astype(str), map(str, geo_names)),
+                   [str(statistic) for statistic in statistics], np.asarray(years, dtype=int))
+
+    def save(self, directory: str = bea_cube_dir) -> None:
+        """Writes values.npy and index.json (geo, statistic and year labels) to `directory`."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, values_file), np.ascontiguousarray(self.values))
+        index = {
+            'geo_fips': self.geo_fips,
+            'geo_names': [self.geo_names[fips] for fips in self.geo_fips],
+            'statistics': self.statistics,
+            'years': [int(year) for year in self.years],
+        }
+        with open(os.path.join(directory, index_file), 'w') as f:
+            json.dump(index, f)
+
+    @classmethod
+    def load(cls, directory: str = bea_cube_dir, mmap: bool = True) -> "BeaCube":
+        """Reads a cube written by `save`, memory-mapping the values unless `mmap` is False."""
+        values = np.load(os.path.join(directory, values_file), mmap_mode='r' if mmap else None)
+        with open(os.path.join(directory, index_file)) as f:
+            index = json.load(f)
+        return cls(values, index['geo_fips'], zip(index['geo_fips'], index['geo_names']), index['statistics'], index['years'])
+
+    def nbytes(self):
+        return int(self.values.nbytes)
+
+    def __contains__(self, geo_fips):
+        return geo_fips in self.geo_positions
+
+    def series(self, geo_fips, statistic):
+        """(years, values) of a statistic for one GeoFips, only the years BEA has a value for."""
+        row = self.values[self.geo_positions[geo_fips], self.statistic_positions[statistic]]
+        present = ~np.isnan(row)
+        return self.years[present], row[present]
+
+    def value(self, geo_fips, statistic, year):
+        """Value of a statistic for one GeoFips and year, or None if BEA has none."""
+        geo = self.geo_positions.get(geo_fips)
+        year_position = self.year_positions.get(year)
+        if geo is None or year_position is None or statistic not in self.statistic_positions:
+            return None
+        value = self.values[geo, self.statistic_positions[statistic], year_position]
+        return None if np.isnan(value) else float(value)
+
+
+def save_bea_cube(
+    bea_file: str = "data/processed/bea_economic_data.pickle",
+    output_dir: str = bea_cube_dir
+) -> None:
+    """
+    Materializes the processed BEA data as a (geo x statistic x year) float32 cube the County tab slices.
+
+    Args:
+        bea_file (str): File path to the processed BEA economic data pickle file.
+        output_dir (str): Directory where values.npy and index.json are saved.
+
+    Returns:
+        None: The function saves the cube to output_dir but does not return any value.
+    """
+    cube = BeaCube.from_frame(pd.read_pickle(bea_file))
+    cube.save(output_dir)
+    print(f"BEA cube {cube.values.shape} ({cube.nbytes() / 1e6:.1f} MB) saved to: {output_dir}")
+
+
+def load_bea_cube(directory: str = bea_cube_dir, bea_file: str = "data/processed/bea_economic_data.pickle") -> BeaCube:
+    """The memory-mapped cube if the pipeline wrote one, otherwise built in memory from the BEA pickle."""
+    if os.path.exists(os.path.join(directory, values_file)):
+        return BeaCube.load(directory)
+    logger.warning("no BEA cube in %s, building it from %s", directory, bea_file)
+    return BeaCube.from_frame(pd.read_pickle(bea_file))
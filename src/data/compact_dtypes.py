@@ -0,0 +1,99 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Processed artifacts the dashboard loads; compacted in place by `run_pipelines.py --compact_dtypes`
+processed_artifacts = [
+    "data/processed/df_summary_final.pickle",
+    "data/processed/df_measures_final.pickle",
+    "data/processed/bea_economic_data.pickle",
+    "data/processed/patient_labs/df_patient_filt_labs.pkl",
+    "data/processed/patient_labs/df_vital_filt_signs.pkl",
+    "data/processed/patient_labs/df_qols_filt_scores.pkl",
+]
+
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def _downcast_float(values: pd.Series) -> pd.Series:
+    """float32 copy of a float64 column if every value survives the round trip exactly, else the column itself."""
+    as_float32 = values.astype(np.float32)
+    round_trip = as_float32.astype(np.float64)
+    if ((round_trip == values) | (values.isna() & round_trip.isna())).all():
+        return as_float32
+    return values
+
+
+def compact_frame(df: pd.DataFrame, max_category_ratio: float = 0.5) -> pd.DataFrame:
+    """
+    Returns a copy of `df` with repeated strings stored as categoricals and numbers in the smallest dtype
+    that holds every value exactly.
+
+    Args:
+        df (pd.DataFrame): Frame to compact.
+        max_category_ratio (float): Object columns with at most this many distinct values per row become
+                                    categoricals (e.g. StateDesc, Measure_short); near-unique ones stay object.
+
+    Returns:
+        pd.DataFrame: The compacted frame. Values are unchanged: floats are only downcast to float32 when
+                      that is lossless, so displayed numbers and rankings stay the same.
+    """
+    df = df.copy()
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object:
+            if len(values) and values.nunique(dropna=True) <= max_category_ratio * len(values):
+                df[column] = values.astype('category')
+        elif pd.api.types.is_integer_dtype(values.dtype):
+            df[column] = pd.to_numeric(values, downcast='integer')
+        elif values.dtype == np.float64:
+            df[column] = _downcast_float(values)
+    return df
+
+
+def compact_processed_artifacts(
+    artifact_paths: list = processed_artifacts,
+    report_path: str = "data/processed/memory_report.json"
+) -> dict:
+    """
+    Compacts the dtypes of each processed pickle in place and reports the memory each one takes once loaded.
+
+    Args:
+        artifact_paths (list): Pickle files to compact; missing files are skipped.
+        report_path (str): File path where the per-artifact memory report is saved as JSON.
+
+    Returns:
+        dict: Artifact path -> bytes before and after, and the dtype of each changed column.
+    """
+    report = {}
+    for artifact_path in artifact_paths:
+        if not os.path.exists(artifact_path):
+            print(f"skipping {artifact_path}: not found")
+            continue
+        df = pd.read_pickle(artifact_path)
+        df_compact = compact_frame(df)
+        report[artifact_path] = {
+            'rows': len(df),
+            'bytes_before': _frame_bytes(df),
+            'bytes_after': _frame_bytes(df_compact),
+            'columns': {column: f"{df[column].dtype} -> {df_compact[column].dtype}"
+                        for column in df.columns if df[column].dtype != df_compact[column].dtype},
+        }
+        df_compact.to_pickle(artifact_path)
+
+    print(f"{'artifact':<55} {'rows':>8} {'before MB':>10} {'after MB':>10} {'saved':>6}")
+    for artifact_path, entry in report.items():
+        saved = 1 - entry['bytes_after'] / entry['bytes_before'] if entry['bytes_before'] else 0.0
+        print(f"{artifact_path:<55} {entry['rows']:>8,} {entry['bytes_before'] / 1e6:>10.1f} "
+              f"{entry['bytes_after'] / 1e6:>10.1f} {saved:>6.0%}")
+        for column, change in entry['columns'].items():
+            print(f"    {column}: {change}")
+
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"memory report saved to: {report_path}")
+    return report
@@ -0,0 +1,55 @@
+import sys
+
+
+class CountyIndex:
+    """
+    Lookups for the County tab, built once from the summary and measures frames.
+
+    Attributes:
+        states (list): Sorted state names.
+        county_options (dict): State -> county dropdown options, sorted by county name.
+        geoids (dict): (state, county) -> (GEOID, matched_GEOID); matched_GEOID is the BEA GeoFips.
+        summary_rows (dict): GEOID -> row position in the summary frame.
+        measure_rows (dict): GEOID -> row positions (ascending) in the measures frame.
+    """
+
+    def __init__(self, df_summary, df_measures):
+        self.df_summary = df_summary
+        self.df_measures = df_measures
+
+        self.geoids = {
+            (state, county): (geoid, matched_geoid)
+            for state, county, geoid, matched_geoid in zip(df_summary['StateDesc'], df_summary['LocationName'],
+                                                           df_summary['GEOID'], df_summary['matched_GEOID'])
+        }
+        self.summary_rows = {geoid: position for position, geoid in enumerate(df_summary['GEOID'])}
+        self.measure_rows = df_measures.groupby('GEOID', sort=False, observed=True).indices
+
+        self.states = sorted(df_summary['StateDesc'].unique())
+        self.county_options = {
+            state: [{'label': county, 'value': county} for county in sorted(counties.unique())]
+            for state, counties in df_summary.groupby('StateDesc', observed=True)['LocationName']
+        }
+
+    def nbytes(self):
+        """
+        Rough memory of the lookups (containers and position arrays; the strings are shared with the frames).
+        The frames themselves belong to the registry and are not counted.
+        """
+        lookups = [self.geoids, self.summary_rows, self.measure_rows, self.county_options]
+        nbytes = sum(sys.getsizeof(lookup) for lookup in lookups)
+        nbytes += sum(positions.nbytes for positions in self.measure_rows.values())
+        nbytes += sum(sys.getsizeof(options) + len(options) * sys.getsizeof({}) for options in self.county_options.values())
+        return nbytes
+
+    def lookup(self, selected_state, selected_county):
+        """(GEOID, matched_GEOID) of a county."""
+        return self.geoids[(selected_state, selected_county)]
+
+    def summary_row(self, geoid):
+        """Summary frame rows (one) of a county, as a DataFrame."""
+        position = self.summary_rows[geoid]
+        return self.df_summary.iloc[position:position + 1]
+
+    def county_measures(self, geoid):
+        return self.df_measures.iloc[self.measure_rows.get(geoid, [])]
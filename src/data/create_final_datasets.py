@@ -81,7 +81,7 @@ def create_final_summary_df(
     check_fips_county_data_ranking(df_bea, df_ranking)
 
     # Pivot BEA data for merging
-    df_bea_pivot = df_bea.pivot_table(index='GeoFips', columns='Statistic', values='DataValue', aggfunc='first')
+    df_bea_pivot = df_bea.pivot_table(index='GeoFips', columns='Statistic', values='DataValue', aggfunc='first', observed=True)
 
     # Merge the DataFrames
     df_summary = pd.merge(df_ranking, df_bea_pivot, left_on='matched_GEOID', right_index=True, how='left')
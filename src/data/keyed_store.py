@@ -0,0 +1,102 @@
+import json
+import mmap
+import os
+
+import numpy as np
+
+records_file = "records.bin"
+offsets_file = "offsets.npy"
+manifest_file = "manifest.json"
+
+
+class KeyedStore:
+    """
+    Read-only JSON records concatenated in one file, looked up by key through an offset index.
+
+    The records file is memory-mapped, so `get` reads one record without opening a file and gunicorn
+    workers share the pages.
+
+    Attributes:
+        keys (list): Record keys in file order (the manifest).
+        offsets (np.ndarray): int64 array of len(keys) + 1 byte boundaries; record i is records[offsets[i]:offsets[i + 1]].
+        meta (dict): Extra fields written with the manifest, e.g. the sources the records were built from.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, manifest_file)) as f:
+            manifest = json.load(f)
+        self.keys = manifest['keys']
+        self.meta = manifest.get('meta', {})
+        self.offsets = np.load(os.path.join(directory, offsets_file))
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+
+        with open(os.path.join(directory, records_file), 'rb') as f:
+            # mmap cannot map an empty file
+            self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.offsets[-1] else b''
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def nbytes(self):
+        return int(self.offsets[-1]) + int(self.offsets.nbytes)
+
+    def get_bytes(self, key):
+        """Raw JSON bytes of the record stored under `key`; KeyError if there is none."""
+        position = self.positions[key]
+        return self._records[self.offsets[position]:self.offsets[position + 1]]
+
+    def __getitem__(self, key):
+        return json.loads(self.get_bytes(key))
+
+    def get(self, key, default=None):
+        """The record stored under `key`, parsed, or `default` if there is none."""
+        if key not in self.positions:
+            return default
+        return self[key]
+
+
+def write_keyed_store(directory, records, meta=None, cls=None):
+    """
+    Writes (key, record) pairs as a KeyedStore: records.bin, offsets.npy and a manifest with the keys.
+
+    Args:
+        directory (str): Directory the store is written to; created if missing.
+        records (iterable): (key, JSON-serializable record) pairs, in the order they are stored.
+        meta (dict): Extra fields saved in the manifest, available as `KeyedStore.meta`.
+        cls (json.JSONEncoder): Encoder for records with values json can't serialize (e.g. PlotlyJSONEncoder).
+
+    Returns:
+        int: Number of records written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    # a store being rewritten is invalid until its new manifest is in place
+    if os.path.exists(os.path.join(directory, manifest_file)):
+        os.remove(os.path.join(directory, manifest_file))
+    keys = []
+    offsets = [0]
+    # written next to the old files and moved into place, so workers that still map the old records keep reading them
+    with open(os.path.join(directory, records_file + ".tmp"), 'wb') as f:
+        for key, record in records:
+            data = json.dumps(record, cls=cls, ensure_ascii=False).encode('utf-8')
+            f.write(data)
+            keys.append(key)
+            offsets.append(offsets[-1] + len(data))
+    with open(os.path.join(directory, offsets_file + ".tmp"), 'wb') as f:
+        np.save(f, np.array(offsets, dtype=np.int64))
+    for file_name in [records_file, offsets_file]:
+        os.replace(os.path.join(directory, file_name + ".tmp"), os.path.join(directory, file_name))
+
+    # manifest last, so a partial write is never picked up
+    with open(os.path.join(directory, manifest_file), 'w') as f:
+        json.dump({'keys': keys, 'meta': meta or {}}, f)
+    return len(keys)
+
+
+def open_keyed_store(directory):
+    """The KeyedStore in `directory`, or None if none has been written there."""
+    if not os.path.exists(os.path.join(directory, manifest_file)):
+        return None
+    return KeyedStore(directory)
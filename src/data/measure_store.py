@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+
+class MeasurePartition:
+    """
+    Rows of one measure: column arrays in frame order plus the statistics the Health Measures tab needs.
+
+    Attributes:
+        arrays (dict): Column name -> values of the measure's rows, in frame order.
+        percentile_low (float): 5th percentile of Data_Value (colour scale minimum).
+        percentile_high (float): 95th percentile of Data_Value (colour scale maximum).
+        min_value (float): Smallest Data_Value.
+        max_value (float): Largest Data_Value.
+        state_order (np.ndarray): Row positions (in the partition) sorted by state, frame order within a state.
+        state_offsets (dict): State -> (start, stop) of its rows in `state_order`.
+    """
+
+    def __init__(self, df, columns):
+        self.arrays = {column: df[column].to_numpy() for column in columns}
+        values = df['Data_Value']
+        self.percentile_low = values.quantile(0.05)
+        self.percentile_high = values.quantile(0.95)
+        self.min_value = values.min()
+        self.max_value = values.max()
+
+        state_codes, state_names = pd.factorize(df['StateDesc'])
+        self.state_order = np.argsort(state_codes, kind='stable')
+        counts = np.bincount(state_codes, minlength=len(state_names))
+        stops = np.cumsum(counts)
+        self.state_offsets = {state: (int(stop - count), int(stop)) for state, count, stop in zip(state_names, counts, stops)}
+
+    def __len__(self):
+        return len(self.state_order)
+
+    def positions(self, selected_state=None):
+        """
+        Row positions of the selected states (all states when None/empty), in frame order, like
+        `filtered_df[filtered_df['StateDesc'].isin(selected_state)]`.
+        """
+        if not selected_state:
+            return np.arange(len(self))
+        ranges = [self.state_offsets[state] for state in dict.fromkeys(selected_state) if state in self.state_offsets]
+        if not ranges:
+            return np.array([], dtype=int)
+        return np.sort(np.concatenate([self.state_order[start:stop] for start, stop in ranges]))
+
+    def columns(self, column_names, selected_state=None):
+        """Column arrays of the selected states' rows, in frame order."""
+        positions = self.positions(selected_state)
+        return {column: self.arrays[column][positions] for column in column_names}
+
+
+class MeasureStore:
+    """
+    The measures frame partitioned by Measure_short at load time, so a measure/state selection slices
+    ready-made arrays instead of filtering the whole frame.
+    """
+
+    columns = ['GEOID', 'Data_Value', 'LocationName', 'StateDesc', 'Year']
+
+    def __init__(self, df_measures):
+        self.partitions = {
+            measure: MeasurePartition(df, self.columns)
+            for measure, df in df_measures.groupby('Measure_short', sort=True, observed=True)
+        }
+        self.measures = list(self.partitions)
+        # unknown or cleared measure: no rows and NaN statistics, like filtering the frame would give
+        self._empty = MeasurePartition(df_measures.iloc[:0], self.columns)
+
+    def nbytes(self):
+        """Memory of the partition arrays (object columns counted by their pointers; the strings are shared with the frame)."""
+        return sum(
+            sum(values.nbytes for values in partition.arrays.values()) + partition.state_order.nbytes
+            for partition in self.partitions.values()
+        )
+
+    def __getitem__(self, measure):
+        return self.partitions.get(measure, self._empty)
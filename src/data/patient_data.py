@@ -7,6 +7,7 @@ import pandas as pd
 from tqdm import tqdm
 from openai import OpenAI
 
+from .keyed_store import write_keyed_store
 from .prompt import prompt_template
 
 
@@ -624,6 +625,31 @@ def consolidate_ai_summaries(
 
     print(f"Consolidated {len(all_summaries)} AI patient summaries into '{consolidated_file_path}'")
 
+def save_ai_summary_store(
+        summaries_dir: str = "data/processed/AI_summaries",
+        store_dir: str = "data/processed/AI_summaries_store"
+        ) -> None:
+    """
+    Writes the per-patient AI summary files as one keyed store (see src/data/keyed_store.py) with the patient IDs
+    as its manifest, which the AI tab reads summaries and the patient list from.
+
+    Parameters:
+    - summaries_dir (str, optional): The directory of the per-patient summary JSON files.
+    - store_dir (str, optional): The directory where the store is written.
+
+    Returns:
+    - None
+    """
+    patient_ids = sorted(filename[:-5] for filename in os.listdir(summaries_dir) if filename.endswith(".json"))
+
+    def records():
+        for patient_id in patient_ids:
+            with open(os.path.join(summaries_dir, f"{patient_id}.json"), 'r', encoding='utf-8') as file:
+                yield patient_id, json.load(file)
+
+    num_records = write_keyed_store(store_dir, records())
+    print(f"AI summary store with {num_records} patients saved to '{store_dir}'")
+
 def filter_lab_data( 
         labs_data_dir: str = "data/processed/patient_labs",
         json_summaries_dir: str = "data/processed/AI_summaries"
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+
+class PatientSlices:
+    """
+    A patient frame (labs, vital signs or QOLS scores) sorted by PATIENT at load time, with the (start, stop)
+    of each patient's rows, so a patient's rows are one slice instead of a `PATIENT == id` scan of the frame.
+
+    Attributes:
+        df (pd.DataFrame): The frame, stably sorted by PATIENT: rows keep their original order within a patient.
+        offsets (dict): Patient ID -> (start, stop) of the patient's rows in `df`.
+    """
+
+    def __init__(self, df):
+        patient_codes, patient_ids = pd.factorize(df['PATIENT'])
+        order = np.argsort(patient_codes, kind='stable')
+        self.df = df.iloc[order]
+        counts = np.bincount(patient_codes[patient_codes >= 0], minlength=len(patient_ids))
+        stops = np.cumsum(counts)
+        # rows with no PATIENT (code -1) sort first and belong to no patient
+        skipped = int((patient_codes < 0).sum())
+        self.offsets = {patient_id: (skipped + int(stop - count), skipped + int(stop))
+                        for patient_id, count, stop in zip(patient_ids, counts, stops)}
+
+    def __contains__(self, patient_id):
+        return patient_id in self.offsets
+
+    def nbytes(self):
+        return int(self.df.memory_usage(deep=True).sum())
+
+    def rows(self, patient_id):
+        """The patient's rows in their original order, like `df[df.PATIENT == patient_id]`; no rows for an unknown patient."""
+        start, stop = self.offsets.get(patient_id, (0, 0))
+        return self.df.iloc[start:stop]
+
+
+def rows_by_description(df_patient):
+    """
+    One patient's rows per DESCRIPTION, in order of first appearance (the order of `DESCRIPTION.unique()`),
+    each in original row order, like `df_patient[df_patient['DESCRIPTION'] == description]`.
+    """
+    return dict(tuple(df_patient.groupby('DESCRIPTION', sort=False, observed=True)))
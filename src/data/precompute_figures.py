@@ -0,0 +1,106 @@
+import json
+import os
+
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+from tqdm import tqdm
+
+from src.data.keyed_store import write_keyed_store
+from src.tabs import ai_patient_view, overall_view, measure_view
+from src.tabs.response_encoding import trim_floats
+from src.tabs.precomputed_views import (all_states_key, artifact_path, manifest_file, manifest_key,
+                                        patient_source_versions, patient_view_key, patient_views_dir,
+                                        source_versions)
+
+
+def _write_view(output_dir: str, relative_path: str, payload: dict) -> None:
+    file_path = os.path.join(output_dir, relative_path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w') as f:
+        json.dump(payload, f, cls=PlotlyJSONEncoder)
+
+
+def precompute_figures(output_dir: str = "data/processed/precomputed_views") -> None:
+    """
+    Renders the Summary tab (map, scatter, table) for all states and every single state, and the
+    Health Measures tab (map, table) for every measure with all states and every single state,
+    and saves each as a JSON artifact with a manifest the dashboard callbacks look them up in.
+    Multi-state selections are not precomputed and are rendered live.
+
+    Args:
+        output_dir (str): Directory where the JSON artifacts and the manifest are written.
+
+    Returns:
+        None: The function saves the artifacts to output_dir but does not return any value.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    views = {}
+
+    print("precomputing Summary tab views")
+    df_ranking = overall_view.get_df_ranking()
+    summary_keys = [all_states_key] + list(overall_view.get_available_states())
+    for key in tqdm(summary_keys):
+        selected_state = None if key == all_states_key else [key]
+        data, style = overall_view.create_updated_table(selected_state)
+        payload = {
+            'map': overall_view.create_updated_map(df_ranking, selected_state),
+            'scatter': overall_view.create_updated_scatter_chart(df_ranking, selected_state),
+            'table': {'data': data, 'style': style},
+        }
+        relative_path = artifact_path('summary', key)
+        _write_view(output_dir, relative_path, payload)
+        views[manifest_key('summary', key)] = relative_path
+
+    print("precomputing Health Measures tab views")
+    measure_keys = [all_states_key] + list(measure_view.get_available_states())
+    for selected_measure in tqdm(measure_view.get_available_measures()):
+        for key in measure_keys:
+            selected_state = None if key == all_states_key else [key]
+            data, style = measure_view.create_updated_table_measures(selected_state, selected_measure)
+            payload = {
+                'map': measure_view.create_updated_map_measures(selected_state, selected_measure),
+                'table': {'data': data, 'style': style},
+            }
+            relative_path = artifact_path('measure', key, selected_measure)
+            _write_view(output_dir, relative_path, payload)
+            views[manifest_key('measure', key, selected_measure)] = relative_path
+
+    # manifest last, so a partial run is never picked up
+    with open(os.path.join(output_dir, manifest_file), 'w') as f:
+        json.dump({'sources': source_versions(), 'views': views}, f)
+
+    print(f"{len(views)} precomputed views saved to: {output_dir}")
+
+
+def precompute_patient_views(store_dir: str = patient_views_dir) -> None:
+    """
+    Renders the AI tab for every patient with an AI summary: the summary markdown and the figures of each
+    chart card, saved as a keyed store (see src/data/keyed_store.py) with one record per patient and part,
+    which the AI tab callbacks look them up in. Patients added after the build are rendered live.
+
+    Args:
+        store_dir (str): Directory where the store is written.
+
+    Returns:
+        None: The function saves the store to store_dir but does not return any value.
+    """
+    print("precomputing AI tab patient views")
+    patient_ids = sorted(ai_patient_view.get_all_patient_ids())
+    # the expanded plotly_dark template is most of each figure's JSON; it is saved once and put back on lookup
+    layout_template = trim_floats(go.Figure(layout={'template': 'plotly_dark'}).to_dict()['layout']['template'])
+
+    def without_layout_template(figure):
+        if figure['layout'].get('template') != layout_template:
+            return figure
+        return {**figure, 'layout': {key: value for key, value in figure['layout'].items() if key != 'template'}}
+
+    def records():
+        for patient_id in tqdm(patient_ids):
+            yield patient_view_key(patient_id, 'summary'), ai_patient_view.load_patient_summary(patient_id)
+            for card in ai_patient_view.chart_cards:
+                figures = ai_patient_view.create_patient_card_figures(patient_id, card)
+                yield patient_view_key(patient_id, card), [without_layout_template(figure) for figure in figures]
+
+    meta = {'sources': patient_source_versions(), 'layout_template': layout_template}
+    num_records = write_keyed_store(store_dir, records(), meta=meta, cls=PlotlyJSONEncoder)
+    print(f"{len(patient_ids)} precomputed patient views ({num_records} records) saved to: {store_dir}")
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from src.data.bea_cube import save_bea_cube
+
 
 def process_bea_data(
     bea_income_file: str = "data/interim/df_BEA_income_1969_2023.pickle",
@@ -145,4 +147,7 @@ def process_bea_data(
 
     fileout = "data/processed/bea_economic_data.pickle"
     df_income_combined.to_pickle(fileout)
-    print(f"file saved to: {fileout}")
\ No newline at end of file
+    print(f"file saved to: {fileout}")
+
+    # the same data as a (geo x statistic x year) cube for the County tab
+    save_bea_cube(bea_file=fileout, output_dir="data/processed/bea_cube")
\ No newline at end of file
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+
+class RankingIndex:
+    """
+    Row orders of a frame presorted by one value column, per partition (e.g. measure) and per state,
+    for the "ten best and worst" tables.
+
+    Rows are ordered by value ascending with NaN last (like `sort_values`), ties in frame order.
+    """
+
+    def __init__(self, df, value_column, state_column='StateDesc', partition_column=None):
+        self.columns = list(df.columns)
+        self.arrays = {column: df[column].to_numpy() for column in self.columns}
+
+        values = df[value_column].to_numpy(dtype=float)
+        self.values = values
+        self._is_nan = np.isnan(values)
+        self._values_filled = np.where(self._is_nan, 0.0, values)
+        positions = np.arange(len(df))
+
+        if partition_column:
+            partition_codes, partition_names = pd.factorize(df[partition_column])
+        else:
+            partition_codes, partition_names = np.zeros(len(df), dtype=int), [None]
+        state_codes, state_names = pd.factorize(df[state_column])
+        num_states = len(state_names)
+
+        # one sort per grouping; the per-group orders are views into it
+        self.orders = {}
+        by_partition = np.lexsort((positions, self._values_filled, self._is_nan, partition_codes))
+        for code, group in self._split(by_partition, partition_codes):
+            self.orders[(partition_names[code], None)] = group
+        group_codes = partition_codes * num_states + state_codes
+        by_state = np.lexsort((positions, self._values_filled, self._is_nan, group_codes))
+        for code, group in self._split(by_state, group_codes):
+            self.orders[(partition_names[code // num_states], state_names[code % num_states])] = group
+
+    @staticmethod
+    def _split(order, codes):
+        """(code, positions) for each run of equal codes in `order`."""
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        stops = np.r_[starts[1:], len(order)]
+        return [(sorted_codes[start], order[start:stop]) for start, stop in zip(starts, stops)]
+
+    def top_bottom(self, max_values, selected_state=None, partition=None):
+        """
+        Row positions of the `max_values` lowest then the `max_values` highest values among the selected states
+        (all states when None), like `head` + `tail` of the sorted filtered frame, including the overlap when
+        fewer than 2 * max_values rows match.
+        """
+        if not selected_state:
+            order = self.orders.get((partition, None), np.array([], dtype=int))
+        else:
+            groups = [self.orders[(partition, state)] for state in dict.fromkeys(selected_state)
+                      if (partition, state) in self.orders]
+            if len(groups) == 1:
+                order = groups[0]
+            else:
+                # the overall best/worst rows are among each state's own best/worst, so only those are merged
+                candidates = np.unique(np.concatenate([np.r_[group[:max_values], group[-max_values:]] for group in groups]
+                                                      or [np.array([], dtype=int)]))
+                order = candidates[np.lexsort((candidates, self._values_filled[candidates], self._is_nan[candidates]))]
+        return np.r_[order[:max_values], order[-max_values:]] if len(order) else order
+
+    def records(self, positions, extra_columns=None, round_columns=None, fill_na=None):
+        """
+        Table rows for `positions`, like `df.iloc[positions].to_dict('records')`.
+
+        Args:
+            positions (np.ndarray): Row positions.
+            extra_columns (dict): Column name -> list of values, appended after the frame's columns.
+            round_columns (dict): Column name -> decimals, rounded like `Series.round`.
+            fill_na: Replacement for missing values (None/NaN), like `fillna`; missing values are kept when None.
+        """
+        columns = {}
+        for column in self.columns:
+            values = self.arrays[column][positions]
+            if round_columns and column in round_columns:
+                values = np.round(values.astype(float), round_columns[column])
+            columns[column] = values.tolist()
+        columns.update(extra_columns or {})
+        if fill_na is not None:
+            columns = {column: [fill_na if pd.isna(value) else value for value in values] for column, values in columns.items()}
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
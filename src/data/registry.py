@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data.bea_cube import load_bea_cube
+from src.data.county_index import CountyIndex
+from src.data.keyed_store import open_keyed_store
+from src.data.measure_store import MeasureStore
+from src.data.patient_index import PatientSlices
+from src.data.ranking_index import RankingIndex
+
+logger = logging.getLogger(__name__)
+
+
+class DataRegistry:
+    """
+    Loads each data artifact once, on first access, and hands out the shared object.
+
+    Artifacts are shared by every tab module and callback in the worker. The numpy arrays an artifact owns
+    (its own arrays and those indexes and stores computed) are made read-only when it is loaded. Frames, and
+    arrays that are views of a frame's columns, can't be locked that way (pandas needs to write to them), so
+    callers must copy before modifying them.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._artifacts = {}
+        self._load_seconds = {}
+        self._nbytes = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, loader):
+        """Register a zero-argument loader for an artifact; nothing is loaded until `get(name)`."""
+        self._loaders[name] = loader
+
+    def get(self, name):
+        if name in self._artifacts:
+            return self._artifacts[name]
+        with self._lock:
+            # another thread may have loaded it while we waited for the lock
+            if name not in self._artifacts:
+                start = time.perf_counter()
+                artifact = self._loaders[name]()
+                make_arrays_read_only(artifact)
+                self._load_seconds[name] = time.perf_counter() - start
+                # published last: readers outside the lock only check `_artifacts`
+                self._artifacts[name] = artifact
+                logger.info("loaded %s in %.2fs", name, self._load_seconds[name])
+        return self._artifacts[name]
+
+    def is_loaded(self, name):
+        return name in self._artifacts
+
+    def report(self):
+        """Loaded state, load time and approximate memory use (bytes) of every registered artifact."""
+        report = {}
+        for name in self._loaders:
+            loaded = name in self._artifacts
+            if loaded and name not in self._nbytes:
+                # measured on the first report rather than at load, to keep it off the request path
+                self._nbytes[name] = artifact_nbytes(self._artifacts[name])
+            report[name] = {
+                'loaded': loaded,
+                'load_seconds': round(self._load_seconds[name], 3) if loaded else None,
+                'bytes': self._nbytes[name] if loaded else 0,
+            }
+        return report
+
+
+def make_arrays_read_only(obj, _seen=None):
+    """
+    Clear the writeable flag of the numpy arrays in `obj` that own their data: the object itself, the values of
+    dicts, lists and tuples, and the attributes of objects (e.g. a RankingIndex). Frames and series are not
+    entered, and views (e.g. `df[column].to_numpy()`) are left alone: locking one locks the frame's column
+    too, and pandas fails on read-only object columns (`memory_usage(deep=True)` in `report`).
+    """
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen:
+        return
+    _seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        if obj.flags.owndata:
+            obj.flags.writeable = False
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            make_arrays_read_only(value, _seen)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            make_arrays_read_only(value, _seen)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, (pd.DataFrame, pd.Series, type)):
+        for value in vars(obj).values():
+            make_arrays_read_only(value, _seen)
+
+
+def artifact_nbytes(obj):
+    """Approximate memory use of an artifact, including the contents of containers."""
+    if hasattr(obj, 'nbytes') and callable(obj.nbytes):
+        return int(obj.nbytes())
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(artifact_nbytes(k) + artifact_nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(artifact_nbytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def _load_json(file_path):
+    with open(file_path) as f:
+        return json.load(f)
+
+
+ai_summaries_dir = "data/processed/AI_summaries"
+# written by `run_pipelines.py --consolidate_summaries`
+ai_summary_store_dir = "data/processed/AI_summaries_store"
+
+
+def _list_ai_summary_patient_ids(directory_path=ai_summaries_dir):
+    # the store's manifest when there is one, otherwise one file per patient
+    summary_store = data_registry.get('ai_summary_store')
+    if summary_store is not None:
+        return summary_store.keys
+    return [filename[:-5] for filename in os.listdir(directory_path) if filename.endswith(".json")]
+
+
+patient_labs_dir = "data/processed/patient_labs/"
+
+data_registry = DataRegistry()
+data_registry.register('df_summary', lambda: pd.read_pickle("data/processed/df_summary_final.pickle"))
+data_registry.register('df_measures', lambda: pd.read_pickle("data/processed/df_measures_final.pickle"))
+data_registry.register('df_bea', lambda: pd.read_pickle("data/processed/bea_economic_data.pickle"))
+data_registry.register('gam_model_output', lambda: pd.read_pickle("models/gam_model_output.pkl"))
+data_registry.register('counties_geojson', lambda: _load_json("data/processed/us_census_counties_geojson.json"))
+data_registry.register('df_labs', lambda: pd.read_pickle(f"{patient_labs_dir}df_patient_filt_labs.pkl"))
+data_registry.register('df_vital_signs', lambda: pd.read_pickle(f"{patient_labs_dir}df_vital_filt_signs.pkl"))
+data_registry.register('df_qols_scores', lambda: pd.read_pickle(f"{patient_labs_dir}df_qols_filt_scores.pkl"))
+data_registry.register('ai_summary_store', lambda: open_keyed_store(ai_summary_store_dir))
+data_registry.register('ai_patient_ids', _list_ai_summary_patient_ids)
+# the same ids as a set, to check a patient id from the client in O(1)
+data_registry.register('ai_patient_id_set', lambda: frozenset(data_registry.get('ai_patient_ids')))
+# derived lookups, built from the artifacts above on first use
+data_registry.register('county_index', lambda: CountyIndex(data_registry.get('df_summary'), data_registry.get('df_measures')))
+# memory-mapped from data/processed/bea_cube when the pipeline wrote it, otherwise built from the BEA pickle
+data_registry.register('bea_cube', load_bea_cube)
+data_registry.register('summary_ranking', lambda: RankingIndex(data_registry.get('df_summary'), 'Weighted_Score_Normalized'))
+data_registry.register('measure_ranking', lambda: RankingIndex(data_registry.get('df_measures'), 'Data_Value',
+                                                               partition_column='Measure_short'))
+data_registry.register('measure_store', lambda: MeasureStore(data_registry.get('df_measures')))
+# patient frames sorted by PATIENT, read from the pickles directly so the unsorted frames aren't kept as well
+data_registry.register('labs_slices', lambda: PatientSlices(pd.read_pickle(f"{patient_labs_dir}df_patient_filt_labs.pkl")))
+data_registry.register('vital_signs_slices', lambda: PatientSlices(pd.read_pickle(f"{patient_labs_dir}df_vital_filt_signs.pkl")))
+data_registry.register('qols_slices', lambda: PatientSlices(pd.read_pickle(f"{patient_labs_dir}df_qols_filt_scores.pkl")))
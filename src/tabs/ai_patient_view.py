@@ -1,35 +1,30 @@
 import json
-import os
+from functools import lru_cache
 
-import pandas as pd
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 
+from src.data.patient_index import rows_by_description
+from src.data.registry import ai_summaries_dir, data_registry
+from src.tabs.figure_builder import FigureTemplate
 from src.tabs.helper_data import ai_summary_explanation
 
-# load lab data
-patient_labs_dir="data/processed/patient_labs/"
-df_labs = pd.read_pickle(f"{patient_labs_dir}df_patient_filt_labs.pkl")
-df_vital_signs = pd.read_pickle(f"{patient_labs_dir}df_vital_filt_signs.pkl")
-df_qols_scores = pd.read_pickle(f"{patient_labs_dir}df_qols_filt_scores.pkl")
+# lab data and patient ids are loaded on first use through the data registry
+def get_all_patient_ids():
+    """Patients with an AI summary, from the summary store's manifest (or data/processed/AI_summaries without one)."""
+    return data_registry.get('ai_patient_ids')
 
-patient_ids_labs = df_labs['PATIENT'].unique().tolist()
-patient_ids_vital_signs = df_vital_signs['PATIENT'].unique().tolist()
-patient_ids_qols_scores = df_qols_scores['PATIENT'].unique().tolist()
-all_patient_ids = list(set(patient_ids_labs + patient_ids_vital_signs + patient_ids_qols_scores))
-
-
-directory_path = "data/processed/AI_summaries"
-all_patient_ids = []
-for filename in os.listdir(directory_path):
-    if filename.endswith(".json"):
-        patient_id = filename[:-5]  
-        all_patient_ids.append(patient_id)
+def is_patient_id(patient_id):
+    """Whether `patient_id` (e.g. a value sent back by the client) is one of `get_all_patient_ids()`."""
+    return isinstance(patient_id, str) and patient_id in data_registry.get('ai_patient_id_set')
 
 
 def load_patient_summary(patient_id):
-    filename = f"data/processed/AI_summaries/{patient_id}.json"  
+    summary_store = data_registry.get('ai_summary_store')
+    if summary_store is not None:
+        return summary_store[patient_id]["summary"]
+    filename = f"{ai_summaries_dir}/{patient_id}.json"  
     with open(filename, 'r') as file:
         patient_summary = json.load(file)
     return patient_summary["summary"]
@@ -71,56 +66,65 @@ def create_collapsible_summary_card(title, content):
     return card
 
 
-def get_labs_for_single_patient(df_labs, df_vital_signs, df_qols_scores,patient_id="0b11553a-812e-a13b-e3ad-a13c7c4c5e2a"):
+def get_labs_for_single_patient(patient_id="0b11553a-812e-a13b-e3ad-a13c7c4c5e2a"):
 
-    df_labs_patient = df_labs[df_labs.PATIENT==patient_id]
-    df_vital_signs_patient = df_vital_signs[df_vital_signs.PATIENT==patient_id]
-    df_qols_scores_patient = df_qols_scores[df_qols_scores.PATIENT==patient_id]
+    # one slice per frame from the patient index instead of scanning each frame
+    df_labs_patient = data_registry.get('labs_slices').rows(patient_id)
+    df_vital_signs_patient = data_registry.get('vital_signs_slices').rows(patient_id)
+    df_qols_scores_patient = data_registry.get('qols_slices').rows(patient_id)
     
     return df_labs_patient, df_vital_signs_patient, df_qols_scores_patient
 
+@lru_cache(maxsize=None)
+def no_data_template(text):
+    """Placeholder figure with a centred message, for patients without labs, vitals or QOLS scores."""
+    fig = go.Figure()
+    fig.add_annotation(text=text,
+                       xref="paper", yref="paper",
+                       x=0.5, y=0.5, showarrow=False,
+                       font=dict(size=32, color="gray"))
+    fig.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+    return FigureTemplate(fig)
+
+color_palette = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', 
+                '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+@lru_cache(maxsize=None)
+def lab_chart_template():
+    """Lab result chart layout and a lines+markers trace in each colour of `color_palette`, validated once."""
+    fig = go.Figure()
+    for color in color_palette:
+        fig.add_trace(go.Scatter(
+            mode='lines+markers',
+            line=dict(color=color)
+        ))
+    fig.update_layout(template="plotly_dark", title_text='', showlegend=True,
+                    legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top'))
+    fig.update_yaxes(title_text='')
+    return FigureTemplate(fig)
+
 def create_charts_patient(df_labs_patient):
 
     if df_labs_patient.empty:
-
-        fig = go.Figure()
-        fig.add_annotation(text="No Lab Results Available",
-                           xref="paper", yref="paper",
-                           x=0.5, y=0.5, showarrow=False,
-                           font=dict(size=32, color="gray"))
-        fig.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-        return [fig]
+        return [no_data_template("No Lab Results Available").figure()]
     
     else:
-        color_palette = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', 
-                        '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
-        unique_descriptions = df_labs_patient['DESCRIPTION'].unique()
+        template = lab_chart_template()
         color_index = 0
         figures = []
 
-        for description in unique_descriptions:
-            df_filtered = df_labs_patient[df_labs_patient['DESCRIPTION'] == description]
+        for description, df_filtered in rows_by_description(df_labs_patient).items():
             unique_units = df_filtered['UNITS'].unique()
             
             if len(unique_units) == 1:
                 units = unique_units[0]
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=df_filtered['DATE'],
-                    y=df_filtered['VALUE'],
-                    mode='lines+markers',
-                    name=f'{description} ({units})',
-                    line=dict(color=color_palette[color_index])
-                ))
-                fig.update_layout(template="plotly_dark", title_text=description, showlegend=True,
-                                legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top'))
-                fig.update_yaxes(title_text=f'{units}')
-                figures.append(fig)
+                trace = template.trace(color_index, x=df_filtered['DATE'], y=df_filtered['VALUE'], name=f'{description} ({units})')
+                figures.append(template.figure([trace], title={'text': description}, yaxis={'title': {'text': f'{units}'}}))
                 color_index = (color_index + 1) % len(color_palette)
 
         return figures
 
-def create_collapsible_charts_card(title, figures):
+def create_collapsible_charts_card(title):
     header_id = "collapse-charts-header"
     collapse_id = "collapse-charts"
     
@@ -132,113 +136,73 @@ def create_collapsible_charts_card(title, figures):
         style={'font-size': '2.5rem', 'color': 'white'}
     )
     
-    graphs = [dcc.Graph(figure=fig) for fig in figures]
-    
+    # the graphs are filled in when the collapse is first opened (see chart_cards)
     card = dbc.Card([
         dbc.CardHeader(button),
         dbc.Collapse(
-            dbc.CardBody(graphs),
+            dbc.CardBody(id=f"{collapse_id}-body"),
             id=collapse_id,
         )
     ], className="mb-4")
     
     return card
 
-def create_vital_signs_charts(df_vital_signs_patient):
-
-    if df_vital_signs_patient.empty:
-        fig = go.Figure()
-        fig.add_annotation(text="No Vitals Available",
-                           xref="paper", yref="paper",
-                           x=0.5, y=0.5, showarrow=False,
-                           font=dict(size=32, color="gray"))
-        fig.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-        return [fig]
-
-    else:
-        fig_bmi = go.Figure()
-        fig_bmi.add_trace(go.Scatter(
-            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Body mass index (BMI) [Ratio]']['DATE'],
-            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Body mass index (BMI) [Ratio]']['VALUE'],
-            mode='lines+markers',
-            name='BMI (kg/m2)',
-            line=dict(color='#FFA726')  
-        ))
-        fig_bmi.update_layout(template="plotly_dark", title_text="BMI", showlegend=True,
-                                legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
-        )
-        fig_bmi.update_yaxes(title_text="BMI (kg/m2)")
-
-        
-
-        fig_bp = go.Figure()
-        fig_bp.add_trace(go.Scatter(
-            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Diastolic Blood Pressure']['DATE'],
-            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Diastolic Blood Pressure']['VALUE'],
-            mode='lines+markers',
-            name='Diastolic BP (mmHg)',
-            line=dict(color='#673AB7')  # First BP trace color
-        ))
-        fig_bp.add_trace(go.Scatter(
-            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Systolic Blood Pressure']['DATE'],
-            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Systolic Blood Pressure']['VALUE'],
-            mode='lines+markers',
-            name='Systolic BP (mmHg)',
-            line=dict(color='#03A9F4')  # Second BP trace color
-        ))
-        fig_bp.update_layout(template="plotly_dark", title_text="Blood Pressure", showlegend=True,
-                                legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
-        )
-        fig_bp.update_yaxes(title_text="BP (mmHg)")
-        # Find the min and max values across both Diastolic and Systolic BP readings
-        min_bp = min(df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Diastolic Blood Pressure']['VALUE'].min(), 
-                    df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Systolic Blood Pressure']['VALUE'].min())
-        max_bp = max(df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Diastolic Blood Pressure']['VALUE'].max(), 
-                    df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Systolic Blood Pressure']['VALUE'].max())
-
-        #fig_bp.update_yaxes(range=[min_bp - 10, max_bp + 10])  # Adjust buffer as needed
-
-        
-
-        fig_hr_rr = go.Figure()
-        fig_hr_rr.add_trace(go.Scatter(
-            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Heart rate']['DATE'],
-            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Heart rate']['VALUE'],
-            mode='lines+markers',
-            name='Heart Rate (/min)',
-            line=dict(color='#D32F2F')  # Heart rate color
-        ))
-        fig_hr_rr.add_trace(go.Scatter(
-            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Respiratory rate']['DATE'],
-            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION'] == 'Respiratory rate']['VALUE'],
+# Vitals charts: (title, y axis title, [(DESCRIPTION, trace name, colour), ...])
+vital_signs_charts = {
+    'bmi': ("BMI", "BMI (kg/m2)", [
+        ('Body mass index (BMI) [Ratio]', 'BMI (kg/m2)', '#FFA726'),
+    ]),
+    'bp': ("Blood Pressure", "BP (mmHg)", [
+        ('Diastolic Blood Pressure', 'Diastolic BP (mmHg)', '#673AB7'),  # First BP trace color
+        ('Systolic Blood Pressure', 'Systolic BP (mmHg)', '#03A9F4'),  # Second BP trace color
+    ]),
+    'hr_rr': ("Heart and Respiratory Rate", "Rate (/min)", [
+        ('Heart rate', 'Heart Rate (/min)', '#D32F2F'),  # Heart rate color
+        ('Respiratory rate', 'Respiratory Rate (/min)', '#4CAF50'),  # Respiratory rate color
+    ]),
+    'pain': ("Pain Severity (reported)", "Pain Severity (0-10, reported)", [
+        ('Pain severity - 0-10 verbal numeric rating [Score] - Reported', 'Pain Severity (0-10)', '#FFEB3B'),  # Adjust as necessary
+    ]),
+}
+
+@lru_cache(maxsize=None)
+def vital_signs_template(chart):
+    """One of the `vital_signs_charts` without the patient's readings, validated once."""
+    title, yaxis_title, series = vital_signs_charts[chart]
+    fig = go.Figure()
+    for _, name, color in series:
+        fig.add_trace(go.Scatter(
             mode='lines+markers',
-            name='Respiratory Rate (/min)',
-            line=dict(color='#4CAF50')  # Respiratory rate color
+            name=name,
+            line=dict(color=color)
         ))
+    fig.update_layout(template="plotly_dark", title_text=title, showlegend=True,
+                            legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
+    )
+    fig.update_yaxes(title_text=yaxis_title)
+    return FigureTemplate(fig)
 
-        fig_hr_rr.update_layout(template="plotly_dark", title_text="Heart and Respiratory Rate", showlegend=True,
-                                legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top'))
+def create_vital_signs_charts(df_vital_signs_patient):
 
-        fig_hr_rr.update_yaxes(title_text="Rate (/min)")
-        
+    if df_vital_signs_patient.empty:
+        return [no_data_template("No Vitals Available").figure()]
 
-        fig_pain = go.Figure()
-        fig_pain.add_trace(go.Scatter(
-            x=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION']=='Pain severity - 0-10 verbal numeric rating [Score] - Reported']['DATE'],
-            y=df_vital_signs_patient[df_vital_signs_patient['DESCRIPTION']=='Pain severity - 0-10 verbal numeric rating [Score] - Reported']['VALUE'],
-            mode='lines+markers',
-            name='Pain Severity (0-10)',
-            line=dict(color='#FFEB3B')  # Adjust as necessary
-        ))
-        fig_pain.update_layout(
-            legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
-        )
-        fig_pain.update_layout(template="plotly_dark", title_text="Pain Severity (reported)", showlegend=True)
-        fig_pain.update_yaxes(title_text="Pain Severity (0-10, reported)")
-        
-        return [fig_bmi, fig_bp, fig_hr_rr, fig_pain]
+    else:
+        vital_signs_by_description = rows_by_description(df_vital_signs_patient)
+        no_rows = df_vital_signs_patient.iloc[:0]
+        figures = []
+        for chart, (_, _, series) in vital_signs_charts.items():
+            template = vital_signs_template(chart)
+            traces = []
+            for i, (description, _, _) in enumerate(series):
+                df_filtered = vital_signs_by_description.get(description, no_rows)
+                traces.append(template.trace(i, x=df_filtered['DATE'], y=df_filtered['VALUE']))
+            figures.append(template.figure(traces))
+
+        # [fig_bmi, fig_bp, fig_hr_rr, fig_pain]
+        return figures
 
-def create_collapsible_vital_signs_card(title, figures):
+def create_collapsible_vital_signs_card(title):
     header_id = "collapse-vital-signs-header"
     collapse_id = "collapse-vital-signs"
     
@@ -250,12 +214,11 @@ def create_collapsible_vital_signs_card(title, figures):
         style={'font-size': '2.5rem', 'color': 'white'}
     )
     
-    graphs = [dcc.Graph(figure=fig) for fig in figures]
-    
+    # the graphs are filled in when the collapse is first opened (see chart_cards)
     card = dbc.Card([
         dbc.CardHeader(button),
         dbc.Collapse(
-            dbc.CardBody(graphs),
+            dbc.CardBody(id=f"{collapse_id}-body"),
             id=collapse_id,
         )
     ], className="mb-4")
@@ -263,38 +226,37 @@ def create_collapsible_vital_signs_card(title, figures):
     return card
 
 # QOLS
+@lru_cache(maxsize=None)
+def qols_chart_template():
+    """QOLS chart without the patient's scores, validated once."""
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        mode='lines+markers',
+        name='QOLS Score'
+    ))
+
+    fig.update_layout(
+        title='QOLS Scores',
+        xaxis_title='Date',
+        yaxis_title='QOLS Score',
+        template="plotly_dark"
+    )
+    fig.update_yaxes(range=[0, 1])  
+
+    return FigureTemplate(fig)
+
 def create_qols_chart(df_qols_scores_patient):
 
     if df_qols_scores_patient.empty:
-        fig = go.Figure()
-        fig.add_annotation(text="No Quality of Life Data Available",
-                           xref="paper", yref="paper",
-                           x=0.5, y=0.5, showarrow=False,
-                           font=dict(size=32, color="gray"))
-        fig.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-        return fig
+        return no_data_template("No Quality of Life Data Available").figure()
 
     else:
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            x=df_qols_scores_patient['DATE'],
-            y=df_qols_scores_patient['VALUE'],
-            mode='lines+markers',
-            name='QOLS Score'
-        ))
-
-        fig.update_layout(
-            title='QOLS Scores',
-            xaxis_title='Date',
-            yaxis_title='QOLS Score',
-            template="plotly_dark"
-        )
-        fig.update_yaxes(range=[0, 1])  
+        template = qols_chart_template()
+        trace = template.trace(0, x=df_qols_scores_patient['DATE'], y=df_qols_scores_patient['VALUE'])
+        return template.figure([trace])
 
-        return fig
-
-def create_collapsible_qols_card(title, figure):
+def create_collapsible_qols_card(title):
     header_id = "collapse-qols-header"
     collapse_id = "collapse-qols"
     
@@ -306,12 +268,11 @@ def create_collapsible_qols_card(title, figure):
         style={'font-size': '2.5rem', 'color': 'white'}
     )
     
-    graph = dcc.Graph(figure=figure)
-    
+    # the graphs are filled in when the collapse is first opened (see chart_cards)
     card = dbc.Card([
         dbc.CardHeader(button),
         dbc.Collapse(
-            dbc.CardBody(graph),
+            dbc.CardBody(id=f"{collapse_id}-body"),
             id=collapse_id,
         )
     ], className="mb-4")
@@ -319,23 +280,37 @@ def create_collapsible_qols_card(title, figure):
     return card
 
 
-def create_updated_ai_patient_view(random_patient_id="e154f937-18c5-ebaa-1fd0-0b714169d18b"):
+def create_updated_ai_patient_view(random_patient_id="e154f937-18c5-ebaa-1fd0-0b714169d18b", patient_summary=None):
     
     patient_id_title = html.H3(f"Patient ID: {random_patient_id}", style={'color': 'white', 'textAlign': 'center', 'marginBottom': '20px'})
 
-    patient_summary = load_patient_summary(random_patient_id)
+    # a precomputed summary is passed in; otherwise it is read from the summary store
+    if patient_summary is None:
+        patient_summary = load_patient_summary(random_patient_id)
     summary_card = create_collapsible_summary_card("AI Patient Summary", patient_summary)
 
-    df_labs_patient, df_vital_signs_patient, df_qols_scores_patient = get_labs_for_single_patient(df_labs, df_vital_signs, df_qols_scores, random_patient_id)
-    
-    vital_signs_figures = create_vital_signs_charts(df_vital_signs_patient)
-    vital_signs_card = create_collapsible_vital_signs_card("Vitals", vital_signs_figures)
-    
-    lab_figures = create_charts_patient(df_labs_patient)
-    labs_card = create_collapsible_charts_card("Lab Results", lab_figures)
-
-    qols_figure = create_qols_chart(df_qols_scores_patient)
-    qols_card = create_collapsible_qols_card("Quality of Life", qols_figure)
+    vital_signs_card = create_collapsible_vital_signs_card("Vitals")
+    labs_card = create_collapsible_charts_card("Lab Results")
+    qols_card = create_collapsible_qols_card("Quality of Life")
 
     return patient_id_title, summary_card, vital_signs_card, labs_card, qols_card
 
+
+# Chart cards, built only when their collapse is opened: card -> (collapse id, slices of the patient's rows, figures)
+chart_cards = {
+    'vital_signs': ("collapse-vital-signs", 'vital_signs_slices', create_vital_signs_charts),
+    'labs': ("collapse-charts", 'labs_slices', create_charts_patient),
+    'qols': ("collapse-qols", 'qols_slices', lambda df: [create_qols_chart(df)]),
+}
+
+def create_patient_card_figures(patient_id, card):
+    """Figure dicts of one of the `chart_cards` for a patient; an unknown patient gets the "not available" figure."""
+    _, slices_name, create_figures = chart_cards[card]
+    df_patient = data_registry.get(slices_name).rows(patient_id)
+    return create_figures(df_patient)
+
+def create_patient_card_graphs(patient_id, card, figures=None):
+    """dcc.Graphs of one of the `chart_cards`, the children of the card body; `figures` are precomputed ones, built for the patient if None."""
+    if figures is None:
+        figures = create_patient_card_figures(patient_id, card)
+    return [dcc.Graph(figure=fig) for fig in figures]
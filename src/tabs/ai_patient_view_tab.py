@@ -1,9 +1,8 @@
 import dash
-from dash import html
+from dash import html, dcc
 import dash_bootstrap_components as dbc
 
 from src.tabs.helper_data import unhealth_score_explanation
-from src.tabs.ai_patient_view import create_updated_ai_patient_view
 
 default_patient_id = "e154f937-18c5-ebaa-1fd0-0b714169d18b"  
 
@@ -11,8 +10,7 @@ app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY, dbc.icons.BOO
 
 def ai_patient_view_tab_layout():
     
-    default_layout = create_updated_ai_patient_view(default_patient_id)
-
+    # patient content is filled in by the display_random_patient_data initial call
     layout = dbc.Container([
     html.Div([
         html.P("Explore synthetic medical patient data through an AI-generated patient summary which integrates patient history, current health status, local health metrics and the UnHealth Score.",
@@ -23,7 +21,11 @@ def ai_patient_view_tab_layout():
     html.Div([
         html.Button('Generate Report from Random Patient', id='generate-random-patient-button', className='custom-button-ai'),
     ], style={'display': 'flex', 'justifyContent': 'center', 'marginBottom': '20px'}),
-    html.Div(id='ai-patient-view-content', children=default_layout)
+    # patient shown in the view; its chart cards are rendered for it when opened
+    dcc.Store(id='ai-patient-id'),
+    # next random patient of this session, prepared in the background before the button is clicked
+    dcc.Store(id='ai-next-patient-id'),
+    html.Div(id='ai-patient-view-content')
 ], fluid=True, style={'marginTop': '20px'})
 
     
@@ -0,0 +1,284 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, got_request_exception, request
+
+from src.data.registry import data_registry
+from src.tabs.figure_cache import figure_cache
+from src.tabs.patient_prefetch import patient_prefetcher
+
+# Upper bounds (seconds) of the callback latency histogram buckets
+duration_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# With several gunicorn workers each one writes its counters to METRICS_DIR, and /metrics sums them.
+# Without it, /metrics only reports the worker that answers the scrape.
+metrics_dir = os.getenv("METRICS_DIR")
+flush_seconds = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+
+class CallbackMetrics:
+    """Per-callback request counts, latency histogram, response bytes and exceptions for this worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self._last_flush = 0.0
+
+    def _new_entry(self):
+        return {
+            'requests': {},                                 # outcome -> count
+            'exceptions': {},                               # exception type -> count
+            'buckets': [0] * (len(duration_buckets) + 1),   # last bucket is +Inf
+            'duration_sum': 0.0,
+            'response_bytes': 0,
+        }
+
+    def observe(self, callback_id, seconds, response_bytes, outcome, exception=None):
+        with self._lock:
+            entry = self._callbacks.get(callback_id)
+            if entry is None:
+                entry = self._callbacks[callback_id] = self._new_entry()
+            entry['requests'][outcome] = entry['requests'].get(outcome, 0) + 1
+            if exception is not None:
+                entry['exceptions'][exception] = entry['exceptions'].get(exception, 0) + 1
+            entry['buckets'][bisect_left(duration_buckets, seconds)] += 1
+            entry['duration_sum'] += seconds
+            entry['response_bytes'] += response_bytes
+
+    def snapshot(self):
+        """Copy of the counters plus this worker's figure cache, data registry and patient prefetch state."""
+        with self._lock:
+            callbacks = json.loads(json.dumps(self._callbacks))
+        return {
+            'pid': os.getpid(),
+            'callbacks': callbacks,
+            'figure_cache': figure_cache.stats(),
+            'data_registry': data_registry.report(),
+            'patient_prefetch': patient_prefetcher.stats(),
+        }
+
+    def maybe_flush(self):
+        """Write this worker's snapshot to METRICS_DIR, at most every METRICS_FLUSH_SECONDS."""
+        if metrics_dir is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_flush < flush_seconds:
+                return
+            self._last_flush = now
+        write_worker_snapshot(self.snapshot())
+
+
+callback_metrics = CallbackMetrics()
+
+
+def write_worker_snapshot(snapshot):
+    os.makedirs(metrics_dir, exist_ok=True)
+    file_path = os.path.join(metrics_dir, f"worker-{snapshot['pid']}.json")
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, file_path)  # atomic, so a scrape never reads a partial file
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def worker_snapshots():
+    """
+    Snapshots of every worker: this one live, the others from METRICS_DIR.
+
+    Returns:
+        list: (snapshot, alive) pairs. Counters of exited workers are kept so totals never go down;
+        their gauges (cache size, loaded data) are dropped.
+    """
+    own = callback_metrics.snapshot()
+    snapshots = [(own, True)]
+    if metrics_dir is None or not os.path.isdir(metrics_dir):
+        return snapshots
+    for filename in sorted(os.listdir(metrics_dir)):
+        if not (filename.startswith("worker-") and filename.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(metrics_dir, filename)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if snapshot.get('pid') == own['pid']:
+            continue
+        snapshots.append((snapshot, _pid_alive(snapshot['pid'])))
+    return snapshots
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _add(totals, key, value):
+    totals[key] = totals.get(key, 0) + value
+
+
+def render_prometheus(snapshots):
+    """Prometheus text exposition (format 0.0.4) of the summed worker snapshots."""
+    requests, exceptions, response_bytes, duration_sum, buckets = {}, {}, {}, {}, {}
+    cache_hits, cache_misses = {}, {}
+    cache_entries, artifacts = 0, {}
+    prefetch_claims, prefetch_jobs, prefetch_queue_depth = {}, {}, 0
+    live_workers = 0
+
+    for snapshot, alive in snapshots:
+        for callback_id, entry in snapshot['callbacks'].items():
+            for outcome, count in entry['requests'].items():
+                _add(requests, (callback_id, outcome), count)
+            for exception, count in entry['exceptions'].items():
+                _add(exceptions, (callback_id, exception), count)
+            _add(response_bytes, callback_id, entry['response_bytes'])
+            _add(duration_sum, callback_id, entry['duration_sum'])
+            counts = buckets.setdefault(callback_id, [0] * (len(duration_buckets) + 1))
+            for i, count in enumerate(entry['buckets']):
+                counts[i] += count
+        for name, counts in snapshot['figure_cache']['callbacks'].items():
+            _add(cache_hits, name, counts['hits'])
+            _add(cache_misses, name, counts['misses'])
+        # snapshots written before prefetching existed have no patient_prefetch entry
+        prefetch = snapshot.get('patient_prefetch', {})
+        for outcome, count in prefetch.get('claims', {}).items():
+            _add(prefetch_claims, outcome, count)
+        for state in ('submitted', 'dropped'):
+            _add(prefetch_jobs, state, prefetch.get(state, 0))
+        if not alive:
+            continue
+        live_workers += 1
+        cache_entries += snapshot['figure_cache']['size']
+        prefetch_queue_depth += prefetch.get('queue_depth', 0)
+        for name, artifact in snapshot['data_registry'].items():
+            totals = artifacts.setdefault(name, {'loaded': 0, 'bytes': 0, 'load_seconds': 0.0})
+            if artifact['loaded']:
+                totals['loaded'] += 1
+                totals['bytes'] += artifact['bytes']
+                totals['load_seconds'] = max(totals['load_seconds'], artifact['load_seconds'])
+
+    lines = []
+
+    def metric(name, metric_type, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in samples:
+            lines.append(f"{name}{labels} {value}")
+
+    metric('dash_callback_requests_total', 'counter', 'Callback requests by outcome (ok, no_update, error).',
+           [(_labels(callback=c, outcome=o), n) for (c, o), n in sorted(requests.items())])
+    metric('dash_callback_exceptions_total', 'counter', 'Exceptions raised by callbacks, by exception type.',
+           [(_labels(callback=c, exception=e), n) for (c, e), n in sorted(exceptions.items())])
+    metric('dash_callback_response_bytes_total', 'counter', 'Response body bytes sent by callbacks.',
+           [(_labels(callback=c), n) for c, n in sorted(response_bytes.items())])
+
+    histogram = []
+    for callback_id, counts in sorted(buckets.items()):
+        cumulative = 0
+        for bound, count in zip(list(duration_buckets) + ['+Inf'], counts):
+            cumulative += count
+            histogram.append((_labels(callback=callback_id, le=bound), cumulative))
+    lines.append("# HELP dash_callback_duration_seconds Wall time of callback requests, including serialization.")
+    lines.append("# TYPE dash_callback_duration_seconds histogram")
+    for labels, value in histogram:
+        lines.append(f"dash_callback_duration_seconds_bucket{labels} {value}")
+    for callback_id, total in sorted(duration_sum.items()):
+        lines.append(f"dash_callback_duration_seconds_sum{_labels(callback=callback_id)} {total:.6f}")
+        lines.append(f"dash_callback_duration_seconds_count{_labels(callback=callback_id)} {sum(buckets[callback_id])}")
+
+    metric('dash_figure_cache_hits_total', 'counter', 'Figure cache hits by cached callback.',
+           [(_labels(cache=name), n) for name, n in sorted(cache_hits.items())])
+    metric('dash_figure_cache_misses_total', 'counter', 'Figure cache misses by cached callback.',
+           [(_labels(cache=name), n) for name, n in sorted(cache_misses.items())])
+    metric('dash_figure_cache_entries', 'gauge', 'Entries held in the figure caches of live workers.', [('', cache_entries)])
+
+    metric('dash_patient_prefetch_claims_total', 'counter',
+           'Random patient clicks by prefetch outcome (hit: ready, pending: still being prepared, miss: not prefetched, failed).',
+           [(_labels(outcome=o), n) for o, n in sorted(prefetch_claims.items())])
+    metric('dash_patient_prefetch_jobs_total', 'counter', 'Patient prefetch jobs started (submitted) or skipped with the pool full (dropped).',
+           [(_labels(state=state), n) for state, n in sorted(prefetch_jobs.items())])
+    claims = sum(prefetch_claims.values())
+    metric('dash_patient_prefetch_hit_ratio', 'gauge', 'Share of random patient clicks served from a finished prefetch.',
+           [('', round(prefetch_claims.get('hit', 0) / claims, 4) if claims else 0)])
+    metric('dash_patient_prefetch_queue_depth', 'gauge', 'Patient prefetch jobs waiting or running in live workers.',
+           [('', prefetch_queue_depth)])
+
+    metric('dash_data_artifact_loaded_workers', 'gauge', 'Live workers that have loaded the data artifact.',
+           [(_labels(artifact=name), a['loaded']) for name, a in sorted(artifacts.items())])
+    metric('dash_data_artifact_bytes', 'gauge', 'Approximate memory held by the artifact, summed over live workers.',
+           [(_labels(artifact=name), a['bytes']) for name, a in sorted(artifacts.items())])
+    metric('dash_data_artifact_load_seconds', 'gauge', 'Slowest load time of the artifact across live workers.',
+           [(_labels(artifact=name), round(a['load_seconds'], 4)) for name, a in sorted(artifacts.items())])
+    metric('dash_workers', 'gauge', 'Workers reporting metrics.', [('', live_workers)])
+
+    return "\n".join(lines) + "\n"
+
+
+def _record_exception(sender, exception, **extra):
+    g.callback_exception = type(exception).__name__
+
+
+# Label of requests naming a callback id the app has not registered. The id comes from the request body, so it
+# is never used as a label itself: any client could otherwise add metrics series without bound.
+unknown_callback = "unknown"
+
+
+def callback_name(app, callback_id):
+    """Name of the Python function behind a Dash callback id, or `unknown_callback` if it is not registered."""
+    if not isinstance(callback_id, str):
+        return unknown_callback
+    callback = app.callback_map.get(callback_id, {}).get('callback')
+    return getattr(callback, '__name__', unknown_callback)
+
+
+def register_callback_metrics(app, path="/metrics"):
+    """
+    Time every Dash callback request and serve the metrics as Prometheus text at `path` on the app's server.
+
+    Callbacks are labelled with their function name, e.g. 'update_measure_map'.
+    """
+    server = app.server
+
+    @server.before_request
+    def start_callback_timer():
+        if request.path.endswith("/_dash-update-component"):
+            g.callback_start = time.perf_counter()
+
+    @server.after_request
+    def record_callback_metrics(response):
+        start = g.pop('callback_start', None)
+        if start is None:
+            return response
+        body = request.get_json(silent=True) or {}
+        exception = g.pop('callback_exception', None)
+        if response.status_code >= 500:
+            outcome = 'error'
+        elif response.status_code == 204:
+            outcome = 'no_update'  # PreventUpdate
+        else:
+            outcome = 'ok'
+        callback_metrics.observe(callback_name(app, body.get('output')), time.perf_counter() - start,
+                                 response.calculate_content_length() or 0, outcome, exception)
+        callback_metrics.maybe_flush()
+        return response
+
+    got_request_exception.connect(_record_exception, server)
+
+    @server.route(path)
+    def serve_metrics():
+        return Response(render_prometheus(worker_snapshots()), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,129 @@
+import cProfile
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from flask import g, request
+
+from src.tabs.callback_metrics import callback_name
+
+logger = logging.getLogger(__name__)
+
+# Opt-in callback profiling. Nothing is registered on the server unless one of these is set:
+#  PROFILE_CALLBACKS - comma-separated callback function names (or '*') profiled on every call
+#  PROFILE_TOKEN     - profile any callback request sent with the header `X-Profile-Callback: <token>`
+profile_callbacks = {name.strip() for name in os.getenv("PROFILE_CALLBACKS", "").split(",") if name.strip()}
+profile_token = os.getenv("PROFILE_TOKEN")
+profile_header = "X-Profile-Callback"
+
+profile_dir = os.getenv("PROFILE_DIR", "profiles")
+profile_max_files = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+# cProfile can only run one profiler per process at a time on newer Pythons; overlapping requests are not profiled
+_profiler_lock = threading.Lock()
+
+
+def profiling_enabled():
+    return bool(profile_callbacks) or bool(profile_token)
+
+
+def _should_profile(name):
+    if '*' in profile_callbacks or name in profile_callbacks:
+        return True
+    return profile_token is not None and request.headers.get(profile_header) == profile_token
+
+
+def _rotate(directory, max_files):
+    """Keep the newest `max_files` profiles (and their metadata) in `directory`."""
+    profiles = sorted(f for f in os.listdir(directory) if f.endswith(".prof"))
+    for filename in profiles[:-max_files] if max_files > 0 else profiles:
+        for file_path in (os.path.join(directory, filename), os.path.join(directory, filename[:-5] + ".json")):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass  # already rotated out by another worker
+
+
+def _file_name_part(name):
+    """`name` reduced to characters safe in a file name, so it can't leave the profile directory."""
+    return re.sub(r'[^A-Za-z0-9_-]', '_', str(name)) or '_'
+
+
+def write_profile(profiler, metadata, directory=profile_dir, max_files=profile_max_files):
+    """
+    Save a profile as `<timestamp>-<callback>-<pid>.prof` next to a `.json` file with its metadata.
+
+    Args:
+        profiler (cProfile.Profile): Stopped profiler.
+        metadata (dict): Callback name and id, inputs, state, duration and status of the request.
+        directory (str): Directory the files are written to.
+        max_files (int): Number of profiles kept; older ones are deleted.
+
+    Returns:
+        str: Path of the .prof file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    started_at = metadata['started_at']
+    timestamp = time.strftime('%Y%m%dT%H%M%S', time.localtime(started_at)) + f"{int(started_at * 1000) % 1000:03d}"
+    # callback names are function names (or 'unknown' for ids the app has not registered), sanitized anyway as
+    # the metadata may come from any caller
+    base_name = f"{timestamp}-{_file_name_part(metadata['callback'])}-{metadata['pid']}"
+    profile_path = os.path.join(directory, base_name + ".prof")
+    profiler.dump_stats(profile_path)
+    with open(os.path.join(directory, base_name + ".json"), 'w') as f:
+        json.dump(metadata, f, indent=2, default=str)
+    _rotate(directory, max_files)
+    return profile_path
+
+
+def register_callback_profiling(app):
+    """Run selected Dash callback requests under cProfile and save each profile with its callback id and inputs."""
+    if not profiling_enabled():
+        return
+    server = app.server
+
+    @server.before_request
+    def start_callback_profile():
+        if not request.path.endswith("/_dash-update-component"):
+            return
+        body = request.get_json(silent=True) or {}
+        name = callback_name(app, body.get('output'))
+        if not _should_profile(name) or not _profiler_lock.acquire(blocking=False):
+            return
+        g.callback_profile = {'profiler': cProfile.Profile(), 'name': name, 'body': body,
+                              'started_at': time.time(), 'start': time.perf_counter()}
+        g.callback_profile['profiler'].enable()
+
+    @server.after_request
+    def save_callback_profile(response):
+        profile = g.pop('callback_profile', None)
+        if profile is None:
+            return response
+        profile['profiler'].disable()
+        _profiler_lock.release()
+        body = profile['body']
+        metadata = {
+            'callback': profile['name'],
+            'callback_id': body.get('output'),
+            'inputs': body.get('inputs'),
+            'state': body.get('state'),
+            'changed_prop_ids': body.get('changedPropIds'),
+            'status': response.status_code,
+            'duration_seconds': round(time.perf_counter() - profile['start'], 4),
+            'started_at': profile['started_at'],
+            'pid': os.getpid(),
+        }
+        profile_path = write_profile(profile['profiler'], metadata)
+        logger.info("profiled %s in %.3fs: %s", profile['name'], metadata['duration_seconds'], profile_path)
+        return response
+
+    @server.teardown_request
+    def stop_callback_profile(exception):
+        # after_request did not run (e.g. the response could not be built): don't leave the profiler on
+        profile = g.pop('callback_profile', None)
+        if profile is not None:
+            profile['profiler'].disable()
+            _profiler_lock.release()
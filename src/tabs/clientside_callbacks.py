@@ -0,0 +1,54 @@
+from dash import ClientsideFunction
+from dash.dependencies import Input, Output, State
+
+# Collapsibles toggled in the browser (assets/clientside_callbacks.js), no server round trip.
+# Add new collapsibles here instead of writing a server callback.
+collapse_toggles = [
+    # AI Patient Analysis tab
+    {"trigger": "collapse-summary-header", "target": "collapse-summary"},
+    {"trigger": "collapse-charts-header", "target": "collapse-charts"},
+    {"trigger": "collapse-vital-signs-header", "target": "collapse-vital-signs"},
+    {"trigger": "collapse-qols-header", "target": "collapse-qols"},
+
+    # Info tab
+    {"trigger": "collapse-button-dashboard-info", "target": "collapse-dashboard-info"},
+    {"trigger": "collapse-button-tab-info", "target": "collapse-tab-info"},
+    {"trigger": "collapse-button-summary-view", "target": "collapse-summary-view"},
+    {"trigger": "collapse-button-county-view", "target": "collapse-county-view"},
+    {"trigger": "collapse-button-measure-view", "target": "collapse-measure-view"},
+    {"trigger": "collapse-button-ai-patient-view", "target": "collapse-ai-view"},
+    {"trigger": "collapse-button-data-sources", "target": "collapse-data-sources"},
+    {"trigger": "collapse-button-cdc-places", "target": "collapse-cdc-places"},
+    {"trigger": "collapse-button-bea", "target": "collapse-bea"},
+    {"trigger": "collapse-button-census", "target": "collapse-census"},
+    {"trigger": "collapse-button-bls", "target": "collapse-bls"},
+    {"trigger": "collapse-button-synthea", "target": "collapse-synthea"},
+    {"trigger": "collapse-button-data-loading", "target": "collapse-data-loading"},
+    {"trigger": "collapse-button-cdc-places-loading", "target": "collapse-cdc-places-loading"},
+    {"trigger": "collapse-button-bea-gdp-income", "target": "collapse-bea-gdp-income"},
+    {"trigger": "collapse-button-bls-cpi", "target": "collapse-bls-cpi"},
+    {"trigger": "collapse-button-bea-bls-further-processing", "target": "collapse-bea-bls-further-processing"},
+    {"trigger": "collapse-button-synthea-generation", "target": "collapse-synthea-generation"},
+    {"trigger": "collapse-button-ai-summary-processing", "target": "collapse-ai-summary-processing"},
+    {"trigger": "collapse-button-patient-charts-processing", "target": "collapse-patient-charts-processing"},
+]
+
+
+def register_collapse_toggles(app, toggles=collapse_toggles):
+    """Register a clientside `is_open` flip for every trigger/target pair."""
+    for toggle in toggles:
+        app.clientside_callback(
+            ClientsideFunction(namespace='ui', function_name='toggle_collapse'),
+            Output(toggle["target"], "is_open"),
+            [Input(toggle["trigger"], "n_clicks")],
+            [State(toggle["target"], "is_open")],
+        )
+
+
+def register_tab_visibility(app, tabs):
+    """Show the selected tab's body and hide the others (`<tab>-content` divs) in the browser."""
+    app.clientside_callback(
+        ClientsideFunction(namespace='ui', function_name='show_selected_tab'),
+        [Output(f'{tab}-content', 'style') for tab in tabs],
+        [Input('tabs', 'value')],
+    )
@@ -0,0 +1,68 @@
+import numpy as np
+
+# ColorBrewer RdYlGn anchors as defined by matplotlib (matplotlib._cm._RdYlGn_data)
+rdylgn_anchors = (
+    (0.6470588235294118, 0.0, 0.14901960784313725),
+    (0.8431372549019608, 0.18823529411764706, 0.15294117647058825),
+    (0.9568627450980393, 0.42745098039215684, 0.2627450980392157),
+    (0.9921568627450981, 0.6823529411764706, 0.3803921568627451),
+    (0.996078431372549, 0.8784313725490196, 0.5450980392156862),
+    (1.0, 1.0, 0.7490196078431373),
+    (0.8509803921568627, 0.9372549019607843, 0.5450980392156862),
+    (0.6509803921568628, 0.8509803921568627, 0.41568627450980394),
+    (0.4, 0.7411764705882353, 0.38823529411764707),
+    (0.10196078431372549, 0.596078431372549, 0.3137254901960784),
+    (0.0, 0.40784313725490196, 0.21568627450980393),
+)
+
+lut_size = 256
+bad_color = '#000000'  # NaN values (matplotlib's transparent "bad" colour, without alpha)
+
+
+def _reversed_lookup_table(anchors, N):
+    """
+    Lookup table of a reversed LinearSegmentedColormap.from_list(anchors), computed the way matplotlib does
+    (LinearSegmentedColormap.reversed and colors._create_lookup_table), so the colours are identical.
+    """
+    vals = np.linspace(0, 1, len(anchors))
+    channels = np.array(anchors, dtype=float).T
+    lut = []
+    for channel in channels:
+        # reversed segment data: (1 - x, y1, y0) in reverse order
+        x = np.array([1.0 - v for v in vals[::-1]]) * (N - 1)
+        y0 = y1 = channel[::-1]
+        xind = (N - 1) * np.linspace(0, 1, N)
+        ind = np.searchsorted(x, xind)[1:-1]
+        distance = (xind[1:-1] - x[ind - 1]) / (x[ind] - x[ind - 1])
+        lut.append(np.clip(np.concatenate([[y1[0]], distance * (y0[ind] - y1[ind - 1]) + y1[ind - 1], [y0[-1]]]), 0.0, 1.0))
+    return np.array(lut).T
+
+
+def _to_hex(rgb):
+    return "#" + "".join(format(round(float(val) * 255), "02x") for val in rgb)
+
+
+rdylgn_r_hex = np.array([_to_hex(rgb) for rgb in _reversed_lookup_table(rdylgn_anchors, lut_size)], dtype=object)
+
+
+def values_to_colors(values, min_val, max_val, lut=rdylgn_r_hex):
+    """
+    Hex colours of `values` on the RdYlGn_r scale between min_val and max_val, in one vectorized step.
+
+    Gives the same result as `matplotlib.colors.to_hex(plt.cm.RdYlGn_r(Normalize(min_val, max_val)(value)))`:
+    values below/above the range get the end colours and NaN gets '#000000'.
+    """
+    values = np.asarray(values, dtype=float)
+    if max_val == min_val:
+        scaled = np.zeros_like(values)
+    else:
+        scaled = (values - min_val) / (max_val - min_val)
+    N = len(lut)
+    xa = scaled * N
+    xa[xa == N] = N - 1
+    bad = np.isnan(xa)
+    # below the range -> first colour, above -> last colour
+    indices = np.clip(np.where(bad, 0, xa), 0, N - 1).astype(int)
+    colors = lut[indices]
+    colors[bad] = bad_color
+    return colors.tolist()
@@ -1,27 +1,37 @@
+from functools import lru_cache
+
 import pandas as pd
-import json
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 from dash import html
 import dash_bootstrap_components as dbc
 
+from src.data.registry import data_registry
+from src.tabs.figure_builder import FigureTemplate
+from src.tabs.overall_view import summary_scale
+
 fips_usa = '00000'
 fips_county = '01011'
 
-df_bea = pd.read_pickle("data/processed/bea_economic_data.pickle")
-df_all_counties = pd.read_pickle("data/processed/df_measures_final.pickle")
-df_ranking_cv = pd.read_pickle("data/processed/df_summary_final.pickle")
+# Data frames are loaded on first use and shared with the other tabs through the data registry
+def get_df_ranking_cv():
+    return data_registry.get('df_summary')
 
-# GeoJSON file
-file_path_geo_json = "data/processed/us_census_counties_geojson.json"
-with open(file_path_geo_json) as f:
-    counties = json.load(f)
+def get_county_index():
+    """(state, county) -> GEOID and dropdown options, see src/data/county_index.py."""
+    return data_registry.get('county_index')
 
-def create_kpi_layout(df_ranking_cv, fips_county, df_bea_county, fips_county_bea,health_score_explanation):
+def get_bea_cube():
+    """BEA data as a (geo x statistic x year) array, see src/data/bea_cube.py."""
+    return data_registry.get('bea_cube')
+
+def create_kpi_layout(df_ranking_cv, fips_county, fips_county_bea,health_score_explanation):
 
     # Get the corresponding GeoName for fips_county_bea
-    geo_name_bea = df_bea[df_bea.GeoFips == fips_county_bea].GeoName.iloc[0] if not df_bea[df_bea.GeoFips == fips_county_bea].empty else "Unknown"
+    county_index = get_county_index()
+    bea_cube = get_bea_cube()
+    geo_name_bea = bea_cube.geo_names.get(fips_county_bea, "Unknown")
     # Check if fips_county and fips_county_bea are different
     if fips_county != fips_county_bea:
         note = html.P(f"Note: Economic data displayed is based on {geo_name_bea} (FIPS: {fips_county_bea}) due to data availability.", style={'color': 'yellow'})
@@ -29,14 +39,14 @@ def create_kpi_layout(df_ranking_cv, fips_county, df_bea_county, fips_county_bea
         note = html.P()
 
 
-    selected_data = df_ranking_cv[df_ranking_cv.GEOID==fips_county].iloc[0]
+    selected_data = county_index.summary_row(fips_county).iloc[0]
     county_name = selected_data['LocationName']
     state_name = selected_data['StateDesc']
     health_metric = selected_data['Weighted_Score_Normalized']
     rank = selected_data['Rank']
 
     year_bea = 2022
-    gdp_percent_difference, income_percent_difference = calculate_percent_difference_econ(df_bea_county, year_bea)
+    gdp_percent_difference, income_percent_difference = calculate_percent_difference_econ(fips_county_bea, year_bea)
     
     # Function to format the text
     def format_text(label, value):
@@ -47,7 +57,7 @@ def create_kpi_layout(df_ranking_cv, fips_county, df_bea_county, fips_county_bea
     income_percent_text = format_text("Income per Capita % Diff. from USA Avg.", income_percent_difference)
 
     # Get population for the year and format it
-    pop_county = df_bea_county[(df_bea_county.Statistic == 'Population') & (df_bea_county.GeoFips == fips_county_bea) & (df_bea_county.TimePeriod == year_bea)].DataValue.iloc[0]
+    pop_county = bea_cube.value(fips_county_bea, 'Population', year_bea)
     pop_county_formatted = "{:,}".format(int(pop_county))
         
     info_icon = html.I(className="bi bi-info-circle", id="health-score-tooltip-target", style={'cursor': 'pointer','font-size': '22px'})
@@ -85,185 +95,109 @@ def create_kpi_layout(df_ranking_cv, fips_county, df_bea_county, fips_county_bea
     return html.Div([kpi_layout, health_score_tooltip]) 
 
 
-def create_county_econ_charts(df_bea_county):
+@lru_cache(maxsize=None)
+def econ_chart_template():
+    """Layout shared by the County tab's economic line charts, and a line trace in each of the two colours, validated once."""
 
     colors = ['#636efa', '#ef553b']  # Default colors for plotly_dark theme
-    # CPI Adjusted per Capita Income
-    traces = []
-    for i, geo_name in enumerate(df_bea_county['GeoName'].unique()):
-        trace = go.Scatter(x=df_bea_county[df_bea_county['GeoName'] == geo_name]['TimePeriod'],
-                        y=df_bea_county[(df_bea_county['GeoName'] == geo_name) & (df_bea_county.Statistic=='CPI Adjusted Per Capita Income')]['DataValue'],
-                        mode='lines',
-                        name=geo_name,
-                        line=dict(color=colors[i])
-                        )
-        traces.append(trace)
+    traces = [go.Scatter(mode='lines', line=dict(color=color)) for color in colors]
 
     # Create the layout
-    layout = go.Layout(title='Income per Capita:<br>CPI Adjusted (~1983 dollars, counties with regional CPI)',
+    layout = go.Layout(title='',
                     xaxis=dict(title=''),
-                    yaxis=dict(title='Income per Capita (adjusted)'),
+                    yaxis=dict(title=''),
                     template='plotly_dark',
                     legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
                     )
 
-    # Create the figure
-    fig_adj_income = go.Figure(data=traces, layout=layout)
-
-    
-    # Per Capita Income
-    #######
-    traces = []
-    for i, geo_name in enumerate(df_bea_county['GeoName'].unique()):
-        trace = go.Scatter(x=df_bea_county[df_bea_county['GeoName'] == geo_name]['TimePeriod'],
-                        y=df_bea_county[(df_bea_county['GeoName'] == geo_name) & (df_bea_county.Statistic=='Per capita personal income')]['DataValue'],
-                        mode='lines',
-                        name=geo_name,line=dict(color=colors[i]))
-        traces.append(trace)
-
-    # Create the layout
-    layout = go.Layout(title='Income per Capita:<br>Current Dollars',
-                    xaxis=dict(title=''),
-                    yaxis=dict(title='Income per Capita (current)'),
-                    template='plotly_dark',
-                    legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
-                    )
+    return FigureTemplate(go.Figure(data=traces, layout=layout))
 
-    # Create the figure
-    fig_income = go.Figure(data=traces, layout=layout)
 
-    # Adj GDP per Capita
-    ##########################
+def create_county_econ_charts(fips_county_bea):
 
-    traces = []
-    df_chart = df_bea_county[df_bea_county.Statistic=='Real GDP Per Capita']
-    for i, geo_name in enumerate(df_bea_county['GeoName'].unique()):
-        trace = go.Scatter(x=df_chart[df_chart['GeoName'] == geo_name]['TimePeriod'],
-                        y=df_chart[(df_chart['GeoName'] == geo_name)]['DataValue'],
-                        mode='lines',
-                        name=geo_name,line=dict(color=colors[i]))
-        traces.append(trace)
+    template = econ_chart_template()
+    bea_cube = get_bea_cube()
+    # the USA, then the county (when BEA has it)
+    geos = [fips for fips in dict.fromkeys([fips_usa, fips_county_bea]) if fips in bea_cube]
 
-    # Create the layout
-    layout = go.Layout(title='GDP per Capita:<br>Adjusted (2017 dollars)',
-                    xaxis=dict(title=''),
-                    yaxis=dict(title='GDP per Capita (adjusted)'),
-                    template='plotly_dark',
-                    legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
-                    )
+    def statistic_traces(statistic):
+        traces = []
+        for i, geo in enumerate(geos):
+            years, values = bea_cube.series(geo, statistic)
+            traces.append(template.trace(i, x=years, y=values, name=bea_cube.geo_names[geo]))
+        return traces
 
-    # Create the figure
-    fig_real_gdp = go.Figure(data=traces, layout=layout)
+    def econ_figure(traces, title, yaxis_title):
+        return template.figure(traces, title={'text': title}, yaxis={'title': {'text': yaxis_title}})
 
-    # Current Dollar GDP per Capita
-    #################
+    # CPI Adjusted per Capita Income
+    fig_adj_income = econ_figure(statistic_traces('CPI Adjusted Per Capita Income'),
+                                 'Income per Capita:<br>CPI Adjusted (~1983 dollars, counties with regional CPI)',
+                                 'Income per Capita (adjusted)')
 
-    traces = []
-    df_chart = df_bea_county[df_bea_county.Statistic=='Current-dollar GDP Per Capita']
-    for i, geo_name in enumerate(df_bea_county['GeoName'].unique()):
-        trace = go.Scatter(x=df_chart[df_chart['GeoName'] == geo_name]['TimePeriod'],
-                        y=df_chart[(df_chart['GeoName'] == geo_name)]['DataValue'],
-                        mode='lines',
-                        name=geo_name,line=dict(color=colors[i]))
-        traces.append(trace)
+    # Per Capita Income
+    fig_income = econ_figure(statistic_traces('Per capita personal income'),
+                             'Income per Capita:<br>Current Dollars', 'Income per Capita (current)')
 
-    # Create the layout
-    layout = go.Layout(title='GDP per Capita:<br>Current Dollars',
-                    xaxis=dict(title=''),
-                    yaxis=dict(title='GDP per Capita (current)'),
-                    template='plotly_dark',
-                    legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
-                    )
+    # Adj GDP per Capita
+    fig_real_gdp = econ_figure(statistic_traces('Real GDP Per Capita'),
+                               'GDP per Capita:<br>Adjusted (2017 dollars)', 'GDP per Capita (adjusted)')
 
-    # Create the figure
-    fig_gdp = go.Figure(data=traces, layout=layout)
-    
+    # Current Dollar GDP per Capita
+    fig_gdp = econ_figure(statistic_traces('Current-dollar GDP Per Capita'),
+                          'GDP per Capita:<br>Current Dollars', 'GDP per Capita (current)')
 
     # Population, only the county
-    df_chart = df_bea_county[(df_bea_county.Statistic=='Population') & (df_bea_county.GeoFips!="00000")]
-
-    trace = go.Scatter(x=df_chart[df_chart['GeoName'] == geo_name]['TimePeriod'],
-                    y=df_chart[(df_chart['GeoName'] == geo_name)]['DataValue'],
-                    mode='lines',
-                    name=geo_name,line=dict(color=colors[1]))
-
-    # Create the layout
-    layout = go.Layout(title=f'{geo_name} Population',
-                    xaxis=dict(title=''),
-                    yaxis=dict(title='Population'),
-                    template='plotly_dark',
-                    legend=dict(orientation='h', x=0.5, xanchor='center', y=-0.1, yanchor='top')
-                    )
+    geo_name = bea_cube.geo_names[geos[-1]]
+    if geos[-1] != fips_usa:
+        years, values = bea_cube.series(geos[-1], 'Population')
+    else:
+        years, values = [], []
 
-    # Create the figure
-    fig_pop = go.Figure(data=trace, layout=layout)
+    trace = template.trace(1, x=years, y=values, name=geo_name)
+    fig_pop = econ_figure([trace], f'{geo_name} Population', 'Population')
 
 
     return fig_adj_income, fig_income, fig_real_gdp, fig_gdp, fig_pop
 
 
 
-def create_county_health_charts(df_ranking_cv,df_all_counties,fips_county='01011'):
-    
-    df_ranking_county = df_ranking_cv[df_ranking_cv.GEOID==fips_county]
-    df_county_measures = df_all_counties[df_all_counties.GEOID==fips_county]
-
-    custom_color_scale = {
-        'Disability': '#673AB7',  
-        'Health Outcomes': '#FFA726',  
-        'Health Risk Behaviors': '#FFEB3B',  
-        'Health Status': '#D32F2F',  
-        'Prevention': '#4CAF50'  
-    }
-    categories = df_county_measures['Category'].unique()
-    color_scale = {category: custom_color_scale.get(category, '#000000') for category in categories}  # Default to black if not found
-
-    sorted_df = df_county_measures.sort_values(by='absolute_contribution', ascending=False)
-
-    # Group by 'Category' and sum the 'percent_contribution'
-    grouped_df = df_county_measures.groupby('Category')['absolute_contribution'].sum().reset_index()
-
-    # Sort the grouped DataFrame by 'percent_contribution' in ascending order
-    sorted_grouped_df = grouped_df.sort_values(by='absolute_contribution', ascending=False)
-    # sorted_categories = sorted_grouped_df['Category'].tolist()
-
-    fixed_order = [
-        'Health Outcomes',
-        'Disability', 
-        'Prevention',
-        'Health Status',
-        'Health Risk Behaviors',
-    ]
-    # Ensure all categories from the data are included in the fixed order
-    sorted_categories = [cat for cat in fixed_order if cat in categories]
-
-    sorted_df['Category'] = pd.Categorical(sorted_df['Category'], categories=sorted_categories, ordered=True)
-    sorted_df = sorted_df.sort_values(by=['Category', 'Data_Value'], ascending=[True, True])
-    total = df_ranking_county['Weighted_Score_Normalized'].iloc[0].round(2)
-
-    ###################################
-
+custom_color_scale = {
+    'Disability': '#673AB7',  
+    'Health Outcomes': '#FFA726',  
+    'Health Risk Behaviors': '#FFEB3B',  
+    'Health Status': '#D32F2F',  
+    'Prevention': '#4CAF50'  
+}
+fixed_order = [
+    'Health Outcomes',
+    'Disability', 
+    'Prevention',
+    'Health Status',
+    'Health Risk Behaviors',
+]
+
+@lru_cache(maxsize=None)
+def health_chart_template():
+    """
+    County health chart without the county's values: the measures bar trace, one stacked bar trace per category
+    (in `fixed_order`) and the subplot layout, validated once.
+    """
     fig = make_subplots(rows=1, cols=2, column_widths=[0.75, 0.25], 
                         subplot_titles=('CDC PLACES<br>Health Survey Results',
-                                        f"Contribution by Category<br>UnHealth Score Total: {total}"),
+                                        "Contribution by Category<br>UnHealth Score Total: "),
                                         )
     fig.update_yaxes(domain=[0.02, 0.98], row=1, col=1)  # Adjust domains as needed
     fig.update_yaxes(domain=[0.02, 0.98], row=1, col=2)
-    # Map 'Category' to colors for the first chart
-    colors_mapped = sorted_df['Category'].map(color_scale).tolist()
 
     # Add the first chart to the first column
-    fig.add_trace(go.Bar(x=sorted_df['Data_Value'], y=sorted_df['Measure_short'],
-                        orientation='h', marker_color=colors_mapped,
+    fig.add_trace(go.Bar(orientation='h',
                         hovertemplate='%{y}: %{x:.2f}%<br>Contribution to UnHealth Score: %{customdata[1]:.2f}',
-                        customdata=sorted_df[['Data_Value','absolute_contribution']],
                         name=''),
                 row=1, col=1)
 
-    for category in sorted_categories:
-        df_filtered = sorted_grouped_df[sorted_grouped_df['Category'] == category]
-        fig.add_trace(go.Bar(y=df_filtered['absolute_contribution'], x=[1]*len(df_filtered),
-                            name=category, marker_color=color_scale[category],
+    for category in fixed_order:
+        fig.add_trace(go.Bar(name=category, marker_color=custom_color_scale[category],
                             text=category, orientation='v',
                             hovertemplate='Total category contribution: %{y:.2f}'),  
                     row=1, col=2)
@@ -271,7 +205,6 @@ def create_county_health_charts(df_ranking_cv,df_all_counties,fips_county='01011
 
     fig.update_layout(
         title={
-            'text': f"{sorted_df.iloc[0].LocationName}, {sorted_df.iloc[0].StateDesc}",
             #'y':0.9,
             'x':0.5,
             'xanchor': 'center',
@@ -291,38 +224,79 @@ def create_county_health_charts(df_ranking_cv,df_all_counties,fips_county='01011
     fig.update_xaxes(title_text="Percent", row=1, col=1)
     fig.update_yaxes(title_text="", row=1, col=1)
     fig.update_xaxes(showticklabels=False, row=1, col=2)
-    fig.update_yaxes(title_text="UnHealth Score", range=[0, total],
+    fig.update_yaxes(title_text="UnHealth Score",
                      row=1, col=2)
 
     fig.update_traces(textposition='inside', textangle=0, insidetextanchor='middle', 
                     textfont=dict(size=18), selector=dict(orientation='v'))
 
-    return fig
+    return FigureTemplate(fig)
+
+
+def create_county_health_charts(fips_county='01011'):
+    
+    template = health_chart_template()
+    county_index = get_county_index()
+    df_ranking_county = county_index.summary_row(fips_county)
+    df_county_measures = county_index.county_measures(fips_county)
+
+    categories = df_county_measures['Category'].unique()
+    color_scale = {category: custom_color_scale.get(category, '#000000') for category in categories}  # Default to black if not found
+
+    sorted_df = df_county_measures.sort_values(by='absolute_contribution', ascending=False)
+
+    # Group by 'Category' and sum the 'percent_contribution'
+    grouped_df = df_county_measures.groupby('Category', observed=True)['absolute_contribution'].sum().reset_index()
+
+    # Sort the grouped DataFrame by 'percent_contribution' in ascending order
+    sorted_grouped_df = grouped_df.sort_values(by='absolute_contribution', ascending=False)
+    # sorted_categories = sorted_grouped_df['Category'].tolist()
+
+    # Ensure all categories from the data are included in the fixed order
+    sorted_categories = [cat for cat in fixed_order if cat in categories]
+
+    sorted_df['Category'] = pd.Categorical(sorted_df['Category'], categories=sorted_categories, ordered=True)
+    sorted_df = sorted_df.sort_values(by=['Category', 'Data_Value'], ascending=[True, True])
+    total = df_ranking_county['Weighted_Score_Normalized'].iloc[0].round(2)
+
+    ###################################
+
+    # Map 'Category' to colors for the first chart
+    colors_mapped = sorted_df['Category'].map(color_scale).tolist()
+
+    traces = [template.trace(0, x=sorted_df['Data_Value'], y=sorted_df['Measure_short'],
+                             marker=dict(color=colors_mapped),
+                             customdata=sorted_df[['Data_Value','absolute_contribution']])]
+
+    for category in sorted_categories:
+        df_filtered = sorted_grouped_df[sorted_grouped_df['Category'] == category]
+        traces.append(template.trace(1 + fixed_order.index(category),
+                                     y=df_filtered['absolute_contribution'], x=[1]*len(df_filtered)))
+
+    subplot_titles = template.layout['annotations']
+    return template.figure(
+        traces,
+        title={'text': f"{sorted_df.iloc[0].LocationName}, {sorted_df.iloc[0].StateDesc}"},
+        annotations=[subplot_titles[0], {**subplot_titles[1], 'text': subplot_titles[1]['text'] + str(total)}],
+        yaxis2={'range': [0, total]},
+    )
 
 
 
 ##############
 # County map
-percentile_high = df_ranking_cv['Weighted_Score_Normalized'].quantile(0.95)
-percentile_low = df_ranking_cv['Weighted_Score_Normalized'].quantile(0.05)
-num_counties = len(df_ranking_cv)
-
-def create_county_map(selected_state, selected_county, df_ranking_cv,counties):
-    
-    # Filter the dataframe based on selected_state and selected_county
-    
-    filtered_df = df_ranking_cv[(df_ranking_cv['StateDesc'] == selected_state) & (df_ranking_cv['LocationName'] == selected_county)]
+@lru_cache(maxsize=None)
+def county_map_template():
+    """County map without the county's row and the GeoJSON, validated once."""
+    # same 5th/95th percentile colour scale and county count as the Summary map
+    scale = summary_scale()
 
     fig = go.Figure()
 
     fig.add_trace(go.Choropleth(
-        geojson=counties,
         featureidkey="properties.GEOID",
-        locations=filtered_df['GEOID'],
-        z=filtered_df.Weighted_Score_Normalized,
         colorscale="RdYlGn_r",
-        customdata=filtered_df[['GEOID', 'LocationName', 'StateDesc', 'Rank', 'Weighted_Score_Normalized']],
-        hovertemplate='%{customdata[1]} County, %{customdata[2]}<br>Score: %{customdata[4]:.2f}<br>Rank: %{customdata[3]} of ' + str(num_counties) + '<extra></extra>',
+        hovertemplate='%{customdata[1]} County, %{customdata[2]}<br>Score: %{customdata[4]:.2f}<br>Rank: %{customdata[3]} of ' + str(scale['num_counties']) + '<extra></extra>',
         marker_line_width=0,
         colorbar=dict(
             thickness=15,
@@ -332,8 +306,8 @@ def create_county_map(selected_state, selected_county, df_ranking_cv,counties):
             xpad=0,
             tickfont=dict(color='white'),
         ),
-        zmin=percentile_low,
-        zmax=percentile_high,
+        zmin=scale['percentile_low'],
+        zmax=scale['percentile_high'],
         showscale=True,
         name=""
     ))
@@ -386,25 +360,35 @@ def create_county_map(selected_state, selected_county, df_ranking_cv,counties):
 
     fig.update_layout(autosize=False)
 
-    return fig
+    return FigureTemplate(fig)
 
 
-def calculate_percent_difference_econ(df_bea_county, year_bea):
-    # Filter data for the selected county and year 2022
-    county_data = df_bea_county[(df_bea_county['GeoFips'] != "00000") & (df_bea_county['TimePeriod'] == year_bea)]
+def create_county_map(selected_state, selected_county, counties):
+    
+    # Filter the dataframe based on selected_state and selected_county
+    
+    county_index = get_county_index()
+    filtered_df = county_index.summary_row(county_index.lookup(selected_state, selected_county)[0])
+
+    template = county_map_template()
+    choropleth = template.trace(
+        0,
+        geojson=counties,
+        locations=filtered_df['GEOID'],
+        z=filtered_df.Weighted_Score_Normalized,
+        customdata=filtered_df[['GEOID', 'LocationName', 'StateDesc', 'Rank', 'Weighted_Score_Normalized']],
+    )
+    return template.figure([choropleth])
 
-    # Filter data for the USA and year 2022
-    usa_data = df_bea_county[(df_bea_county['GeoFips'] == '00000') & (df_bea_county['TimePeriod'] == year_bea)]
 
-    def get_value(data, statistic):
-        value = data[data['Statistic'] == statistic]['DataValue'].values
-        return value[0] if value.size > 0 else None
+def calculate_percent_difference_econ(fips_county_bea, year_bea):
+    bea_cube = get_bea_cube()
 
-    # Retrieve values for GDP and income for both county and USA
-    county_gdp = get_value(county_data, 'Real GDP Per Capita')
-    county_income = get_value(county_data, 'Per capita personal income')
-    usa_gdp = get_value(usa_data, 'Real GDP Per Capita')
-    usa_income = get_value(usa_data, 'Per capita personal income')
+    # Retrieve values for GDP and income for both the county and the USA in year_bea
+    county_gdp = bea_cube.value(fips_county_bea, 'Real GDP Per Capita', year_bea)
+    county_income = bea_cube.value(fips_county_bea, 'Per capita personal income', year_bea)
+    usa_gdp = bea_cube.value(fips_usa, 'Real GDP Per Capita', year_bea)
+    usa_income = bea_cube.value(fips_usa, 'Per capita personal income', year_bea)
 
     # Function to calculate percent difference
     def percent_difference(local, national):
@@ -2,7 +2,7 @@ import dash
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 
-from src.tabs.county_view import df_ranking_cv
+from src.tabs.county_view import get_county_index
 from src.tabs.helper_data import common_div_style, unhealth_score_explanation
 
 
@@ -44,13 +44,15 @@ def county_view_tab_layout():
         n_intervals=0,
         max_intervals=1  # Ensure it triggers only once
     ),
+    # County shown by the charts above the currency toggle; the econ charts render from it
+    dcc.Store(id='county-selection'),
     county_unhealth_score_with_icon,
     county_unhealth_score_tooltip,
     html.Div([
         dbc.Col([
             dcc.Dropdown(
                 id='county-view-state-dropdown',
-                options=[{'label': state, 'value': state} for state in sorted(df_ranking_cv['StateDesc'].unique())],
+                options=[{'label': state, 'value': state} for state in get_county_index().states],
                 value=default_state,  
                 placeholder="Select a State",
                 style={'marginBottom': '10px', 'fontSize': '1.2em', 'width': '400px', 'margin': '10px auto', 'textAlign': 'left',
@@ -0,0 +1,104 @@
+import base64
+import os
+
+import numpy as np
+
+from src.tabs.response_encoding import trim_floats
+
+# plotly's own array encoding, so built figures serialize as go.Figure does. These are plotly internals: the
+# versions they are known to match are pinned in requirements.txt, and benchmarks/figure_equivalence.py
+# checks the built figures after an upgrade.
+from _plotly_utils.basevalidators import is_homogeneous_array
+from _plotly_utils.utils import is_skipped_key, to_typed_array_spec
+
+
+# Float arrays are sent in this dtype, the way plotly narrows int64 arrays to the smallest int type that fits.
+# float32 keeps about 7 significant digits, more than any hover label or axis shows (at most 4-6, e.g.
+# '%{z:.2%}', '%{x:,.0f}'), in half the bytes. FIGURE_FLOAT_DTYPE=float64 sends the arrays as computed.
+float_array_dtype = np.dtype(os.getenv("FIGURE_FLOAT_DTYPE", "float32"))
+
+
+def _narrowed(values):
+    """`values` as a `float_array_dtype` array if it holds wider numpy floats, otherwise unchanged."""
+    dtype = getattr(values, 'dtype', None)
+    if isinstance(dtype, np.dtype) and dtype.kind == 'f' and dtype.itemsize > float_array_dtype.itemsize:
+        return np.asarray(values).astype(float_array_dtype)
+    return values
+
+
+def _narrowed_typed_arrays(value):
+    """Copy of a serialized figure part with its float typed arrays re-encoded as `float_array_dtype`."""
+    if isinstance(value, list):
+        return [_narrowed_typed_arrays(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if 'bdata' in value and value.get('dtype') == 'f8' and float_array_dtype.itemsize < 8:
+        array = np.frombuffer(base64.b64decode(value['bdata']), dtype='f8')
+        if 'shape' in value:
+            array = array.reshape([int(size) for size in value['shape'].split(',')])
+        return to_typed_array_spec(array.astype(float_array_dtype))
+    return {key: item if is_skipped_key(key) else _narrowed_typed_arrays(item) for key, item in value.items()}
+
+
+def data_array(values):
+    """
+    A numpy/pandas array in the form plotly serializes it: numeric arrays base64-encoded (floats as
+    `float_array_dtype`), datetimes as ISO strings (time zone dropped, as plotly does), others as plain arrays.
+    """
+    if is_homogeneous_array(values):
+        values = to_typed_array_spec(_narrowed(values))
+        if isinstance(values, np.ndarray) and values.dtype.kind == 'M':
+            return np.datetime_as_string(values).tolist()
+    return values
+
+
+def _merged(base, values):
+    """
+    Copy of `base` with `values` set, merging nested dicts; only the dicts along the updated keys are copied.
+    Values under keys plotly leaves as they are (geojson, range) are set without merging or encoding.
+    """
+    merged = dict(base)
+    for key, value in values.items():
+        if is_skipped_key(key):
+            merged[key] = value
+        elif isinstance(value, dict):
+            base_value = merged.get(key)
+            merged[key] = _merged(base_value if isinstance(base_value, dict) else {}, value)
+        else:
+            merged[key] = data_array(value)
+    return merged
+
+
+class FigureTemplate:
+    """
+    A figure validated once by plotly and kept as the dict it serializes to. New figures are built from it by
+    setting only the per-call values (data arrays, titles, ranges), skipping plotly's property validation,
+    which is most of the cost of `go.Figure`, `go.Choropleth` and `make_subplots` on the callback paths.
+
+    Values must be given in the validated form, e.g. `title={'text': ...}` rather than `title='...'`;
+    `benchmarks/figure_equivalence.py` checks the tabs' figures against the go.Figure builders they replaced.
+
+    Attributes:
+        traces (list): Trace dicts of the template figure, the prototypes `trace` starts from.
+        layout (dict): Layout dict of the template figure, including the expanded plotly template.
+    """
+
+    def __init__(self, figure):
+        figure = figure.to_dict()
+        # arrays given to the template figure itself (e.g. the GAM lines) are sent like the per-call ones
+        self.traces = _narrowed_typed_arrays(figure['data'])
+        self.layout = figure['layout']
+        if 'template' in self.layout:
+            # callback responses pass the template through untrimmed (see src/tabs/response_encoding.py)
+            self.layout['template'] = trim_floats(self.layout['template'])
+
+    def trace(self, index=0, **values):
+        """Trace dict: prototype trace `index` with `values` set (nested dicts are merged, arrays encoded)."""
+        return _merged(self.traces[index], values)
+
+    def figure(self, traces=None, **layout):
+        """Figure dict of `traces` (the template's own if None) on the template layout with `layout` merged in."""
+        return {
+            'data': list(self.traces) if traces is None else traces,
+            'layout': _merged(self.layout, layout),
+        }
@@ -0,0 +1,79 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+
+class FigureCache:
+    """Bounded in-process LRU cache for rendered callback outputs, with hit/miss counters per callback."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _count(self, name, field):
+        self._stats.setdefault(name, {'hits': 0, 'misses': 0})[field] += 1
+
+    def get_or_create(self, name, key, builder):
+        """Return the cached value for (name, key), building and storing it on a miss."""
+        cache_key = (name, key)
+        with self._lock:
+            if cache_key in self._entries:
+                self._entries.move_to_end(cache_key)
+                self._count(name, 'hits')
+                return self._entries[cache_key]
+            self._count(name, 'misses')
+
+        # build outside the lock so a slow figure doesn't block other workers' threads
+        value = builder()
+
+        with self._lock:
+            self._entries[cache_key] = value
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        """Hit/miss counters per callback plus current size."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'callbacks': {name: dict(counts) for name, counts in self._stats.items()},
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+
+figure_cache = FigureCache(maxsize=int(os.getenv("FIGURE_CACHE_SIZE", "256")))
+
+
+def normalize_states(selected_state):
+    """Order-insensitive cache key for a state dropdown value (None, a single state or a list)."""
+    if not selected_state:
+        return ()
+    if isinstance(selected_state, str):
+        return (selected_state,)
+    return tuple(sorted(set(selected_state)))
+
+
+def memoize_callback(name, key):
+    """
+    Cache a callback's outputs in `figure_cache`.
+
+    Args:
+        name (str): Callback name, used to namespace keys and counters.
+        key (callable): Maps the callback arguments to a hashable, normalized key.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            return figure_cache.get_or_create(name, key(*args), lambda: func(*args))
+        return wrapper
+    return decorator
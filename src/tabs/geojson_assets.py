@@ -0,0 +1,48 @@
+import hashlib
+import os
+
+from flask import abort, send_file
+
+from src.data.registry import data_registry
+
+# GeoJSON file
+file_path_geo_json = "data/processed/us_census_counties_geojson.json"
+
+# How the county boundaries reach the browser:
+#  'url'    - served once from a versioned, long-cache route; figures only reference the URL
+#             and plotly.js fetches it a single time per page (cached in window.PlotlyGeoAssets)
+#  'inline' - the full GeoJSON dict is embedded in every choropleth figure (original behaviour)
+geojson_delivery = os.getenv("GEOJSON_DELIVERY", "url").lower()
+
+one_year_seconds = 365 * 24 * 60 * 60
+
+
+def _file_version(file_path):
+    """Short content hash used to version the GeoJSON URL."""
+    with open(file_path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()[:12]
+
+
+counties_geojson_version = _file_version(file_path_geo_json)
+counties_geojson_url = f"/geo/us_census_counties_geojson.{counties_geojson_version}.json"
+
+
+def get_counties_geojson():
+    """Return the value to pass as `geojson=` to county choropleths: the versioned URL, or the parsed dict in inline mode."""
+    if geojson_delivery != 'inline':
+        return counties_geojson_url
+    return data_registry.get('counties_geojson')
+
+
+def register_geojson_route(server):
+    """Serve the county GeoJSON from the Flask server under its versioned URL with immutable caching."""
+
+    @server.route("/geo/us_census_counties_geojson.<version>.json")
+    def serve_counties_geojson(version):
+        # only the current version exists; an old URL must not be cached against new content
+        if version != counties_geojson_version:
+            abort(404)
+        response = send_file(os.path.abspath(file_path_geo_json), mimetype='application/json', max_age=one_year_seconds)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
@@ -1,21 +1,19 @@
 
+import numpy as np
 import plotly.graph_objects as go
-import pandas as pd
-import json
+from functools import lru_cache
 
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
+from dash import Patch
 
+from src.data.registry import data_registry
+from src.tabs.colormap import values_to_colors
+from src.tabs.figure_builder import FigureTemplate, data_array
+from src.tabs.geojson_assets import get_counties_geojson
 
-### Load data#####
-df_measures = pd.read_pickle("data/processed/df_measures_final.pickle")
-num_counties = df_measures.GEOID.nunique()
 
-# GeoJSON file
-file_path_geo_json = "data/processed/us_census_counties_geojson.json"
-with open(file_path_geo_json) as f:
-    counties = json.load(f)
+### Load data (on first use, shared through the data registry)#####
+def get_df_measures():
+    return data_registry.get('df_measures')
 ############
 
 
@@ -23,32 +21,33 @@ with open(file_path_geo_json) as f:
 ###### MAP #########
 ####################
 
-def create_updated_map_measures(df, selected_state, selected_measure):
-    
-    filtered_df = df[(df['Measure_short'] == selected_measure)]
-    # Calculate the 10th and 90th percentiles of the data
-    percentile_low = filtered_df['Data_Value'].quantile(0.05)
-    percentile_high = filtered_df['Data_Value'].quantile(0.95)
-    
-    # Filter the dataframe based on selected_state (if it's not None)
-    if selected_state is not None and len(selected_state) > 0:
-        filtered_df_by_state = filtered_df[filtered_df['StateDesc'].isin(selected_state)]
-    else:
-        filtered_df_by_state = filtered_df  # No state filter applied
+def get_measure_store():
+    return data_registry.get('measure_store')
+
+def filter_map_measure_states(selected_state, selected_measure):
+    """
+    Map columns of a measure in the selected states (all states if none) and the measure's 5th/95th percentiles,
+    sliced from the measure's precomputed partition.
+    """
+    partition = get_measure_store()[selected_measure]
+    columns = partition.columns(['GEOID', 'Data_Value', 'LocationName', 'StateDesc', 'Year'], selected_state)
+    return columns, partition.percentile_low, partition.percentile_high
 
-    fig = go.Figure()
+def map_customdata(columns):
+    return np.column_stack([columns['LocationName'], columns['StateDesc'], columns['Year'].astype(object)])
 
+def measure_hovertemplate(selected_measure):
+    return '%{customdata[0]} County, %{customdata[1]}<br>' + selected_measure + ': %{z:.2%}<br>Year obtained: %{customdata[2]}'
 
+@lru_cache(maxsize=None)
+def map_measures_template():
+    """Health Measures map without the measure-specific arrays, scale and labels, validated once."""
 
     # Create the choropleth map
     fig = go.Figure(go.Choropleth(
-        geojson=counties,
+        geojson=get_counties_geojson(),
         featureidkey="properties.GEOID",
-        locations=filtered_df_by_state['GEOID'],
-        z=filtered_df_by_state['Data_Value'],
         colorscale="RdYlGn_r",
-        hovertemplate='%{customdata[0]} County, %{customdata[1]}<br>' + selected_measure + ': %{z:.2%}<br>Year obtained: %{customdata[2]}',
-        customdata=filtered_df_by_state[['LocationName', 'StateDesc','Year']],
         #colorbar=dict(thickness=15, len=0.5, tickformat=".1%"),
         marker_line_width=0,
         colorbar=dict(
@@ -59,8 +58,6 @@ def create_updated_map_measures(df, selected_state, selected_measure):
             xpad=0,  # Adjust padding if needed
             tickfont=dict(color='white'),  # Set tick font color
         ),
-        zmin=percentile_low,
-        zmax=percentile_high,
         showscale=True,
         name=""
         )
@@ -82,7 +79,6 @@ def create_updated_map_measures(df, selected_state, selected_measure):
         ),
         paper_bgcolor='black',
         plot_bgcolor='black',
-        title_text=f'Percent: {selected_measure}',
         title_x=0.5,  # Center the title
         margin=dict(l=0, r=0, t=40, b=0),
         title_font=dict(size=24, color='white'),
@@ -105,33 +101,72 @@ def create_updated_map_measures(df, selected_state, selected_measure):
         autosize=True,  # Enable autosize
         height=600,
     )
-    return fig
+    return FigureTemplate(fig)
+
+def create_updated_map_measures(selected_state, selected_measure):
+
+    columns, percentile_low, percentile_high = filter_map_measure_states(selected_state, selected_measure)
+
+    template = map_measures_template()
+    choropleth = template.trace(
+        0,
+        locations=columns['GEOID'],
+        z=columns['Data_Value'],
+        hovertemplate=measure_hovertemplate(selected_measure),
+        customdata=map_customdata(columns),
+        zmin=percentile_low,
+        zmax=percentile_high,
+    )
+    return template.figure([choropleth], title={'text': f'Percent: {selected_measure}'})
+
 
 
+def create_updated_map_measures_patch(selected_state, selected_measure):
+    """Partial update for a map already in the browser: swaps the per-county arrays and the measure-specific scale and labels."""
+    columns, percentile_low, percentile_high = filter_map_measure_states(selected_state, selected_measure)
+
+    patch = Patch()
+    patch['data'][0]['locations'] = columns['GEOID']
+    patch['data'][0]['z'] = data_array(columns['Data_Value'])
+    patch['data'][0]['customdata'] = map_customdata(columns)
+    patch['data'][0]['zmin'] = percentile_low
+    patch['data'][0]['zmax'] = percentile_high
+    patch['data'][0]['hovertemplate'] = measure_hovertemplate(selected_measure)
+    patch['layout']['title']['text'] = f'Percent: {selected_measure}'
+    return patch
+
 
 # Extract unique states and counties from your data
-available_states = df_measures['StateDesc'].unique()
-available_states.sort()
+@lru_cache(maxsize=None)
+def get_available_states():
+    return sorted(get_df_measures()['StateDesc'].unique())
 
 # Extract unique states and counties from your data
-available_measures = df_measures['Measure_short'].unique()
-available_measures.sort()
+def get_available_measures():
+    return get_measure_store().measures
+
+def create_updated_table_measures(selected_state, selected_measure):
 
-def find_top_bottom_values(df, column_name, max_values):
-    # Sort the DataFrame based on a column
-    sorted_df = df.sort_values(by=column_name)
+    max_values = 10  # Number of top and bottom values
+    # Calculate the 5th and 95th percentiles of the data
+    partition = get_measure_store()[selected_measure]
+    percentile_low, percentile_high = partition.percentile_low, partition.percentile_high
 
-    # Select the top and bottom values
-    bottom_df = sorted_df.head(max_values)
-    top_df = sorted_df.tail(max_values)
+    # Top and bottom rows of the measure in the selected states (all states if none), from the presorted ranking index
+    ranking = data_registry.get('measure_ranking')
+    positions = ranking.top_bottom(max_values, selected_state, partition=selected_measure)
 
-    # Combine both top and bottom DataFrames
-    combined_df = pd.concat([bottom_df, top_df])
+    # Colors for each row based on the measure's 5th/95th percentiles
+    colors = values_to_colors(ranking.values[positions], percentile_low, percentile_high)
+    data = ranking.records(positions, extra_columns={'Color': colors})
 
-    return combined_df
+    # Define style conditions using the Color column
+    style = [{'if': {'row_index': i}, 'backgroundColor': color} for i, color in enumerate(colors)]
 
-def value_to_color(value, min_val, max_val, colormap=plt.cm.RdYlGn_r):
-    """Convert a value to a color using a matplotlib colormap."""
-    norm = mcolors.Normalize(vmin=min_val, vmax=max_val)
-    return mcolors.to_hex(colormap(norm(value)))
+    # Additional style settings for borders and lines
+    style.extend([
+        {'if': {'column_id': 'LocationName'}, 'textAlign': 'left'},
+        {'if': {'column_id': 'StateDesc'}, 'textAlign': 'left'}
 
+    ])
+    return data, style
@@ -4,7 +4,7 @@ from dash import html, dcc, dash_table
 from dash.dash_table.Format import Format, Scheme
 import dash_bootstrap_components as dbc
 
-from src.tabs.measure_view import available_states, available_measures
+from src.tabs.measure_view import get_available_states, get_available_measures
 from src.tabs.helper_data import CDC_PLACES_help, common_div_style, table_style,style_cell_conditional, style_header_conditional
 
 info_icon = html.I(className="bi bi-info-circle", id="cdc-places-tooltip-target", style={'cursor': 'pointer', 'font-size': '22px', 'marginLeft': '10px'})
@@ -29,6 +29,8 @@ health_tooltip = dbc.Tooltip(
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY, dbc.icons.BOOTSTRAP])
 
 def measure_view_tab_layout():
+    available_states = get_available_states()
+    available_measures = get_available_measures()
     layout = dbc.Container([
 
     health_score_with_icon,
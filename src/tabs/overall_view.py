@@ -1,55 +1,73 @@
-import pandas as pd
-import numpy as np
-import json
+import os
+from functools import lru_cache
 
 import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
-
-### Load data#####
-df_ranking = pd.read_pickle("data/processed/df_summary_final.pickle")
-num_counties = len(df_ranking)
-
-# GeoJSON file
-file_path_geo_json = "data/processed/us_census_counties_geojson.json"
-with open(file_path_geo_json) as f:
-    counties = json.load(f)
-
-min_x = df_ranking['Per capita personal income'].min()
-
-
-percentile_low = df_ranking['Weighted_Score_Normalized'].quantile(0.05)
-percentile_high = df_ranking['Weighted_Score_Normalized'].quantile(0.95)
-percentile_low_scatter = percentile_low
-percentile_high_scatter = percentile_high
-
-# load output from GAM
-gam_model_output = pd.read_pickle("models/gam_model_output.pkl")
-
-x_pred = gam_model_output[['Per capita personal income']]
-y_pred = gam_model_output['y_pred']
-y_intervals = gam_model_output[['lower_interval', 'upper_interval']].to_numpy()
-pseudo_r2_value = gam_model_output.attrs['pseudo_r2_value']
-
-
-def create_updated_scatter_chart(df,selected_state,x_pred, y_pred, y_intervals, pseudo_r2_value):
-
-    # Always start with the full dataset
-    filtered_df = df.copy()
-
-    # Step 1: Filter by State (if any are selected)
-    if selected_state:
-        filtered_df = filtered_df[filtered_df['StateDesc'].isin(selected_state)]
-
-    hover_text = [
-        f"{row['LocationName']}, {row['StateDesc']}<br>UnHealth Score: {row['Weighted_Score_Normalized']:.2f}<br>Rank: {row['Rank']:,.0f} of {num_counties}<br>Per capita personal income: {row['Per capita personal income']:,.0f}<br>Population: {row['Population']:,.0f}<br>{row['Note']}"
-        for index, row in filtered_df.iterrows()
-    ]
+from dash import Patch
+
+from src.data.registry import data_registry
+from src.tabs.colormap import values_to_colors
+from src.tabs.figure_builder import FigureTemplate, data_array
+from src.tabs.geojson_assets import get_counties_geojson
+
+### Load data (on first use, shared through the data registry)#####
+def get_df_ranking():
+    return data_registry.get('df_summary')
+
+@lru_cache(maxsize=None)
+def summary_scale():
+    """County count, income axis minimum and 5th/95th score percentiles used by the Summary figures."""
+    df_ranking = get_df_ranking()
+    return {
+        'num_counties': len(df_ranking),
+        'min_x': df_ranking['Per capita personal income'].min(),
+        'percentile_low': df_ranking['Weighted_Score_Normalized'].quantile(0.05),
+        'percentile_high': df_ranking['Weighted_Score_Normalized'].quantile(0.95),
+    }
+
+@lru_cache(maxsize=None)
+def get_gam_output():
+    """x_pred, y_pred, y_intervals and pseudo_r2_value from the fitted GAM."""
+    gam_model_output = data_registry.get('gam_model_output')
+
+    x_pred = gam_model_output[['Per capita personal income']]
+    y_pred = gam_model_output['y_pred']
+    y_intervals = gam_model_output[['lower_interval', 'upper_interval']].to_numpy()
+    pseudo_r2_value = gam_model_output.attrs['pseudo_r2_value']
+    return x_pred, y_pred, y_intervals, pseudo_r2_value
+
+
+# Above this many points the county scatter is drawn with WebGL (like plotly express' render_mode='auto').
+# SCATTER_RENDER_MODE=svg or webgl forces one renderer.
+scatter_render_mode = os.getenv("SCATTER_RENDER_MODE", "auto")
+webgl_min_points = 1000
+
+scatter_customdata_columns = ['GEOID', 'LocationName', 'StateDesc', 'Rank', 'Population', 'Note']
+
+def scatter_trace_type(num_points):
+    """go.Scattergl or go.Scatter for a county scatter of `num_points` points."""
+    if scatter_render_mode == 'webgl' or (scatter_render_mode == 'auto' and num_points > webgl_min_points):
+        return go.Scattergl
+    return go.Scatter
+
+@lru_cache(maxsize=None)
+def scatter_template(trace_type):
+    """Summary scatter with everything but the county points: GAM lines, axes, legend and styling, validated once."""
+    scale = summary_scale()
+    x_pred, y_pred, y_intervals, pseudo_r2_value = get_gam_output()
+
+    # Hover labels are formatted in the browser from customdata (GEOID first, as before)
+    hovertemplate = (
+        '%{customdata[1]}, %{customdata[2]}<br>'
+        'UnHealth Score: %{y:.2f}<br>'
+        'Rank: %{customdata[3]:,.0f} of ' + str(scale['num_counties']) + '<br>'
+        'Per capita personal income: %{x:,.0f}<br>'
+        'Population: %{customdata[4]:,.0f}<br>'
+        '%{customdata[5]}'
+        '<extra></extra>'
+    )
 
-    
     fig_scatter = go.Figure()
-    # Check if there is data after filtering
-    if len(filtered_df) == 0:
+    if trace_type is None:
         # If no data, display a message
         fig_scatter.update_layout(
             xaxis={'visible': False},  
@@ -68,23 +86,19 @@ def create_updated_scatter_chart(df,selected_state,x_pred, y_pred, y_intervals,
             font=dict(color="white"),  
         )
     else:
-        scatter_plot = go.Scatter(
-            x=filtered_df['Per capita personal income'],
-            y=filtered_df['Weighted_Score_Normalized'],
+        # x, y, marker colours and customdata are filled in per selection
+        scatter_plot = trace_type(
             mode='markers',
             marker=dict(
-                color=list(filtered_df['Weighted_Score_Normalized']),  
                 colorscale='RdYlGn_r',  # Red-Yellow-Green color scale
-                cmin=percentile_low_scatter,  
-                cmax=percentile_high_scatter,  
+                cmin=scale['percentile_low'],  
+                cmax=scale['percentile_high'],  
                 line=dict(
                     width=.2,
                     color='black'
                 )
             ),
-            text=hover_text,
-            hoverinfo='text',
-            customdata=filtered_df['GEOID'],
+            hovertemplate=hovertemplate,
             name='County'
         )
 
@@ -128,7 +142,7 @@ def create_updated_scatter_chart(df,selected_state,x_pred, y_pred, y_intervals,
             title_x=0.5,  
             title_font=dict(size=24), 
             margin=dict(l=0, r=0, t=40, b=0),
-            xaxis=dict(title='Income per Capita',range=[min_x,200000], showgrid=False, linecolor='darkgrey', linewidth=1),  # Hide grid lines and set axis line color
+            xaxis=dict(title='Income per Capita',range=[scale['min_x'],200000], showgrid=False, linecolor='darkgrey', linewidth=1),  # Hide grid lines and set axis line color
             yaxis=dict(range=[0, 101], showgrid=False, linecolor='darkgrey', linewidth=1),  # Hide grid lines and set axis line color
             yaxis_title='UnHealth Score',
             coloraxis_showscale=False,
@@ -155,34 +169,59 @@ def create_updated_scatter_chart(df,selected_state,x_pred, y_pred, y_intervals,
     fig_scatter.update_layout(
         autosize=False,  
     )
-    return fig_scatter
+    return FigureTemplate(fig_scatter)
+
+def create_updated_scatter_chart(df,selected_state):
+
+    # Filter by State (if any are selected)
+    if selected_state:
+        filtered_df = df[df['StateDesc'].isin(selected_state)]
+    else:
+        filtered_df = df
+
+    # Check if there is data after filtering
+    if len(filtered_df) == 0:
+        # If no data, display a message
+        return scatter_template(None).figure()
+
+    template = scatter_template(scatter_trace_type(len(filtered_df)))
+    scatter_plot = template.trace(
+        0,
+        x=filtered_df['Per capita personal income'],
+        y=filtered_df['Weighted_Score_Normalized'],
+        marker=dict(color=filtered_df['Weighted_Score_Normalized']),
+        customdata=filtered_df[scatter_customdata_columns],
+    )
+    return template.figure([scatter_plot] + template.traces[1:])
 
 
 ####################
 ###### MAP #########
 ####################
 
-def create_updated_map(df, selected_state):
-    
+map_customdata_columns = ['GEOID', 'LocationName', 'StateDesc', 'Rank', 'Weighted_Score_Normalized','Per capita personal income','Population','Note']
+
+def filter_map_states(df, selected_state):
     # Filter the dataframe based on selected_state (if it's not None)
     if selected_state is not None and len(selected_state) > 0:
-        filtered_df_by_state = df[df['StateDesc'].isin(selected_state)]
-    else:
-        filtered_df_by_state = df  # No state filter applied
+        return df[df['StateDesc'].isin(selected_state)]
+    return df  # No state filter applied
+
+@lru_cache(maxsize=None)
+def map_template():
+    """Summary map without the county arrays: GeoJSON, colour scale, colorbar, geo settings and annotation, validated once."""
+    scale = summary_scale()
 
     fig = go.Figure()
 
     fig.add_trace(go.Choropleth(
-        geojson=counties,
+        geojson=get_counties_geojson(),
         featureidkey="properties.GEOID",
-        locations=filtered_df_by_state['GEOID'],
-        z=filtered_df_by_state.Weighted_Score_Normalized,
         colorscale="RdYlGn_r",
-        customdata=filtered_df_by_state[['GEOID', 'LocationName', 'StateDesc', 'Rank', 'Weighted_Score_Normalized','Per capita personal income','Population','Note']],
         hovertemplate = (
             '%{customdata[1]}, %{customdata[2]}<br>'
             'UnHealth Score: %{customdata[4]:.2f}<br>'
-            'Rank: %{customdata[3]} of ' + str(num_counties) + '<br>'
+            'Rank: %{customdata[3]} of ' + str(scale['num_counties']) + '<br>'
             'Per capita personal income: %{customdata[5]:,.0f}<br>'
             'Population: %{customdata[6]:,.0f}<br>'
             '%{customdata[7]}'
@@ -196,8 +235,8 @@ def create_updated_map(df, selected_state):
             xpad=0,  
             tickfont=dict(color='white'), 
         ),
-        zmin=percentile_low,
-        zmax=percentile_high,
+        zmin=scale['percentile_low'],
+        zmax=scale['percentile_high'],
         showscale=True,
         name=""
         )
@@ -242,25 +281,59 @@ def create_updated_map(df, selected_state):
     fig.update_layout(
         autosize=False,  
     )
-    return fig
+    return FigureTemplate(fig)
+
+def create_updated_map(df, selected_state):
+    
+    filtered_df_by_state = filter_map_states(df, selected_state)
+
+    template = map_template()
+    choropleth = template.trace(
+        0,
+        locations=filtered_df_by_state['GEOID'],
+        z=filtered_df_by_state.Weighted_Score_Normalized,
+        customdata=filtered_df_by_state[map_customdata_columns],
+    )
+    return template.figure([choropleth])
+
+
+def create_updated_map_patch(df, selected_state):
+    """Partial update for a map already in the browser: a state change only swaps the per-county arrays."""
+    filtered_df_by_state = filter_map_states(df, selected_state)
+
+    patch = Patch()
+    patch['data'][0]['locations'] = filtered_df_by_state['GEOID'].to_numpy()
+    # numeric arrays go out base64-encoded (floats as float32), the same way the full figure sends them
+    patch['data'][0]['z'] = data_array(filtered_df_by_state['Weighted_Score_Normalized'].to_numpy())
+    patch['data'][0]['customdata'] = filtered_df_by_state[map_customdata_columns].to_numpy()
+    return patch
 
 
-available_states = df_ranking['StateDesc'].unique()
-available_states.sort()
+@lru_cache(maxsize=None)
+def get_available_states():
+    return sorted(get_df_ranking()['StateDesc'].unique())
 
-def find_top_bottom_values(df, column_name, max_values):
+def create_updated_table(selected_state):
+    max_values = 10  # Number of top and bottom values
+    scale = summary_scale()
 
-    sorted_df = df.sort_values(by=column_name)
+    # Top and bottom rows of the selected states (all states if none), from the presorted ranking index
+    ranking = data_registry.get('summary_ranking')
+    positions = ranking.top_bottom(max_values, selected_state)
 
-    bottom_df = sorted_df.head(max_values)
-    top_df = sorted_df.tail(max_values)
+    # Colors for each row based on the overall 5th/95th percentiles
+    colors = values_to_colors(ranking.values[positions], scale['percentile_low'], scale['percentile_high'])
+    data = ranking.records(positions, extra_columns={'Color': colors},
+                           round_columns={'Weighted_Score_Normalized': 2, 'Per capita personal income': 0}, fill_na="NA")
 
-    combined_df = pd.concat([bottom_df, top_df])
+    # Define style conditions using the Color column
+    style = [{'if': {'row_index': i}, 'backgroundColor': color} for i, color in enumerate(colors)]
 
-    return combined_df
+    # Additional style settings for borders and lines
+    style.extend([
+        {'if': {'column_id': 'LocationName'}, 'textAlign': 'left'},
+        {'if': {'column_id': 'StateDesc'}, 'textAlign': 'left'}
 
-def value_to_color(value, min_val, max_val, colormap=plt.cm.RdYlGn_r):
-    """Convert a value to a color using a matplotlib colormap."""
-    norm = mcolors.Normalize(vmin=min_val, vmax=max_val)
-    return mcolors.to_hex(colormap(norm(value)))
+    ])
+    return data, style
 
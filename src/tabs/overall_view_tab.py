@@ -3,7 +3,7 @@ from dash import html, dcc, dash_table
 from dash.dash_table.Format import Format, Group
 import dash_bootstrap_components as dbc
 
-from src.tabs.overall_view import available_states
+from src.tabs.overall_view import get_available_states
 from src.tabs.helper_data import unhealth_score_explanation, common_div_style, table_style,style_cell_conditional, style_header_conditional
 
 
@@ -29,6 +29,7 @@ app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY, dbc.icons.BOO
 
 
 def overall_view_tab_layout():
+    available_states = get_available_states()
     layout = dbc.Container([
 
     unhealth_score_with_icon,
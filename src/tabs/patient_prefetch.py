@@ -0,0 +1,101 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Threads preparing the next patient's view in each worker; 0 turns prefetching off
+prefetch_workers = int(os.getenv("PATIENT_PREFETCH_WORKERS", "1"))
+# Jobs waiting or running at once; sessions asking for more while the pool is busy are not prefetched
+prefetch_queue_size = int(os.getenv("PATIENT_PREFETCH_QUEUE", "8"))
+
+
+class PatientPrefetcher:
+    """
+    Prepares the view of the patient a session will be shown next in a background thread pool, so the
+    "Generate Report from Random Patient" click takes a finished view instead of building it.
+
+    Prefetched views are kept per worker: a click answered by another gunicorn worker than the one that
+    served the session's previous click is a miss and renders as before.
+    """
+
+    def __init__(self, max_workers=1, max_queue=8, max_pending=256):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = OrderedDict()   # patient ID -> future, oldest first
+        self._lock = threading.Lock()
+        self._queue_depth = 0
+        self._stats = {'claims': {'hit': 0, 'pending': 0, 'miss': 0, 'failed': 0}, 'submitted': 0, 'dropped': 0}
+
+    def _job_done(self, future):
+        with self._lock:
+            self._queue_depth -= 1
+
+    def prefetch(self, patient_id, prepare):
+        """Start `prepare(patient_id)` in the background unless it is already prefetched or the pool is full."""
+        if self.max_workers <= 0:
+            return
+        with self._lock:
+            if patient_id in self._pending:
+                return
+            if self._queue_depth >= self.max_queue:
+                self._stats['dropped'] += 1
+                return
+            # created on first use, so gunicorn workers don't inherit a pool from the master
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="patient-prefetch")
+            future = self._executor.submit(prepare, patient_id)
+            self._queue_depth += 1
+            self._stats['submitted'] += 1
+            self._pending[patient_id] = future
+            while len(self._pending) > self.max_pending:
+                # sessions that never clicked again
+                self._pending.popitem(last=False)[1].cancel()
+        future.add_done_callback(self._job_done)
+
+    def take(self, patient_id):
+        """
+        The prefetched view of `patient_id`, if preparing it has finished.
+
+        Returns:
+            The value `prepare` returned, or None if the patient was not prefetched, is still being prepared
+            (the job keeps running and warms the figure cache) or preparing failed; the caller renders the view.
+        """
+        with self._lock:
+            future = self._pending.pop(patient_id, None)
+            if future is None:
+                outcome, view = 'miss', None
+            elif not future.done():
+                outcome, view = 'pending', None
+            elif future.exception() is not None:
+                outcome, view = 'failed', None
+            else:
+                outcome, view = 'hit', future.result()
+            self._stats['claims'][outcome] += 1
+        if outcome == 'failed':
+            logger.warning("prefetching patient %s failed", patient_id, exc_info=future.exception())
+        return view
+
+    def stats(self):
+        """Claim outcomes, submitted and dropped jobs, plus the current queue depth."""
+        with self._lock:
+            return {
+                'claims': dict(self._stats['claims']),
+                'submitted': self._stats['submitted'],
+                'dropped': self._stats['dropped'],
+                'queue_depth': self._queue_depth,
+            }
+
+    def clear(self):
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            self._stats = {'claims': {'hit': 0, 'pending': 0, 'miss': 0, 'failed': 0}, 'submitted': 0, 'dropped': 0}
+
+
+patient_prefetcher = PatientPrefetcher(max_workers=prefetch_workers, max_queue=prefetch_queue_size)
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from functools import lru_cache
+
+from dash import Patch
+
+from src.data.keyed_store import open_keyed_store, records_file
+from src.data.registry import ai_summary_store_dir, patient_labs_dir
+from src.tabs.figure_builder import float_array_dtype
+from src.tabs.figure_cache import normalize_states
+from src.tabs.geojson_assets import file_path_geo_json, geojson_delivery
+from src.tabs.overall_view import scatter_render_mode
+
+logger = logging.getLogger(__name__)
+
+# Written by `run_pipelines.py --precompute_figures`
+precomputed_dir = "data/processed/precomputed_views"
+manifest_file = "index.json"
+
+# The artifacts are only served while these inputs are unchanged
+source_files = [
+    "data/processed/df_summary_final.pickle",
+    "data/processed/df_measures_final.pickle",
+    "models/gam_model_output.pkl",
+    file_path_geo_json,
+]
+
+# Written by `run_pipelines.py --precompute_patient_views`
+patient_views_dir = "data/processed/patient_views_store"
+
+# The patient views are only served while these inputs are unchanged
+patient_source_files = [
+    f"{patient_labs_dir}df_patient_filt_labs.pkl",
+    f"{patient_labs_dir}df_vital_filt_signs.pkl",
+    f"{patient_labs_dir}df_qols_filt_scores.pkl",
+    os.path.join(ai_summary_store_dir, records_file),
+]
+
+all_states_key = "__all__"
+
+# Bump when the figure builders change, so views rendered by older code are not served
+views_version = 4
+
+
+def _content_hashes(file_paths):
+    versions = {}
+    for file_path in file_paths:
+        if os.path.exists(file_path):
+            with open(file_path, 'rb') as f:
+                versions[file_path] = hashlib.md5(f.read()).hexdigest()[:12]
+        else:
+            versions[file_path] = None
+    return versions
+
+
+def source_versions():
+    """
+    Content hashes of the inputs the figures were rendered from, plus the GeoJSON delivery mode, the scatter
+    renderer setting, the float array dtype and the views version.
+    """
+    return {'geojson_delivery': geojson_delivery, 'scatter_render_mode': scatter_render_mode,
+            'figure_float_dtype': float_array_dtype.name, 'views_version': views_version,
+            **_content_hashes(source_files)}
+
+
+def patient_source_versions():
+    """
+    Content hashes of the patient frames and summary store the patient views were rendered from, plus the float
+    array dtype and the views version.
+    """
+    return {'figure_float_dtype': float_array_dtype.name, 'views_version': views_version,
+            **_content_hashes(patient_source_files)}
+
+
+def selection_key(selected_state):
+    """Key for a no-state or single-state selection; None for multi-state combinations, which are rendered live."""
+    states = normalize_states(selected_state)
+    if len(states) == 0:
+        return all_states_key
+    if len(states) == 1:
+        return states[0]
+    return None
+
+
+def _slug(name):
+    return re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_')
+
+
+def artifact_path(view, key, selected_measure=None):
+    """Relative file path of one precomputed view, e.g. 'measure/Obesity_18/Texas.json'."""
+    parts = [view] + ([_slug(selected_measure)] if selected_measure is not None else []) + [_slug(key)]
+    return os.path.join(*parts) + ".json"
+
+
+def manifest_key(view, key, selected_measure=None):
+    return "|".join([view, selected_measure or "", key])
+
+
+@lru_cache(maxsize=1)
+def load_manifest():
+    """Manifest of precomputed views, or an empty one if it is missing or was built from other data."""
+    file_path = os.path.join(precomputed_dir, manifest_file)
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path) as f:
+        manifest = json.load(f)
+    if manifest.get('sources') != source_versions():
+        logger.warning("precomputed views in %s are stale, rendering live", precomputed_dir)
+        return {}
+    return manifest.get('views', {})
+
+
+@lru_cache(maxsize=16)
+def _load_view(relative_path):
+    with open(os.path.join(precomputed_dir, relative_path)) as f:
+        return json.load(f)
+
+
+def get_precomputed_view(view, selected_state, selected_measure=None):
+    """
+    Look up the precomputed figures and table for a selection.
+
+    Args:
+        view (str): 'summary' or 'measure'.
+        selected_state: State dropdown value.
+        selected_measure (str): Measure, for the 'measure' view.
+
+    Returns:
+        dict or None: Figure dicts ('map', and 'scatter' for the summary) and 'table' {'data', 'style'},
+        or None when the selection has to be rendered live.
+    """
+    key = selection_key(selected_state)
+    if key is None:
+        return None
+    relative_path = load_manifest().get(manifest_key(view, key, selected_measure))
+    if relative_path is None:
+        return None
+    return _load_view(relative_path)
+
+
+def patient_view_key(patient_id, part):
+    """Store key of one part of a patient's view: 'summary' or one of the chart cards."""
+    return "|".join([patient_id, part])
+
+
+@lru_cache(maxsize=1)
+def load_patient_view_store():
+    """Store of precomputed patient views, or None if it is missing or was built from other data."""
+    store = open_keyed_store(patient_views_dir)
+    if store is None:
+        return None
+    if store.meta.get('sources') != patient_source_versions():
+        logger.warning("precomputed patient views in %s are stale, rendering live", patient_views_dir)
+        return None
+    return store
+
+
+def get_precomputed_patient_view(patient_id, part):
+    """
+    Look up one part of a patient's precomputed AI tab view.
+
+    Args:
+        patient_id (str): Patient ID.
+        part (str): 'summary' or a chart card ('vital_signs', 'labs', 'qols').
+
+    Returns:
+        str, list or None: The summary markdown or the card's figure dicts, or None when the patient
+        (e.g. one added after the store was built) has to be rendered live.
+    """
+    store = load_patient_view_store()
+    if store is None:
+        return None
+    view = store.get(patient_view_key(patient_id, part))
+    if isinstance(view, list):
+        # figures are stored without the layout template they share
+        for figure in view:
+            figure['layout'].setdefault('template', store.meta['layout_template'])
+    return view
+
+
+def map_patch_from_figure(figure, trace_fields, title=False):
+    """Patch that copies the given trace fields (and optionally the title) of a precomputed map into the browser's figure."""
+    patch = Patch()
+    for field in trace_fields:
+        patch['data'][0][field] = figure['data'][0][field]
+    if title:
+        patch['layout']['title']['text'] = figure['layout']['title']['text']
+    return patch
@@ -0,0 +1,134 @@
+import logging
+import os
+
+from dash import _callback
+from plotly.io._json import _safe, _swap_orjson, clean_to_json_compatible
+from plotly.io.json import to_json_plotly
+from _plotly_utils.optional_imports import get_module
+
+try:
+    import orjson
+except ImportError:  # callback responses are encoded by plotly's json engine, as Dash does without orjson
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+logger = logging.getLogger(__name__)
+
+# Significant digits kept for floats in figure and component outputs (`_trimmed_props`); 0 sends full
+# precision. Hover labels show at most 4-6 significant digits (e.g. '%{z:.2f}', '.2%', ',.0f'), so 9 leave a margin.
+float_digits = int(os.getenv("RESPONSE_FLOAT_DIGITS", "9"))
+
+# Algorithms offered to clients, in order of preference; flask-compress picks by the Accept-Encoding header
+compress_algorithms = os.getenv("COMPRESS_ALGORITHMS", "br,gzip").split(",")
+
+_leaf_types = (str, int, bool, type(None))
+# Output properties whose floats are trimmed: figures and component trees (which carry the graphs). Other
+# outputs (table data, dropdown options) are sent as returned; walking them costs more than trimming saves.
+_trimmed_props = frozenset(['figure', 'children'])
+# Plotly layout templates are plain JSON and mostly the same object in every figure (see FigureTemplate, which
+# trims their floats once), so they are handed to orjson as they are rather than walked on every response
+_opaque_keys = frozenset(['template'])
+_modules = {
+    "sage_all": get_module("sage.all", should_load=False),
+    "np": get_module("numpy", should_load=False),
+    "pd": get_module("pandas", should_load=False),
+    "image": get_module("PIL.Image", should_load=False),
+}
+
+
+def _trimmed(value, digits):
+    """
+    `value` as orjson can encode it: components converted to their JSON form (plotly's cleaning for anything else
+    orjson can't take) and floats rounded to `digits` significant digits. Numeric arrays and the values of
+    `_opaque_keys` are left to orjson.
+    """
+    value_type = type(value)
+    if value_type is dict:
+        return {key: item if type(item) in _leaf_types or key in _opaque_keys else _trimmed(item, digits)
+                for key, item in value.items()}
+    if value_type is list or value_type is tuple:
+        return [item if type(item) in _leaf_types else _trimmed(item, digits) for item in value]
+    if isinstance(value, float):
+        return float(f"{value:.{digits}g}") if digits else value
+    if value_type in _leaf_types:
+        return value
+    if hasattr(value, 'to_plotly_json'):
+        return _trimmed(value.to_plotly_json(), digits)
+    cleaned = clean_to_json_compatible(value, numpy_allowed=True, datetime_allowed=True, modules=_modules)
+    return value if cleaned is value else _trimmed(cleaned, digits)
+
+
+def trim_floats(value, digits=None):
+    """JSON-compatible `value` with its floats rounded to `digits` significant digits (`float_digits` if None)."""
+    return _trimmed(value, float_digits if digits is None else digits)
+
+
+def _trimmed_response(value, digits):
+    """A Dash callback response with the `_trimmed_props` outputs trimmed and the others left as they are."""
+    outputs = value.get('response') if type(value) is dict else None
+    if type(outputs) is not dict:
+        return _trimmed(value, digits)
+    trimmed_outputs = {}
+    for component_id, props in outputs.items():
+        if type(props) is dict:
+            trimmed_outputs[component_id] = {prop: _trimmed(item, digits) if prop in _trimmed_props else item
+                                             for prop, item in props.items()}
+        else:
+            trimmed_outputs[component_id] = _trimmed(props, digits)
+    return {**value, 'response': trimmed_outputs}
+
+
+def to_response_json(value, digits=None):
+    """
+    JSON of a callback response, a drop-in for Dash's `to_json`.
+
+    Dash encodes responses through plotly's orjson engine, which gives up on the first component or pandas
+    object and then runs plotly's cleaning pass over the whole response before encoding it again. Here one
+    pass over the figure and children outputs converts their components and trims float precision, and
+    orjson encodes the result with the same escaping. Other outputs go to orjson as returned; only if
+    orjson can't encode them is the whole response converted.
+
+    Args:
+        value: Response dict (or any value Dash encodes).
+        digits (int): Significant digits kept for floats; `float_digits` if None, 0 for full precision.
+
+    Returns:
+        str: The JSON text.
+    """
+    if orjson is None:
+        return to_json_plotly(value)
+    digits = float_digits if digits is None else digits
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    try:
+        encoded = orjson.dumps(_trimmed_response(value, digits), option=options)
+    except TypeError:
+        # e.g. a component or frame in another output: convert everything
+        try:
+            encoded = orjson.dumps(_trimmed(value, digits), option=options)
+        except TypeError:
+            # something under an opaque key orjson can't encode
+            return to_json_plotly(value)
+    return _safe(encoded.decode("utf8"), _swap_orjson)
+
+
+def register_response_encoding(app):
+    """
+    Encode callback responses with `to_response_json` and compress the server's responses with brotli or
+    gzip, as negotiated with the client (requires flask-compress).
+    """
+    # dash._callback looks `to_json` up when it builds each callback response. This is a Dash internal (the
+    # versions it is known for are pinned in requirements.txt): fail here rather than silently send
+    # responses untrimmed if an upgrade moves it.
+    if not callable(getattr(_callback, 'to_json', None)):
+        raise RuntimeError("dash._callback.to_json not found, cannot register the response encoding")
+    _callback.to_json = to_response_json
+
+    if Compress is None:
+        logger.warning("flask-compress is not installed, responses are sent uncompressed")
+        return
+    app.server.config.setdefault('COMPRESS_ALGORITHM', compress_algorithms)
+    Compress(app.server)